@@ -0,0 +1,336 @@
+"""Learning-curve analytics over the whole review history, in NumPy.
+
+word_review_items is loaded once into parallel arrays (word id, session
+id, group id, timestamp, correct), sorted by word and then time. Every
+metric is then a handful of array operations instead of a query per word:
+  - learning curves: accuracy by attempt number (the k-th time a word was
+    reviewed), overall and per group (the group of the session the review
+    was made in)
+  - retention: accuracy by the time since the word's previous review
+  - daily accuracy with a rolling window
+  - one word's review sequence with its rolling accuracy
+The loaded history and its summary are kept until a commit changes
+word_review_items or study_sessions (cache.table_generations).
+
+Summaries are additive bincount tables computed per chunk of whole words,
+so histories of LANG_PORTAL_ANALYTICS_PARALLEL_MIN_REVIEWS reviews or more
+are split across a process pool of LANG_PORTAL_ANALYTICS_WORKERS
+processes. Only this module's NumPy code runs in the workers.
+"""
+import multiprocessing
+import os
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+
+import numpy as np
+
+ANALYTICS_WORKERS = int(os.environ.get("LANG_PORTAL_ANALYTICS_WORKERS", os.cpu_count() or 1))
+ANALYTICS_PARALLEL_MIN_REVIEWS = int(os.environ.get("LANG_PORTAL_ANALYTICS_PARALLEL_MIN_REVIEWS", "2000000"))
+
+# Attempts beyond this share the last learning curve slot
+MAX_ATTEMPTS = 50
+# Retention buckets: upper bounds in days of the gap since the previous review
+RETENTION_BUCKETS_DAYS = (1 / 24, 1, 3, 7, 14, 30, 90)
+
+LOAD_BATCH_SIZE = 65536
+SECONDS_PER_DAY = 86400
+
+
+class ReviewHistory:
+    """word_review_items as parallel arrays, sorted by word, then time, then id"""
+
+    def __init__(self, word, session, group, timestamp, correct):
+        order = np.lexsort((timestamp, word))
+        self.word = word[order]
+        self.session = session[order]
+        self.group = group[order]
+        self.timestamp = timestamp[order]  # epoch seconds, UTC
+        self.correct = correct[order]
+
+    def __len__(self):
+        return len(self.word)
+
+    @classmethod
+    def load(cls, path, workers=None):
+        """Read the history from the SQLite file at path.
+
+        Large histories are read in id ranges by the process pool, each
+        worker on its own connection: turning timestamps into epoch
+        seconds is most of the cost.
+        """
+        # Imported here so pool workers, which only run the array code,
+        # don't build the database engines
+        from models import StudySession, WordReviewItem
+
+        with _connect(path) as connection:
+            first_id, last_id = connection.execute(
+                f"SELECT min(id), max(id) FROM {WordReviewItem.__tablename__}"
+            ).fetchone()
+            sessions = np.array(connection.execute(
+                f"SELECT id, group_id FROM {StudySession.__tablename__}"
+            ).fetchall(), dtype=np.int64).reshape(-1, 2)
+
+        if first_id is None:
+            empty = np.empty(0, dtype=np.int64)
+            return cls(empty, empty, empty, empty, empty.astype(bool))
+
+        # Epoch seconds; julianday() is faster than strftime('%s') and keeps
+        # milliseconds, so half of one absorbs its float error
+        sql = (f"SELECT word_id, study_session_id, "
+               f"CAST((julianday(created_at) - 2440587.5) * 86400 + 0.0005 AS INTEGER), correct "
+               f"FROM {WordReviewItem.__tablename__} WHERE id BETWEEN ? AND ? ORDER BY id")
+        if workers is None:
+            workers = _workers_for(last_id - first_id + 1)
+        bounds = np.linspace(first_id, last_id + 1, workers + 1).astype(np.int64)
+        ranges = [(int(low), int(high) - 1) for low, high in zip(bounds[:-1], bounds[1:]) if high > low]
+        if len(ranges) > 1:
+            parts = list(_get_pool().map(_load_reviews, *zip(*[(path, sql, low, high) for low, high in ranges])))
+        else:
+            parts = [_load_reviews(path, sql, *ranges[0])]
+        columns = np.concatenate(parts)
+
+        # A review's group is its session's group
+        session_groups = np.full(max(int(sessions[:, 0].max(initial=0)), int(columns[:, 1].max(initial=0))) + 1,
+                                 -1, dtype=np.int64)
+        session_groups[sessions[:, 0]] = sessions[:, 1]
+        return cls(columns[:, 0], columns[:, 1], session_groups[columns[:, 1]], columns[:, 2],
+                   columns[:, 3].astype(bool))
+
+    def word_range(self, word_id):
+        """(start, stop) of the word's reviews"""
+        return (int(np.searchsorted(self.word, word_id, "left")),
+                int(np.searchsorted(self.word, word_id, "right")))
+
+    def chunks(self, count):
+        """Split into about count (start, stop) ranges of whole words"""
+        if count <= 1 or len(self) == 0:
+            return [(0, len(self))]
+        cuts = np.searchsorted(self.word, self.word[np.linspace(0, len(self), count + 1)[1:-1].astype(int)])
+        bounds = [0, *sorted(set(int(cut) for cut in cuts) - {0, len(self)}), len(self)]
+        return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _connect(path):
+    return closing(sqlite3.connect(path))
+
+
+def _load_reviews(path, sql, first_id, last_id, batch_size=LOAD_BATCH_SIZE):
+    """Rows first_id..last_id of word_review_items as an int64 array (runs in pool workers)"""
+    with _connect(path) as connection:
+        cursor = connection.execute(sql, (first_id, last_id))
+        batches = []
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            batches.append(np.array(rows, dtype=np.int64))
+    return np.concatenate(batches) if batches else np.empty((0, 4), dtype=np.int64)
+
+
+def _workers_for(review_count):
+    return ANALYTICS_WORKERS if review_count >= ANALYTICS_PARALLEL_MIN_REVIEWS else 1
+
+
+# Array helpers; reviews are sorted by word, then time
+def word_starts(word):
+    """True where a word's run of reviews begins"""
+    starts = np.ones(len(word), dtype=bool)
+    starts[1:] = word[1:] != word[:-1]
+    return starts
+
+
+def attempt_numbers(word):
+    """0-based index of each review within its word's reviews"""
+    starts = word_starts(word)
+    run_start = np.flatnonzero(starts)[np.cumsum(starts) - 1]
+    return np.arange(len(word)) - run_start
+
+
+def review_gaps(word, timestamp):
+    """Seconds since the same word's previous review, -1 for its first"""
+    gaps = np.empty(len(word), dtype=np.int64)
+    gaps[:1] = -1
+    gaps[1:] = timestamp[1:] - timestamp[:-1]
+    gaps[word_starts(word)] = -1
+    return gaps
+
+
+def rolling_accuracy(correct, window):
+    """Share correct over the last `window` values (fewer at the start)"""
+    totals = np.cumsum(correct, dtype=np.int64)
+    totals[window:] = totals[window:] - totals[:-window]
+    seen = np.minimum(np.arange(1, len(correct) + 1), window)
+    return totals / seen
+
+
+def _summarize_chunk(word, group_index, timestamp, correct, group_count):
+    """Learning curve and retention counts per group for reviews of whole words.
+
+    Returns (curve_reviews, curve_correct, retention_reviews, retention_correct),
+    arrays of shape (group_count, slots). The tables add up across chunks.
+    """
+    attempts = np.minimum(attempt_numbers(word), MAX_ATTEMPTS - 1)
+    curve_slots = group_index * MAX_ATTEMPTS + attempts
+    size = group_count * MAX_ATTEMPTS
+    curve_reviews = np.bincount(curve_slots, minlength=size)
+    curve_correct = np.bincount(curve_slots, weights=correct, minlength=size)
+
+    gaps = review_gaps(word, timestamp)
+    repeated = gaps >= 0
+    buckets = np.searchsorted(np.array(RETENTION_BUCKETS_DAYS) * SECONDS_PER_DAY, gaps[repeated])
+    bucket_count = len(RETENTION_BUCKETS_DAYS) + 1
+    retention_slots = group_index[repeated] * bucket_count + buckets
+    retention_reviews = np.bincount(retention_slots, minlength=group_count * bucket_count)
+    retention_correct = np.bincount(retention_slots, weights=correct[repeated],
+                                    minlength=group_count * bucket_count)
+
+    return (curve_reviews.reshape(group_count, MAX_ATTEMPTS), curve_correct.reshape(group_count, MAX_ATTEMPTS),
+            retention_reviews.reshape(group_count, bucket_count),
+            retention_correct.reshape(group_count, bucket_count))
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a process that runs the event loop and the
+            # aiosqlite threads is unsafe
+            _pool = ProcessPoolExecutor(ANALYTICS_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+class Summary:
+    """Learning curve and retention tables of a ReviewHistory, by group"""
+
+    def __init__(self, history, workers=None):
+        self.group_ids, group_index = np.unique(history.group, return_inverse=True)
+        group_count = max(len(self.group_ids), 1)
+        group_index = group_index.reshape(-1)
+
+        if workers is None:
+            workers = _workers_for(len(history))
+        chunks = history.chunks(workers)
+        arguments = [
+            (history.word[start:stop], group_index[start:stop], history.timestamp[start:stop],
+             history.correct[start:stop], group_count)
+            for start, stop in chunks
+        ]
+        if len(arguments) > 1:
+            parts = list(_get_pool().map(_summarize_chunk, *zip(*arguments)))
+        else:
+            parts = [_summarize_chunk(*arguments[0])]
+
+        self.curve_reviews, self.curve_correct, self.retention_reviews, self.retention_correct = (
+            sum(tables) for tables in zip(*parts)
+        )
+
+    def _group_row(self, group_id):
+        """Index of group_id in the tables, or None when it has no reviews"""
+        index = int(np.searchsorted(self.group_ids, group_id))
+        return index if index < len(self.group_ids) and self.group_ids[index] == group_id else None
+
+    def _tables(self, reviews, correct, group_id):
+        if group_id is None:
+            return reviews.sum(axis=0), correct.sum(axis=0)
+        row = self._group_row(group_id)
+        if row is None:
+            return np.zeros(reviews.shape[1], dtype=np.int64), np.zeros(reviews.shape[1])
+        return reviews[row], correct[row]
+
+    def learning_curve(self, group_id=None, max_attempts=MAX_ATTEMPTS):
+        reviews, correct = self._tables(self.curve_reviews, self.curve_correct, group_id)
+        return [
+            {"attempt": attempt + 1, "reviews": int(reviews[attempt]),
+             "accuracy": round(float(correct[attempt] / reviews[attempt]), 4)}
+            for attempt in range(min(max_attempts, MAX_ATTEMPTS)) if reviews[attempt]
+        ]
+
+    def retention(self, group_id=None):
+        reviews, correct = self._tables(self.retention_reviews, self.retention_correct, group_id)
+        bounds = (0.0, *RETENTION_BUCKETS_DAYS, None)
+        return [
+            {"min_days": round(bounds[bucket], 4),
+             "max_days": round(bounds[bucket + 1], 4) if bounds[bucket + 1] is not None else None,
+             "reviews": int(reviews[bucket]),
+             "accuracy": round(float(correct[bucket] / reviews[bucket]), 4) if reviews[bucket] else None}
+            for bucket in range(len(reviews))
+        ]
+
+
+def daily_accuracy(history, window=7):
+    """Reviews and accuracy per day, with accuracy over the last `window` days"""
+    if not len(history):
+        return []
+    days = history.timestamp // SECONDS_PER_DAY
+    first = int(days.min())
+    offsets = days - first
+    reviews = np.bincount(offsets)
+    correct = np.bincount(offsets, weights=history.correct)
+
+    window_reviews = np.cumsum(reviews)
+    window_correct = np.cumsum(correct)
+    window_reviews[window:] = window_reviews[window:] - window_reviews[:-window]
+    window_correct[window:] = window_correct[window:] - window_correct[:-window]
+
+    return [
+        {"day": str(np.datetime64(first + int(offset), "D")), "reviews": int(reviews[offset]),
+         "accuracy": round(float(correct[offset] / reviews[offset]), 4),
+         "rolling_accuracy": round(float(window_correct[offset] / window_reviews[offset]), 4)}
+        for offset in np.flatnonzero(reviews)
+    ]
+
+
+def word_curve(history, word_id, window=5):
+    """One word's reviews in order, with the rolling accuracy after each"""
+    start, stop = history.word_range(word_id)
+    correct = history.correct[start:stop]
+    timestamps = history.timestamp[start:stop]
+    rolling = rolling_accuracy(correct, window)
+    gaps = review_gaps(history.word[start:stop], timestamps)
+    return [
+        {"attempt": index + 1,
+         "reviewed_at": str(np.datetime64(int(timestamps[index]), "s")) + "Z",
+         "correct": bool(correct[index]),
+         "study_session_id": int(history.session[start + index]),
+         "days_since_previous": round(float(gaps[index]) / SECONDS_PER_DAY, 4) if gaps[index] >= 0 else None,
+         "rolling_accuracy": round(float(rolling[index]), 4)}
+        for index in range(stop - start)
+    ]
+
+
+_current = None  # (generations, ReviewHistory, Summary)
+_load_lock = threading.Lock()
+
+
+def current_analytics(path):
+    """The ReviewHistory and Summary of the SQLite file at path, reloaded
+    once a commit changed word_review_items or study_sessions"""
+    global _current
+    from cache import table_generations
+    from models import StudySession, WordReviewItem
+
+    current = table_generations.current()
+    if current is None:
+        # Generations unreadable: the kept snapshot may be stale, load afresh
+        history = ReviewHistory.load(path)
+        return history, Summary(history)
+    generations = (current.get(WordReviewItem.__tablename__), current.get(StudySession.__tablename__))
+    with _load_lock:
+        if _current is None or _current[0] != generations:
+            history = ReviewHistory.load(path)
+            _current = (generations, history, Summary(history))
+        return _current[1], _current[2]
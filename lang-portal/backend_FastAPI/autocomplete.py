@@ -0,0 +1,171 @@
+from bisect import bisect_left
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, object_session
+
+from hangul import CHOSEONG, choseong, decompose, has_hangul
+from models import Word
+
+# Key kinds in the prefix index:
+#   jamo     - Korean spelled out as jamo, so '감ㅅ' and '감사' both prefix '감사합니다'
+#   choseong - initial consonants only, so 'ㄱㅅ' prefixes '감사합니다'
+#   latin    - romanization and English gloss, lowercased
+KINDS = ("jamo", "choseong", "latin")
+
+
+def _with_tokens(text):
+    """The whole string plus every word after the first, so later words are prefixes too"""
+    tokens = text.split()
+    return {text, *tokens[1:]} if tokens else set()
+
+
+def index_keys(korean, transliteration, english):
+    for key in _with_tokens(decompose(korean)):
+        yield "jamo", key
+    for key in _with_tokens(choseong(korean)):
+        yield "choseong", key
+    for key in _with_tokens(transliteration.lower()) | _with_tokens(english.lower()):
+        yield "latin", key
+
+
+def classify(query):
+    """Return (kind, prefix) for what the user typed"""
+    query = query.strip().lower()
+    if all(char in CHOSEONG for char in query.replace(" ", "")):
+        return "choseong", query
+    if has_hangul(query):
+        return "jamo", decompose(query)
+    return "latin", query
+
+
+def _words_generation():
+    """Generation of the words table, or None when it can't be read"""
+    from cache import table_generations
+
+    current = table_generations.current()
+    if current is None:
+        return None
+    return (current.get(Word.__tablename__),)
+
+
+class PrefixIndex:
+    """In-memory type-ahead index over the vocabulary.
+
+    Serves the same lookups as a trie but stores one sorted key array
+    (plus a parallel word id array) per kind: a prefix is found with one
+    binary search and the matches are the run of keys after it. That is
+    O(log n + k) per keystroke without a Python object per trie node.
+    """
+
+    def __init__(self):
+        self.words = {}  # word_id -> (korean, transliteration, english)
+        self.keys = {kind: [] for kind in KINDS}
+        self.ids = {kind: [] for kind in KINDS}
+        self.generation = None  # of words when loaded; None: never loaded or unknown
+
+    def load(self, db: Session):
+        """Rebuild the index from the words table"""
+        # Read before the rows, so a commit in between only means another load
+        generation = _words_generation()
+        rows = db.execute(select(Word.id, Word.korean, Word.transliteration, Word.english)).all()
+        entries = {kind: [] for kind in KINDS}
+        for word_id, korean, transliteration, english in rows:
+            for kind, key in index_keys(korean, transliteration, english):
+                entries[kind].append((key, word_id))
+
+        self.words = {word_id: (korean, transliteration, english)
+                      for word_id, korean, transliteration, english in rows}
+        for kind in KINDS:
+            entries[kind].sort()
+            self.keys[kind] = [key for key, _ in entries[kind]]
+            self.ids[kind] = [word_id for _, word_id in entries[kind]]
+        self.generation = generation
+        return len(self.words)
+
+    def is_stale(self):
+        """Whether a commit changed words since load(), in this process or
+        any other (cache.table_generations)"""
+        generation = _words_generation()
+        return generation is None or generation != self.generation
+
+    def add(self, word_id, korean, transliteration, english):
+        self.remove(word_id)
+        self.words[word_id] = (korean, transliteration, english)
+        for kind, key in index_keys(korean, transliteration, english):
+            position = bisect_left(self.keys[kind], key)
+            self.keys[kind].insert(position, key)
+            self.ids[kind].insert(position, word_id)
+
+    def remove(self, word_id):
+        fields = self.words.pop(word_id, None)
+        if fields is None:
+            return
+        for kind, key in index_keys(*fields):
+            keys, ids = self.keys[kind], self.ids[kind]
+            position = bisect_left(keys, key)
+            while position < len(keys) and keys[position] == key:
+                if ids[position] == word_id:
+                    del keys[position]
+                    del ids[position]
+                    break
+                position += 1
+
+    def clear(self):
+        self.__init__()
+
+    def search(self, query, limit=10):
+        """Return up to limit (word_id, korean, transliteration, english), in key order"""
+        kind, prefix = classify(query)
+        if not prefix:
+            return []
+
+        keys, ids = self.keys[kind], self.ids[kind]
+        results, seen = [], set()
+        position = bisect_left(keys, prefix)
+        while position < len(keys) and len(results) < limit and keys[position].startswith(prefix):
+            word_id = ids[position]
+            if word_id not in seen:
+                seen.add(word_id)
+                results.append((word_id, *self.words[word_id]))
+            position += 1
+        return results
+
+
+autocomplete_index = PrefixIndex()
+
+
+# ORM writes to Word are applied once their transaction commits; bulk Core
+# statements bypass these hooks and are picked up by the next load(), which
+# is_stale() triggers once the commit bumps the words generation
+def _pending(word):
+    session = object_session(word)
+    return session.info.setdefault("autocomplete_pending", {}) if session is not None else None
+
+
+@event.listens_for(Word, "after_insert")
+@event.listens_for(Word, "after_update")
+def _queue_add(mapper, connection, word):
+    pending = _pending(word)
+    if pending is not None:
+        pending[word.id] = (word.korean, word.transliteration, word.english)
+
+
+@event.listens_for(Word, "after_delete")
+def _queue_remove(mapper, connection, word):
+    pending = _pending(word)
+    if pending is not None:
+        pending[word.id] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session):
+    for word_id, fields in session.info.pop("autocomplete_pending", {}).items():
+        if fields is None:
+            autocomplete_index.remove(word_id)
+        else:
+            autocomplete_index.add(word_id, *fields)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop("autocomplete_pending", None)
@@ -0,0 +1 @@
+# just to treat benchmarks as a package
@@ -0,0 +1,135 @@
+"""Shared helpers for the benchmark scripts.
+
+Benchmarks run from the backend_FastAPI directory, e.g.
+    python -m benchmarks.word_stats
+and always work on a throwaway SQLite file, never on words.db.
+"""
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+
+from database import Base
+from models import Word, Group, WordGroup, StudyActivity, StudySession, WordReviewItem
+from stats import rebuild_word_stats
+
+
+def temp_database_path(name="bench"):
+    fd, path = tempfile.mkstemp(prefix=f"{name}_", suffix=".db")
+    os.close(fd)
+    return path
+
+
+def make_engine(path):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def make_async_engine(path):
+    return create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+
+def populate(engine, words=1000, groups=10, sessions=100, reviews_per_session=50, seed=42):
+    """Fill an empty database with reproducible synthetic rows"""
+    rng = random.Random(seed)
+    start = datetime.utcnow() - timedelta(days=90)
+
+    with engine.begin() as conn:
+        conn.execute(insert(StudyActivity), [
+            {"id": 1, "name": "Vocabulary Quiz", "thumbnail": "/t.png", "description": "", "url": "/"}
+        ])
+        conn.execute(insert(Group), [
+            {"id": g, "name": f"Group {g}"} for g in range(1, groups + 1)
+        ])
+        conn.execute(insert(Word), [
+            {"id": w, "korean": f"단어{w}", "transliteration": f"daneo{w}", "english": f"word {w}", "parts": {}}
+            for w in range(1, words + 1)
+        ])
+        conn.execute(insert(WordGroup), [
+            {"word_id": w, "group_id": (w % groups) + 1} for w in range(1, words + 1)
+        ])
+        conn.execute(insert(StudySession), [
+            {
+                "id": s,
+                "group_id": (s % groups) + 1,
+                "study_activity_id": 1,
+                "created_at": start + timedelta(minutes=s * 30),
+                "ended_at": start + timedelta(minutes=s * 30 + 15),
+            }
+            for s in range(1, sessions + 1)
+        ])
+        conn.execute(insert(WordReviewItem), [
+            {
+                "word_id": rng.randint(1, words),
+                "study_session_id": s,
+                "correct": rng.random() < 0.75,
+                "created_at": start + timedelta(minutes=s * 30 + rng.randint(0, 14)),
+            }
+            for s in range(1, sessions + 1)
+            for _ in range(reviews_per_session)
+        ])
+
+    with Session(engine) as db:
+        rebuild_word_stats(db)
+        db.commit()
+
+
+class QueryCounter:
+    """Count the SQL statements an engine executes inside a with-block"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.count = 0
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
+
+
+def time_calls(fn, repeat=20):
+    """Call fn repeat times and return the latencies in milliseconds"""
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+async def time_calls_async(fn, repeat=20):
+    """Await fn() repeat times and return the latencies in milliseconds"""
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fn()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies):
+    return {
+        "mean_ms": round(statistics.mean(latencies), 3),
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
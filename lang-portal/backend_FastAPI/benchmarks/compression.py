@@ -0,0 +1,94 @@
+"""Benchmark: response size and latency per Accept-Encoding.
+
+Drives the ASGI app in-process through httpx and, for the catalog
+endpoints (served from precompressed cache entries) and a few list
+endpoints (compressed on the fly by CompressionMiddleware), reports the
+bytes on the wire and the p50 latency without compression, with gzip and,
+when the brotli package is installed, with br.
+
+Usage (from backend_FastAPI):
+    python -m benchmarks.compression --requests 200
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+
+# Point the app at a throwaway database before anything imports database.py
+_fd, DB_PATH = tempfile.mkstemp(prefix="compression_", suffix=".db")
+os.close(_fd)
+os.environ["LANG_PORTAL_DB"] = DB_PATH
+os.environ["LANG_PORTAL_WARMUP"] = "off"
+
+import httpx  # noqa: E402
+
+from benchmarks.common import make_engine, populate, summarize, time_calls_async  # noqa: E402
+from compression import ENCODINGS  # noqa: E402
+
+ENDPOINTS = [
+    # (path, query params, catalog)
+    ("/api/groups", None, True),
+    ("/api/study_activities", None, True),
+    ("/api/words", {"page": 1}, False),
+    ("/api/groups/1/words", None, False),
+    ("/api/study_sessions", {"page": 1}, False),
+]
+
+
+async def measure(client, path, params, encoding, requests):
+    headers = {"Accept-Encoding": encoding}
+    response = await client.get(path, params=params, headers=headers)
+    response.raise_for_status()
+    wire_bytes = response.num_bytes_downloaded
+    used = response.headers.get("content-encoding", "identity")
+
+    async def call():
+        (await client.get(path, params=params, headers=headers)).raise_for_status()
+
+    return used, wire_bytes, summarize(await time_calls_async(call, requests))
+
+
+async def run(args):
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"  {'endpoint':<28} {'encoding':<9} {'bytes':>8} {'ratio':>6} {'p50':>9} {'p99':>9}")
+        for path, params, catalog in ENDPOINTS:
+            label = path + ("?" + "&".join(f"{k}={v}" for k, v in params.items()) if params else "")
+            identity_bytes = None
+            for encoding in ("identity",) + ENCODINGS:
+                used, wire_bytes, result = await measure(client, path, params, encoding, args.requests)
+                identity_bytes = identity_bytes or wire_bytes
+                source = " (precompressed)" if catalog and used != "identity" else ""
+                print(f"  {label:<28} {used:<9} {wire_bytes:>8} {wire_bytes / identity_bytes:>6.2f} "
+                      f"{result['p50_ms']:>7.2f}ms {result['p99_ms']:>7.2f}ms{source}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, default=2000)
+    parser.add_argument("--groups", type=int, default=50)
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--reviews-per-session", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    try:
+        engine = make_engine(DB_PATH)
+        populate(engine, words=args.words, groups=args.groups, sessions=args.sessions,
+                 reviews_per_session=args.reviews_per_session)
+        engine.dispose()
+        print(f"Dataset: {args.words} words, {args.groups} groups, "
+              f"{args.sessions * args.reviews_per_session} review items; encodings {', '.join(ENCODINGS)}")
+
+        asyncio.run(run(args))
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(DB_PATH + suffix):
+                os.remove(DB_PATH + suffix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark: /api/words latency while /api/dashboard/quick_stats is hammered.
+
+Drives the ASGI app in-process through httpx and reports /api/words
+latency percentiles on an idle server and under a concurrent dashboard
+load, showing whether slow aggregates stall unrelated requests.
+
+Usage (from backend_FastAPI):
+    python -m benchmarks.concurrency --hammers 8 --requests 200
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+# Point the app at a throwaway database before anything imports database.py
+_fd, DB_PATH = tempfile.mkstemp(prefix="concurrency_", suffix=".db")
+os.close(_fd)
+os.environ["LANG_PORTAL_DB"] = DB_PATH
+# quick_stats is cached; with the cache on every hammer request is an
+# in-memory hit and the aggregate this measures never runs
+os.environ["LANG_PORTAL_RESPONSE_CACHE_SIZE"] = "0"
+
+import httpx  # noqa: E402
+
+from benchmarks.common import make_engine, populate, summarize  # noqa: E402
+
+
+async def measure_words(client, requests):
+    latencies = []
+    for i in range(requests):
+        started = time.perf_counter()
+        response = await client.get("/api/words", params={"page": i % 10 + 1})
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+
+async def hammer(client, stop):
+    calls = 0
+    while not stop.is_set():
+        response = await client.get("/api/dashboard/quick_stats")
+        response.raise_for_status()
+        calls += 1
+        # A request that never awaits I/O would never hand the loop back
+        await asyncio.sleep(0)
+    return calls
+
+
+async def run(args):
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        idle = await measure_words(client, args.requests)
+
+        stop = asyncio.Event()
+        hammers = [asyncio.create_task(hammer(client, stop)) for _ in range(args.hammers)]
+        started = time.perf_counter()
+        loaded = await measure_words(client, args.requests)
+        stop.set()
+        calls = sum(await asyncio.gather(*hammers))
+        elapsed = time.perf_counter() - started
+
+    for label, latencies in (("idle", idle), (f"{args.hammers} hammers", loaded)):
+        result = summarize(latencies)
+        print(f"  /api/words {label:<12} mean={result['mean_ms']}ms "
+              f"p50={result['p50_ms']}ms p99={result['p99_ms']}ms")
+    print(f"  quick_stats throughput under load: {calls / elapsed:.1f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, default=2000)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--reviews-per-session", type=int, default=150)
+    parser.add_argument("--hammers", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    try:
+        engine = make_engine(DB_PATH)
+        populate(engine, words=args.words, sessions=args.sessions,
+                 reviews_per_session=args.reviews_per_session)
+        engine.dispose()
+        print(f"Dataset: {args.words} words, {args.sessions * args.reviews_per_session} review items")
+
+        asyncio.run(run(args))
+    finally:
+        os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    main()
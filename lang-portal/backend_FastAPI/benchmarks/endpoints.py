@@ -0,0 +1,272 @@
+"""Benchmark: latency, throughput and SQL query count per API endpoint.
+
+Drives the ASGI app in-process through httpx against fixed synthetic
+databases (synthetic.generate_dataset with a fixed seed and end date) of
+several sizes. Each size runs in its own subprocess, because database.py
+binds LANG_PORTAL_DB at import time. Generated databases are kept in
+--data-dir and copied for every run, so the POST endpoints never change
+the data the next run sees. The response cache is disabled unless
+--cache is given, so the handlers themselves are measured. Every endpoint
+is measured in --rounds interleaved rounds and keeps its fastest round,
+which filters out stretches where the machine was busy elsewhere.
+
+--save writes the results as a JSON baseline; --compare reads one back
+and flags endpoints whose p50 latency grew by more than --threshold or
+that now issue more SQL queries, exiting with status 1.
+
+Usage (from backend_FastAPI):
+    python -m benchmarks.endpoints --sizes small,medium --save baseline.json
+    python -m benchmarks.endpoints --sizes small,medium --compare baseline.json --threshold 0.25
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from benchmarks.common import QueryCounter, make_engine, summarize, temp_database_path
+
+DATASETS = {
+    "small": {"words": 1000, "groups": 20, "sessions": 200, "reviews_per_session": 50},
+    "medium": {"words": 5000, "groups": 50, "sessions": 2000, "reviews_per_session": 50},
+    "large": {"words": 5000, "groups": 50, "sessions": 20000, "reviews_per_session": 50},
+}
+DATASET_SEED = 42
+DATASET_END = datetime(2026, 1, 1)
+
+# (method, path, query params, JSON body); ids 1 exist in every dataset
+ENDPOINTS = [
+    ("GET", "/api/words", {"page": 1}, None),
+    ("GET", "/api/words", {"page": 5, "sort_by": "accuracy", "order": "desc"}, None),
+    ("GET", "/api/words/1", None, None),
+    ("GET", "/api/words/search", {"q": "river"}, None),
+    ("GET", "/api/words/autocomplete", {"q": "ㄱ"}, None),
+    ("GET", "/api/groups", None, None),
+    ("GET", "/api/groups/1", None, None),
+    ("GET", "/api/groups/1/words", None, None),
+    ("GET", "/api/groups/1/study_sessions", None, None),
+    ("GET", "/api/study_activities", None, None),
+    ("GET", "/api/study_activities/1", None, None),
+    ("GET", "/api/study_activities/1/study_sessions", None, None),
+    ("GET", "/api/study_sessions", {"page": 1}, None),
+    ("GET", "/api/study_session/1", None, None),
+    ("GET", "/api/study_session/1/words", None, None),
+    ("GET", "/api/study_sessions/1/next_words", None, None),
+    ("GET", "/api/dashboard/last_study_session", None, None),
+    ("GET", "/api/dashboard/study_progress", None, None),
+    ("GET", "/api/dashboard/quick_stats", None, None),
+    ("POST", "/api/study_sessions/1/words/1/review", None, {"correct": True}),
+    ("POST", "/api/study_sessions/1/reviews", None,
+     [{"word_id": word_id, "correct": word_id % 4 != 0} for word_id in range(1, 21)]),
+]
+
+
+def endpoint_label(method, path, params):
+    query = "&".join(f"{key}={value}" for key, value in (params or {}).items())
+    return f"{method} {path}" + (f"?{query}" if query else "")
+
+
+def dataset_path(data_dir, size):
+    spec = DATASETS[size]
+    name = "_".join(f"{value}" for value in spec.values())
+    return os.path.join(data_dir, f"endpoints_{size}_{name}_{DATASET_SEED}.db")
+
+
+def ensure_dataset(data_dir, size):
+    """Generate the dataset for size unless a copy is already in data_dir"""
+    path = dataset_path(data_dir, size)
+    if os.path.exists(path):
+        return path
+
+    from synthetic import generate_dataset
+
+    os.makedirs(data_dir, exist_ok=True)
+    building = temp_database_path(f"endpoints_{size}")
+    engine = make_engine(building)
+    with Session(engine) as db:
+        report = generate_dataset(db, seed=DATASET_SEED, end=DATASET_END, **DATASETS[size])
+    engine.dispose()
+    shutil.move(building, path)
+    print(f"Generated {size} dataset: {report['words']} words, {report['reviews']} reviews "
+          f"in {report['total_ms'] / 1000:.1f}s")
+    return path
+
+
+# Worker side: runs in a subprocess with LANG_PORTAL_DB pointing at a copy
+async def measure(client, counter, method, path, params, body, repeat, warmup):
+    async def call():
+        response = await client.request(method, path, params=params, json=body)
+        response.raise_for_status()
+        return response
+
+    for _ in range(warmup):
+        await call()
+
+    with counter:
+        response = await call()
+    queries = counter.count
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        call_started = time.perf_counter()
+        await call()
+        latencies.append((time.perf_counter() - call_started) * 1000)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "status": response.status_code,
+        "queries": queries,
+        **summarize(latencies),
+        "throughput_rps": round(repeat / elapsed, 1),
+    }
+
+
+async def run_worker(args):
+    import httpx
+    from database import async_engine
+    from main import app
+
+    counter = QueryCounter(async_engine.sync_engine)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    # The lifespan prepares the database (backfills, search and autocomplete indexes)
+    async with app.router.lifespan_context(app), \
+            httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(args.rounds):
+            for method, path, params, body in ENDPOINTS:
+                label = endpoint_label(method, path, params)
+                result = await measure(client, counter, method, path, params, body, args.repeat, args.warmup)
+                if label not in results or result["p50_ms"] < results[label]["p50_ms"]:
+                    results[label] = result
+    await async_engine.dispose()
+    return results
+
+
+def run_size(size, args):
+    """Benchmark one dataset size in a fresh interpreter and return its results"""
+    source = ensure_dataset(args.data_dir, size)
+    path = temp_database_path(f"endpoints_{size}")
+    shutil.copyfile(source, path)
+    fd, output = tempfile.mkstemp(prefix="endpoints_", suffix=".json")
+    os.close(fd)
+
+    env = dict(os.environ, LANG_PORTAL_DB=path)
+    if not args.cache:
+        env["LANG_PORTAL_RESPONSE_CACHE_SIZE"] = "0"
+    try:
+        subprocess.run([
+            sys.executable, "-m", "benchmarks.endpoints", "--worker", "--output", output,
+            "--repeat", str(args.repeat), "--warmup", str(args.warmup), "--rounds", str(args.rounds),
+        ], env=env, check=True)
+        with open(output) as f:
+            return json.load(f)
+    finally:
+        os.remove(output)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+# Reporting and baselines
+def print_results(size, results):
+    print(f"\n{size} ({', '.join(f'{key}={value}' for key, value in DATASETS[size].items())})")
+    print(f"  {'endpoint':<58} {'queries':>7} {'p50':>9} {'p95':>9} {'p99':>9} {'req/s':>8}")
+    for label, result in results.items():
+        print(f"  {label:<58} {result['queries']:>7} {result['p50_ms']:>7.2f}ms "
+              f"{result['p95_ms']:>7.2f}ms {result['p99_ms']:>7.2f}ms {result['throughput_rps']:>8}")
+
+
+def compare(baseline, current, threshold, min_delta_ms):
+    """Return regression messages for endpoints present in both runs"""
+    regressions = []
+    for size, results in current.items():
+        for label, result in results.items():
+            before = baseline.get(size, {}).get(label)
+            if before is None:
+                continue
+
+            delta_ms = result["p50_ms"] - before["p50_ms"]
+            if delta_ms > min_delta_ms and result["p50_ms"] > before["p50_ms"] * (1 + threshold):
+                regressions.append(
+                    f"{size} {label}: p50 {before['p50_ms']}ms -> {result['p50_ms']}ms "
+                    f"(+{delta_ms / before['p50_ms']:.0%})"
+                )
+            if result["queries"] > before["queries"]:
+                regressions.append(f"{size} {label}: queries {before['queries']} -> {result['queries']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="small,medium",
+                        help=f"comma separated, from {', '.join(DATASETS)}")
+    parser.add_argument("--repeat", type=int, default=30, help="requests per endpoint per round")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--cache", action="store_true", help="leave the response cache on")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "lang_portal_benchmarks"))
+    parser.add_argument("--save", help="write the results to this JSON baseline")
+    parser.add_argument("--compare", help="flag regressions against this JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative p50 growth")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5,
+                        help="ignore p50 changes smaller than this, whatever the ratio")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        with open(args.output, "w") as f:
+            json.dump(asyncio.run(run_worker(args)), f)
+        return
+
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    unknown = sorted(set(sizes) - set(DATASETS))
+    if unknown:
+        parser.error(f"unknown sizes {unknown}, expected some of {list(DATASETS)}")
+
+    results = {}
+    for size in sizes:
+        results[size] = run_size(size, args)
+        print_results(size, results[size])
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "meta": {
+                    "created_at": datetime.utcnow().isoformat() + "Z",
+                    "python": platform.python_version(),
+                    "sqlite": sqlite3.sqlite_version,
+                    "platform": platform.platform(),
+                    "repeat": args.repeat,
+                    "rounds": args.rounds,
+                    "cache": args.cache,
+                    "datasets": {size: DATASETS[size] for size in sizes},
+                },
+                "results": results,
+            }, f, indent=2)
+        print(f"\nBaseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(baseline, results, args.threshold, args.min_delta_ms)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.compare}:")
+            for message in regressions:
+                print(f"  {message}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.compare} (threshold {args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
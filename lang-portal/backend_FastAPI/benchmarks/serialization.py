@@ -0,0 +1,162 @@
+"""Benchmark: building and encoding a 100-item list page, before and after responses.py.
+
+For a page of words (/api/words, /api/groups/:id/words) and a page of
+study sessions (/api/study_sessions and the per-group and per-activity
+listings) it times, per page:
+- fetch: loading the rows (ORM entities, plus the per-session review
+  counts the session listings used to run, vs plain column tuples)
+- serialize: rows to response bytes (Pydantic models or dicts through
+  jsonable_encoder and json.dumps, as FastAPI does for a returned dict,
+  vs project()/session_items() and ORJSONResponse)
+
+Usage (from backend_FastAPI):
+    python -m benchmarks.serialization --words 5000 --sessions 2000
+"""
+import argparse
+import os
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload
+
+import responses
+from benchmarks.common import make_engine, populate, summarize, temp_database_path, time_calls
+from migrator import migrate
+from models import StudySession, Word, WordReviewItem, WordReviewStats
+from pagination import create_pagination
+from responses import WORD_COLUMNS, WORD_FIELDS, ORJSONResponse, project, session_items, session_list_select
+from schemas import WordResponse
+
+
+def words_before(engine, items_per_page):
+    with Session(engine) as db:
+        return db.execute(select(Word, WordReviewStats).outerjoin(
+            WordReviewStats, WordReviewStats.word_id == Word.id
+        ).order_by(Word.id).limit(items_per_page)).all()
+
+
+def words_after(engine, items_per_page):
+    with Session(engine) as db:
+        return db.execute(select(*WORD_COLUMNS, Word.id).outerjoin(
+            WordReviewStats, WordReviewStats.word_id == Word.id
+        ).order_by(Word.id).limit(items_per_page)).all()
+
+
+def sessions_before(engine, items_per_page):
+    with Session(engine) as db:
+        sessions = db.scalars(select(StudySession).options(
+            joinedload(StudySession.activity), joinedload(StudySession.group)
+        ).order_by(StudySession.id).limit(items_per_page)).all()
+        return [
+            (session, db.scalar(select(func.count(WordReviewItem.study_session_id)).where(
+                WordReviewItem.study_session_id == session.id
+            )))
+            for session in sessions
+        ]
+
+
+def sessions_after(engine, items_per_page):
+    with Session(engine) as db:
+        return db.execute(session_list_select().order_by(StudySession.id).limit(items_per_page)).all()
+
+
+def encode_words_before(rows, pagination):
+    items = [
+        WordResponse(
+            korean=word.korean,
+            transliteration=word.transliteration,
+            english=word.english,
+            correct_count=stats.correct_count if stats else 0,
+            wrong_count=stats.wrong_count if stats else 0
+        )
+        for word, stats in rows
+    ]
+    return JSONResponse(jsonable_encoder({"items": items, "pagination": pagination})).body
+
+
+def encode_sessions_before(rows, pagination):
+    items = [
+        {
+            "id": session.id,
+            "activity_name": session.activity.name,
+            "group_name": session.group.name,
+            "start_time": session.created_at.isoformat() + "Z",
+            "end_time": (session.ended_at or datetime.utcnow()).isoformat() + "Z",
+            "review_items_count": review_count
+        }
+        for session, review_count in rows
+    ]
+    return JSONResponse(jsonable_encoder({"items": items, "pagination": pagination})).body
+
+
+def encode_words_after(rows, pagination):
+    return ORJSONResponse({"items": project(rows, WORD_FIELDS), "pagination": pagination}).body
+
+
+def encode_sessions_after(rows, pagination):
+    return ORJSONResponse({"items": session_items(rows), "pagination": pagination}).body
+
+
+def report(label, latencies, baseline=None):
+    result = summarize(latencies)
+    speedup = f" ({baseline / result['p50_ms']:.1f}x)" if baseline else ""
+    print(f"    {label:<34} p50={result['p50_ms'] * 1000:>7.0f}us "
+          f"p99={result['p99_ms'] * 1000:>7.0f}us{speedup}")
+    return result["p50_ms"]
+
+
+def compare(name, engine, fetch_before, fetch_after, encode_before, encode_after, args):
+    pagination = create_pagination(1, 1000, args.items_per_page)
+    before_rows = fetch_before(engine, args.items_per_page)
+    after_rows = fetch_after(engine, args.items_per_page)
+    page_bytes = len(encode_after(after_rows, pagination))
+    print(f"\n  {name}: {len(after_rows)} items, {page_bytes / 1024:.1f} KB per page")
+
+    print("  fetch")
+    baseline = report("before (entities)", time_calls(lambda: fetch_before(engine, args.items_per_page), args.repeat))
+    report("after (column tuples)", time_calls(lambda: fetch_after(engine, args.items_per_page), args.repeat), baseline)
+
+    print("  serialize")
+    baseline = report("before (jsonable_encoder + json)",
+                      time_calls(lambda: encode_before(before_rows, pagination), args.repeat))
+    report("after (orjson)", time_calls(lambda: encode_after(after_rows, pagination), args.repeat), baseline)
+
+    # The fallback used when orjson isn't installed
+    orjson, responses.orjson = responses.orjson, None
+    try:
+        report("after (json fallback)", time_calls(lambda: encode_after(after_rows, pagination), args.repeat), baseline)
+    finally:
+        responses.orjson = orjson
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, default=5000)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--reviews-per-session", type=int, default=50)
+    parser.add_argument("--items-per-page", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    path = temp_database_path("serialization")
+    try:
+        engine = make_engine(path)
+        populate(engine, words=args.words, sessions=args.sessions,
+                 reviews_per_session=args.reviews_per_session)
+        # The indexes the app has, e.g. word_review_items(study_session_id)
+        migrate(engine, verify=False)
+        print(f"{args.items_per_page}-item pages, {args.repeat} runs each, "
+              f"orjson {'installed' if responses.orjson else 'not installed'}")
+        compare("words", engine, words_before, words_after,
+                encode_words_before, encode_words_after, args)
+        compare("study sessions", engine, sessions_before, sessions_after,
+                encode_sessions_before, encode_sessions_after, args)
+        engine.dispose()
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
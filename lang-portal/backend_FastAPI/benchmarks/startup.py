@@ -0,0 +1,165 @@
+"""Benchmark: cold start to first response, with and without the warm-up.
+
+Starts the app in a fresh interpreter per run, the way a restarted
+uvicorn worker does: import main, run the lifespan, then GET every
+endpoint of benchmarks.endpoints once (first request) and --repeat more
+times (steady state). The database file is evicted from the OS page
+cache before each run unless --keep-os-cache is given. The first boot of
+a fresh copy creates the schema and stamps it; the restarts after it
+take the fast path, so both are reported. The response cache is disabled
+unless --cache is given, otherwise the warm-up would leave cached
+responses behind and the first requests would measure the cache.
+
+Usage (from backend_FastAPI):
+    python -m benchmarks.startup --size medium --runs 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import percentile, summarize, temp_database_path
+from benchmarks.endpoints import DATASETS, ENDPOINTS, endpoint_label, ensure_dataset
+
+
+# Worker side: runs in a subprocess with LANG_PORTAL_DB pointing at a copy
+async def run_worker(args):
+    started = time.perf_counter()
+    import httpx
+    from main import app
+    imported = time.perf_counter()
+
+    results = {"import_ms": round((imported - started) * 1000, 1)}
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        results["lifespan_ms"] = round((ready - imported) * 1000, 1)
+        results["phases_ms"] = app.state.startup_ms
+        # Includes interpreter start-up, which import_ms and lifespan_ms leave out
+        results["spawn_to_ready_ms"] = round((time.time() - args.spawned_at) * 1000, 1)
+
+        endpoints = [(method, path, params) for method, path, params, _ in ENDPOINTS if method == "GET"]
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            first, steady = {}, {}
+            for method, path, params in endpoints:
+                call_started = time.perf_counter()
+                (await client.get(path, params=params)).raise_for_status()
+                first[endpoint_label(method, path, params)] = (time.perf_counter() - call_started) * 1000
+                if len(first) == 1:
+                    results["spawn_to_first_response_ms"] = round((time.time() - args.spawned_at) * 1000, 1)
+
+            for _ in range(args.repeat):
+                for method, path, params in endpoints:
+                    call_started = time.perf_counter()
+                    (await client.get(path, params=params)).raise_for_status()
+                    steady.setdefault(endpoint_label(method, path, params), []).append(
+                        (time.perf_counter() - call_started) * 1000
+                    )
+
+        results["first_ms"] = {label: round(ms, 2) for label, ms in first.items()}
+        results["steady_p50_ms"] = {label: summarize(values)["p50_ms"] for label, values in steady.items()}
+    return results
+
+
+# Parent side
+def evict_from_os_cache(path):
+    """Drop the file's pages from the OS page cache"""
+    for suffix in ("", "-wal", "-shm"):
+        if not os.path.exists(path + suffix):
+            continue
+        fd = os.open(path + suffix, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+
+
+def run_once(path, warmup, args):
+    if not args.keep_os_cache:
+        evict_from_os_cache(path)
+    fd, output = tempfile.mkstemp(prefix="startup_", suffix=".json")
+    os.close(fd)
+
+    env = dict(os.environ, LANG_PORTAL_DB=path, LANG_PORTAL_WARMUP="on" if warmup else "off")
+    if not args.cache:
+        env["LANG_PORTAL_RESPONSE_CACHE_SIZE"] = "0"
+    try:
+        subprocess.run([
+            sys.executable, "-m", "benchmarks.startup", "--worker", "--output", output,
+            "--repeat", str(args.repeat), "--spawned-at", repr(time.time()),
+        ], env=env, check=True)
+        with open(output) as f:
+            return json.load(f)
+    finally:
+        os.remove(output)
+
+
+def run_mode(source, warmup, args):
+    """First boot of a fresh copy, then --runs restarts against it"""
+    path = temp_database_path("startup")
+    shutil.copyfile(source, path)
+    try:
+        first_boot = run_once(path, warmup, args)
+        restarts = [run_once(path, warmup, args) for _ in range(args.runs)]
+        return first_boot, restarts
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+def median(values):
+    return round(percentile(values, 50), 2)
+
+
+def print_mode(label, first_boot, restarts):
+    print(f"\nwarm-up {label}")
+    print(f"  {'':<28} {'first boot':>11} {'restart p50':>12}")
+    for key in ("import_ms", "lifespan_ms", "spawn_to_ready_ms", "spawn_to_first_response_ms"):
+        print(f"  {key:<28} {first_boot[key]:>9.1f}ms {median([run[key] for run in restarts]):>10.1f}ms")
+    for phase in first_boot["phases_ms"]:
+        print(f"    {phase:<26} {first_boot['phases_ms'][phase]:>9.1f}ms "
+              f"{median([run['phases_ms'][phase] for run in restarts]):>10.1f}ms")
+
+    print(f"  {'endpoint (restarts)':<58} {'first':>9} {'steady':>9}")
+    for endpoint in first_boot["first_ms"]:
+        print(f"  {endpoint:<58} {median([run['first_ms'][endpoint] for run in restarts]):>7.2f}ms "
+              f"{median([run['steady_p50_ms'][endpoint] for run in restarts]):>7.2f}ms")
+    total = median([sum(run["first_ms"].values()) for run in restarts])
+    print(f"  {'all first requests':<58} {total:>7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="medium", choices=list(DATASETS))
+    parser.add_argument("--runs", type=int, default=5, help="restarts per mode after the first boot")
+    parser.add_argument("--repeat", type=int, default=10, help="steady-state requests per endpoint")
+    parser.add_argument("--modes", default="off,on", help="warm-up modes to compare")
+    parser.add_argument("--cache", action="store_true", help="leave the response cache on")
+    parser.add_argument("--keep-os-cache", action="store_true", help="don't evict the database file between runs")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "lang_portal_benchmarks"))
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    parser.add_argument("--spawned-at", type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        with open(args.output, "w") as f:
+            json.dump(asyncio.run(run_worker(args)), f)
+        return
+
+    source = ensure_dataset(args.data_dir, args.size)
+    print(f"{args.size} ({', '.join(f'{key}={value}' for key, value in DATASETS[args.size].items())}), "
+          f"{args.runs} restarts per mode, OS cache {'kept' if args.keep_os_cache else 'evicted'}")
+    for mode in [mode.strip() for mode in args.modes.split(",") if mode.strip()]:
+        print_mode(mode, *run_mode(source, mode == "on", args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Benchmark: group / study-state set queries, SQL joins vs membership bitmaps.
+
+Each query ("in groups A and B, never reviewed", "in A or B but not C",
+...) is answered three ways:
+- sql: one EXISTS / NOT EXISTS subquery per group and for the reviews,
+  COUNT plus the first page of ids ordered by id
+- bitmap: MembershipIndex.query() plus bit_count(), the set operations alone
+- bitmap + page: the same plus the first page of ids from iter_ids(), what
+  GET /api/words/query does before reading the page of words
+
+Every word is put in a second group so that intersections aren't empty.
+
+Usage (from backend_FastAPI):
+    python -m benchmarks.word_queries --words 5000 --groups 50
+"""
+import argparse
+import os
+from itertools import islice
+
+from sqlalchemy import text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from benchmarks.common import make_engine, populate, summarize, temp_database_path, time_calls
+from membership import MembershipIndex, iter_ids
+from migrator import migrate
+from models import WordGroup
+
+IN_GROUP = "EXISTS (SELECT 1 FROM words_groups l WHERE l.word_id = w.id AND l.group_id = {})"
+REVIEWED = "EXISTS (SELECT 1 FROM word_review_items r WHERE r.word_id = w.id)"
+
+QUERIES = [
+    # (label, MembershipIndex.query() arguments)
+    ("in A and B", dict(in_all=(1, 2))),
+    ("in A and B, never reviewed", dict(in_all=(1, 2), studied=False)),
+    ("in A or B or C, reviewed", dict(in_any=(1, 2, 3), studied=True)),
+    ("in A or B, not in C", dict(in_any=(1, 2), not_in=(3,))),
+    ("not in A, never reviewed", dict(not_in=(1,), studied=False)),
+]
+
+
+def where_clause(in_all=(), in_any=(), not_in=(), studied=None):
+    conditions = [IN_GROUP.format(group_id) for group_id in in_all]
+    if in_any:
+        conditions.append("(" + " OR ".join(IN_GROUP.format(group_id) for group_id in in_any) + ")")
+    conditions += ["NOT " + IN_GROUP.format(group_id) for group_id in not_in]
+    if studied is not None:
+        conditions.append(REVIEWED if studied else "NOT " + REVIEWED)
+    return " AND ".join(conditions) or "1"
+
+
+def add_second_groups(engine, words, groups):
+    with engine.begin() as conn:
+        conn.execute(sqlite_insert(WordGroup).on_conflict_do_nothing(), [
+            {"word_id": w, "group_id": (w // groups % groups) + 1} for w in range(1, words + 1)
+        ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, default=5000)
+    parser.add_argument("--groups", type=int, default=50)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--reviews-per-session", type=int, default=20)
+    parser.add_argument("--items-per-page", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    path = temp_database_path("word_queries")
+    try:
+        engine = make_engine(path)
+        populate(engine, words=args.words, groups=args.groups, sessions=args.sessions,
+                 reviews_per_session=args.reviews_per_session)
+        migrate(engine, verify=False)
+        add_second_groups(engine, args.words, args.groups)
+
+        index = MembershipIndex()
+        with Session(engine) as db:
+            load = summarize(time_calls(lambda: index.load(db), 5))
+        print(f"{args.words} words, {args.groups} groups, {args.sessions * args.reviews_per_session} reviews; "
+              f"load {load['p50_ms']:.1f}ms, {sum(len(hex(bitmap)) // 2 for bitmap in index.groups.values()) / 1024:.1f} "
+              f"KB of group bitmaps")
+        print(f"  {'query':<30} {'matches':>8} {'sql':>10} {'bitmap':>10} {'+ page':>10}")
+
+        with engine.connect() as conn:
+            for label, query in QUERIES:
+                where = where_clause(**query)
+                count_sql = text(f"SELECT count(*) FROM words w WHERE {where}")
+                page_sql = text(f"SELECT id FROM words w WHERE {where} ORDER BY id LIMIT {args.items_per_page}")
+
+                def sql():
+                    return conn.execute(count_sql).scalar(), conn.execute(page_sql).scalars().all()
+
+                def bitmap():
+                    return index.query(**query).bit_count()
+
+                def bitmap_page():
+                    matches = index.query(**query)
+                    return matches.bit_count(), list(islice(iter_ids(matches), args.items_per_page))
+
+                total, page = sql()
+                assert bitmap_page() == (total, page), label
+                sql_us = summarize(time_calls(sql, args.repeat))["p50_ms"] * 1000
+                bitmap_us = summarize(time_calls(bitmap, args.repeat))["p50_ms"] * 1000
+                page_us = summarize(time_calls(bitmap_page, args.repeat))["p50_ms"] * 1000
+                print(f"  {label:<30} {total:>8} {sql_us:>8.0f}us {bitmap_us:>8.0f}us {page_us:>8.0f}us")
+        engine.dispose()
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+if __name__ == "__main__":
+    main()
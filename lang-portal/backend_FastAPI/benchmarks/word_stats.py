@@ -0,0 +1,99 @@
+"""Benchmark: per-row get_word_stats vs the set-based stats.get_word_stats_bulk.
+
+Usage (from backend_FastAPI):
+    python -m benchmarks.word_stats --words 5000 --reviews-per-session 200
+"""
+import argparse
+import asyncio
+import os
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.common import (
+    temp_database_path, make_engine, make_async_engine, populate,
+    QueryCounter, time_calls, time_calls_async, summarize
+)
+from models import Word, WordReviewItem
+from stats import get_word_stats_bulk
+
+
+def legacy_get_word_stats(db, word_id):
+    """The per-word implementation the routers used before stats.py"""
+    correct_count = db.query(func.count(WordReviewItem.word_id)).filter(
+        WordReviewItem.word_id == word_id,
+        WordReviewItem.correct == True
+    ).scalar() or 0
+
+    wrong_count = db.query(func.count(WordReviewItem.word_id)).filter(
+        WordReviewItem.word_id == word_id,
+        WordReviewItem.correct == False
+    ).scalar() or 0
+
+    return correct_count, wrong_count
+
+
+def page_before(db, offset, items_per_page):
+    words = db.query(Word).offset(offset).limit(items_per_page).all()
+    return [legacy_get_word_stats(db, word.id) for word in words]
+
+
+async def page_after(db, offset, items_per_page):
+    words = (await db.scalars(select(Word).offset(offset).limit(items_per_page))).all()
+    stats = await get_word_stats_bulk(db, [word.id for word in words])
+    return [stats[word.id] for word in words]
+
+
+def report(label, query_count, latencies):
+    result = summarize(latencies)
+    print(f"  {label:<18} queries/page={query_count:<4} "
+          f"mean={result['mean_ms']}ms p50={result['p50_ms']}ms p99={result['p99_ms']}ms")
+
+
+async def run_after(path, args):
+    async_engine = make_async_engine(path)
+    async with AsyncSession(async_engine) as db:
+        with QueryCounter(async_engine.sync_engine) as counter:
+            after = await page_after(db, 0, args.items_per_page)
+        latencies = await time_calls_async(lambda: page_after(db, 0, args.items_per_page), args.repeat)
+        report("after (bulk)", counter.count, latencies)
+    await async_engine.dispose()
+    return after
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, default=2000)
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--reviews-per-session", type=int, default=100)
+    parser.add_argument("--items-per-page", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    path = temp_database_path("word_stats")
+    try:
+        engine = make_engine(path)
+        populate(engine, words=args.words, sessions=args.sessions,
+                 reviews_per_session=args.reviews_per_session)
+        db = sessionmaker(bind=engine)()
+
+        reviews = db.query(func.count(WordReviewItem.id)).scalar()
+        print(f"Dataset: {args.words} words, {reviews} review items, "
+              f"{args.items_per_page} words per page")
+
+        with QueryCounter(engine) as counter:
+            before = page_before(db, 0, args.items_per_page)
+        report("before (per-row)", counter.count,
+               time_calls(lambda: page_before(db, 0, args.items_per_page), args.repeat))
+        db.close()
+        engine.dispose()
+
+        after = asyncio.run(run_after(path, args))
+        assert before == after
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
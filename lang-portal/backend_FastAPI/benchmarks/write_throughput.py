@@ -0,0 +1,122 @@
+"""Benchmark: review write throughput for each database.ENGINE_PROFILES entry.
+
+Each profile gets a fresh database. Concurrent writers then run the same
+transaction as create_word_review (insert a review and bump the word
+counters, then commit) while readers page through /api/words-style
+selects. --buffer sends the writes through a review_buffer.ReviewBuffer
+instead, like LANG_PORTAL_REVIEW_BUFFER does for the endpoint.
+
+Usage (from backend_FastAPI):
+    python -m benchmarks.write_throughput --writers 8 --writes 200
+    python -m benchmarks.write_throughput --buffer durable
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from benchmarks.common import temp_database_path, make_engine, populate, summarize
+from database import ENGINE_PROFILES, build_async_engine
+from models import Word, WordReviewStats
+from review_buffer import ReviewBuffer
+from reviews import write_reviews
+
+
+async def writer(async_engine, buffer, writes, words, sessions, latencies, errors, seed):
+    rng = random.Random(seed)
+    for _ in range(writes):
+        row = {
+            "word_id": rng.randint(1, words),
+            "study_session_id": rng.randint(1, sessions),
+            "correct": rng.random() < 0.75,
+            "created_at": datetime.utcnow(),
+        }
+        started = time.perf_counter()
+        try:
+            if buffer is not None:
+                await buffer.submit(row)
+            else:
+                async with AsyncSession(async_engine) as db:
+                    await write_reviews(db, [row])
+                    await db.commit()
+            latencies.append((time.perf_counter() - started) * 1000)
+        except OperationalError:
+            errors.append(1)
+
+
+async def reader(async_engine, stop, reads):
+    while not stop.is_set():
+        async with AsyncSession(async_engine) as db:
+            await db.execute(
+                select(Word, WordReviewStats)
+                .outerjoin(WordReviewStats, WordReviewStats.word_id == Word.id)
+                .limit(100)
+            )
+        reads.append(1)
+
+
+async def run_profile(profile, args):
+    path = temp_database_path(f"write_{profile}")
+    try:
+        engine = make_engine(path)
+        populate(engine, words=args.words, sessions=args.sessions, reviews_per_session=10)
+        engine.dispose()
+
+        async_engine = build_async_engine(path, profile)
+        buffer = None
+        if args.buffer:
+            buffer = ReviewBuffer(async_sessionmaker(async_engine), durable=args.buffer == "durable")
+            buffer.start()
+        latencies, errors, reads = [], [], []
+        stop = asyncio.Event()
+        readers = [asyncio.create_task(reader(async_engine, stop, reads)) for _ in range(args.readers)]
+
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            writer(async_engine, buffer, args.writes, args.words, args.sessions, latencies, errors, seed)
+            for seed in range(args.writers)
+        ])
+        if buffer is not None:
+            await buffer.stop()
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await asyncio.gather(*readers)
+        await async_engine.dispose()
+
+        result = summarize(latencies) if latencies else {"p50_ms": None, "p99_ms": None}
+        print(f"  {profile:<8} commits/s={len(latencies) / elapsed:8.1f} "
+              f"p50={result['p50_ms']}ms p99={result['p99_ms']}ms "
+              f"locked_errors={len(errors)} reads/s={len(reads) / elapsed:.1f}")
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, default=2000)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=200, help="reviews per writer")
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--buffer", choices=["durable", "async"],
+                        help="write through a ReviewBuffer in this mode")
+    parser.add_argument("--profile", action="append", choices=sorted(ENGINE_PROFILES),
+                        help="profile to run (repeatable, default: all)")
+    args = parser.parse_args()
+
+    print(f"{args.writers} writers x {args.writes} writes, {args.readers} concurrent readers, "
+          f"buffer={args.buffer or 'off'}")
+    for profile in args.profile or sorted(ENGINE_PROFILES):
+        asyncio.run(run_profile(profile, args))
+
+
+if __name__ == "__main__":
+    main()
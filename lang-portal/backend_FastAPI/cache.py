@@ -0,0 +1,289 @@
+import hashlib
+import logging
+import os
+import random
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from compression import negotiate, precompress
+
+# Max number of cached GET responses (route + query string), LRU evicted
+RESPONSE_CACHE_SIZE = int(os.environ.get("LANG_PORTAL_RESPONSE_CACHE_SIZE", "1024"))
+
+# Cache-Control max-age of the precompressed catalog responses, in seconds.
+# 0 (the default) sends no-cache: clients revalidate every time, which costs
+# a 304, and see a new group or activity at once. A max-age lets them skip
+# the request but keep a stale catalog for up to that long.
+CATALOG_MAX_AGE = int(os.environ.get("LANG_PORTAL_CATALOG_MAX_AGE", "0"))
+
+# Busy timeout of the generations connection, in seconds. current() runs on
+# the event loop, so it gives up quickly on a locked database and the request
+# goes uncached instead of stalling every other one.
+GENERATIONS_TIMEOUT = float(os.environ.get("LANG_PORTAL_GENERATIONS_TIMEOUT", "0.05"))
+
+logger = logging.getLogger(__name__)
+
+
+def _table_name(table):
+    return table if isinstance(table, str) else table.__tablename__
+
+
+class TableGenerations:
+    """Per-table write generations, shared by every process on the database.
+
+    A table gets a new random generation in the table_generations table
+    each time a transaction that changed it commits (the bump is part of
+    that transaction), so a response computed from a set of tables is
+    still current while their generations are unchanged, whichever
+    uvicorn worker or invoke task made the write. Random values rather
+    than a counter keep a recreated database from reusing old ETags.
+
+    current() reads them through a connection of its own that never
+    writes. Its PRAGMA data_version only changes when another connection
+    commits, so the rows are read again only after a commit and a
+    request normally costs one PRAGMA.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._connection = None
+        self._data_version = None
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def current(self):
+        """{table name: generation}; tables never written are missing.
+
+        None when they can't be read right now (the database is locked
+        past GENERATIONS_TIMEOUT, or some other error): callers must then
+        neither cache nor serve from a cache, since any generation they
+        assumed could be wrong.
+        """
+        with self._lock:
+            try:
+                if self._connection is None:
+                    # database imports metrics, which imports this module
+                    from database import DATABASE_PATH
+                    self._connection = sqlite3.connect(
+                        self.path or DATABASE_PATH, timeout=GENERATIONS_TIMEOUT,
+                        isolation_level=None, check_same_thread=False
+                    )
+                # Read before the rows: a commit in between shows up as a new
+                # data_version next time and the rows are read again
+                data_version = self._connection.execute("PRAGMA data_version").fetchone()[0]
+                if data_version != self._data_version:
+                    self._generations = dict(self._connection.execute(
+                        "SELECT table_name, generation FROM table_generations"
+                    ))
+                    self._data_version = data_version
+            except sqlite3.DatabaseError as exc:
+                if "no such table" in str(exc):
+                    # Not created yet (the app's startup creates it): nothing
+                    # has been written, so every generation is still the first
+                    return {}
+                logger.warning("table generations unavailable: %s", exc)
+                return None
+            return self._generations
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+            self._connection = None
+            self._data_version = None
+
+
+table_generations = TableGenerations()
+
+
+def mark_changed(db, *tables):
+    """Record that the session's transaction writes these tables (models or names).
+
+    Their generations are bumped in the same transaction, just before it
+    commits, so readers never cache a result under a generation whose data
+    isn't visible yet.
+    """
+    db.info.setdefault("changed_tables", set()).update(_table_name(table) for table in tables)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_generations(session):
+    tables = session.info.pop("changed_tables", None)
+    if not tables:
+        return
+    # models imports database, which imports this module through metrics
+    from models import TableGeneration
+
+    stmt = sqlite_insert(TableGeneration)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[TableGeneration.table_name],
+        set_={"generation": stmt.excluded.generation}
+    )
+    session.execute(stmt, [
+        {"table_name": table, "generation": random.getrandbits(62)} for table in sorted(tables)
+    ])
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changes(session):
+    session.info.pop("changed_tables", None)
+
+
+def cached(*tables, compress_body=False, max_age=None):
+    """Mark a GET endpoint as cacheable for as long as these tables are unchanged.
+
+    compress_body keeps gzip/brotli encodings of the cached body next to it,
+    compressed once at the highest level per version of the tables. A
+    non-zero max_age replaces the default Cache-Control: no-cache; clients
+    then don't see writes for that long, so it is opt-in. Both are meant
+    for the nearly static catalogs. Only takes effect on routers created
+    with route_class=CachedRoute.
+    """
+    def decorator(endpoint):
+        endpoint.__cache_tables__ = tuple(sorted(_table_name(table) for table in tables))
+        endpoint.__cache_compress_body__ = compress_body
+        endpoint.__cache_max_age__ = max_age
+        return endpoint
+    return decorator
+
+
+class ResponseCache:
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (etag, body, media_type, {encoding: body})
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def etag(self, key, tables):
+        """ETag of key under the tables' current generations; None if unknown"""
+        current = table_generations.current()
+        if current is None:
+            return None
+        generations = ",".join(f"{table}:{current.get(table, 0)}" for table in tables)
+        digest = hashlib.sha1(f"{key}|{generations}".encode()).hexdigest()[:16]
+        return f'"{digest}"'
+
+    def get(self, key, etag):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != etag:
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, etag, body, media_type, encoded=None):
+        if self.max_entries <= 0:
+            return
+        self.entries[key] = (etag, body, media_type, encoded or {})
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+        }
+
+
+response_cache = ResponseCache()
+
+
+def _encoded_etag(etag, encoding):
+    # Each encoding of a precompressed body is its own representation
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    if "*" in candidates:
+        return True
+    # Any encoding of the current version is still current
+    return any(
+        candidate.removeprefix("W/") == etag or candidate.removeprefix("W/").startswith(f"{etag[:-1]}-")
+        for candidate in candidates
+    )
+
+
+class CachedRoute(APIRoute):
+    """APIRoute that serves @cached GET endpoints from response_cache.
+
+    A matching If-None-Match gets a 304 and a cached body is replayed
+    without running the endpoint or its dependencies, so neither touches
+    the database.
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+        tables = getattr(self.endpoint, "__cache_tables__", None)
+        if not tables:
+            return handler
+        precompressed = self.endpoint.__cache_compress_body__
+        max_age = self.endpoint.__cache_max_age__
+        cache_control = f"public, max-age={max_age}" if max_age else "no-cache"
+
+        def cached_response(etag, body, media_type, encoded, headers, request):
+            if encoded:
+                headers = {**headers, "Vary": "Accept-Encoding"}
+            encoding = negotiate(request.headers.get("accept-encoding"), encoded)
+            if encoding is None:
+                return Response(content=body, media_type=media_type, headers=headers)
+            return Response(content=encoded[encoding], media_type=media_type, headers={
+                **headers,
+                "ETag": _encoded_etag(etag, encoding),
+                "Content-Encoding": encoding,
+            })
+
+        async def cached_handler(request: Request) -> Response:
+            if request.method != "GET":
+                return await handler(request)
+
+            key = f"{request.url.path}?{sorted(request.query_params.multi_items())}"
+            # Read the generations before the endpoint runs: a write that
+            # commits meanwhile leaves this entry stale under an old ETag
+            etag = response_cache.etag(key, tables)
+            if etag is None:
+                # Can't tell whether a cached body is current: answer fresh
+                response_cache.misses += 1
+                return await handler(request)
+            headers = {"ETag": etag, "Cache-Control": cache_control}
+
+            if _etag_matches(request.headers.get("if-none-match"), etag):
+                response_cache.not_modified += 1
+                return Response(status_code=304, headers=headers)
+
+            entry = response_cache.get(key, etag)
+            if entry is not None:
+                response_cache.hits += 1
+                _, body, media_type, encoded = entry
+                return cached_response(etag, body, media_type, encoded, headers, request)
+
+            response_cache.misses += 1
+            response = await handler(request)
+            if response.status_code != 200:
+                return response
+            if precompressed and response_cache.max_entries > 0:
+                # Compressing at the highest level only pays off when the result is kept
+                encoded = precompress(response.body)
+                response_cache.put(key, etag, response.body, response.media_type, encoded)
+                return cached_response(etag, response.body, response.media_type, encoded, headers, request)
+            response.headers.update(headers)
+            response_cache.put(key, etag, response.body, response.media_type)
+            return response
+
+        return cached_handler
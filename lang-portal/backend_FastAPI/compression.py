@@ -0,0 +1,209 @@
+"""gzip/brotli response compression.
+
+CompressionMiddleware compresses text and JSON responses of at least
+LANG_PORTAL_COMPRESSION_MIN_SIZE bytes (default 500) with the best
+encoding the client accepts: br when the brotli package is installed,
+gzip otherwise. Streaming responses (the review export) are compressed
+chunk by chunk, flushed after each chunk so clients see rows as they
+are sent. Responses that already have a Content-Encoding are left alone;
+that is how the precompressed catalog entries of the response cache
+(cache.cached(compress_body=True)) pass through untouched.
+LANG_PORTAL_COMPRESSION=off turns the middleware off.
+
+Dynamic compression uses cheap levels; precompress() uses the highest
+ones, because it runs once per catalog version rather than per request.
+"""
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+COMPRESSION = os.environ.get("LANG_PORTAL_COMPRESSION", "on") != "off"
+COMPRESSION_MIN_SIZE = int(os.environ.get("LANG_PORTAL_COMPRESSION_MIN_SIZE", "500"))
+
+# Preferred first when the client accepts several equally
+ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+# (dynamic, precompressed) levels: gzip 1-9, brotli quality 0-11
+GZIP_LEVELS = (6, 9)
+BROTLI_QUALITIES = (4, 11)
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+}
+
+compression_stats = {encoding: {"responses": 0, "bytes_in": 0, "bytes_out": 0} for encoding in ENCODINGS}
+
+
+def negotiate(accept_encoding, available=ENCODINGS):
+    """The encoding in available the Accept-Encoding header ranks highest, or None"""
+    if not accept_encoding:
+        return None
+
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in available:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def is_compressible(media_type):
+    media_type = media_type.partition(";")[0].strip().lower()
+    return media_type.startswith("text/") or media_type.endswith("+json") or media_type in COMPRESSIBLE_TYPES
+
+
+def compress(body, encoding, precompressed=False):
+    """body compressed in one go"""
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITIES[precompressed])
+    compressor = zlib.compressobj(GZIP_LEVELS[precompressed], zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(body) + compressor.flush()
+
+
+def precompress(body):
+    """{encoding: bytes} for every encoding that makes body smaller"""
+    if len(body) < COMPRESSION_MIN_SIZE:
+        return {}
+    encoded = {encoding: compress(body, encoding, precompressed=True) for encoding in ENCODINGS}
+    return {encoding: data for encoding, data in encoded.items() if len(data) < len(body)}
+
+
+class _StreamCompressor:
+    def __init__(self, encoding):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITIES[0])
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(GZIP_LEVELS[0], zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data):
+        if self._brotli:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._brotli.finish() if self._brotli else self._zlib.flush()
+
+
+def _weak(etag):
+    # The compressed bytes differ from the identity ones, so the strong
+    # validator no longer applies; cache._etag_matches accepts W/ tags
+    return etag if etag.startswith(b"W/") else b"W/" + etag
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses per Accept-Encoding"""
+
+    def __init__(self, app, minimum_size=COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate(accept_encoding)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = {name.lower(): value for name, value in message.get("headers", [])}
+                passthrough = (
+                    message["status"] in (204, 206, 304)
+                    or b"content-encoding" in headers
+                    or not is_compressible(headers.get(b"content-type", b"").decode("latin-1"))
+                )
+                if passthrough:
+                    await send(message)
+                else:
+                    # Held back until the first body chunk shows whether it's worth it
+                    start = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            stats = compression_stats[encoding]
+
+            if compressor is None:
+                if not more_body:
+                    compressed = compress(body, encoding) if len(body) >= self.minimum_size else body
+                    if len(compressed) >= len(body):
+                        passthrough = True
+                        await send(start)
+                        await send(message)
+                        return
+                    stats["responses"] += 1
+                    stats["bytes_in"] += len(body)
+                    stats["bytes_out"] += len(compressed)
+                    await send(self._compressed_start(start, encoding, len(compressed)))
+                    await send({"type": "http.response.body", "body": compressed})
+                    return
+
+                compressor = _StreamCompressor(encoding)
+                stats["responses"] += 1
+                await send(self._compressed_start(start, encoding, None))
+
+            data = compressor.chunk(body) if body else b""
+            if not more_body:
+                data += compressor.finish()
+            stats["bytes_in"] += len(body)
+            stats["bytes_out"] += len(data)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _compressed_start(start, encoding, content_length):
+        headers = []
+        vary = None
+        for name, value in start.get("headers", []):
+            lowered = name.lower()
+            if lowered == b"content-length":
+                continue
+            if lowered == b"etag":
+                value = _weak(value)
+            if lowered == b"vary":
+                vary = value
+                continue
+            headers.append((name, value))
+        headers.append((b"content-encoding", encoding.encode("ascii")))
+        headers.append((b"vary", vary + b", Accept-Encoding" if vary else b"Accept-Encoding"))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode("ascii")))
+        return {**start, "headers": headers}
@@ -1,20 +1,115 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./words.db"
+from instrumentation import instrument_engine
+from metrics import TimedAsyncQueuePool, TimedQueuePool, track_engine
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# LANG_PORTAL_DB points the app (and benchmarks) at another SQLite file
+DATABASE_PATH = os.environ.get("LANG_PORTAL_DB", "./words.db")
+
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
+ASYNC_SQLALCHEMY_DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_PATH}"
+
+# Engine profiles, selected with LANG_PORTAL_DB_PROFILE.
+# "legacy" keeps SQLite's defaults (rollback journal, synchronous=FULL).
+# "wal" lets readers run alongside the writer, waits on locks instead of
+# failing with "database is locked" and only fsyncs at checkpoints.
+ENGINE_PROFILES = {
+    "legacy": {
+        "pragmas": {},
+        "pool": {},
+    },
+    "wal": {
+        "pragmas": {
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "busy_timeout": 5000,        # ms
+            "cache_size": -64000,        # negative = KiB, ~64 MB page cache
+            "mmap_size": 268435456,      # 256 MB memory-mapped reads
+            "temp_store": "MEMORY",
+        },
+        "pool": {
+            "pool_size": 10,
+            "max_overflow": 20,
+            "pool_timeout": 30,
+        },
+    },
+}
+
+DB_PROFILE = os.environ.get("LANG_PORTAL_DB_PROFILE", "wal")
+
+
+def get_engine_profile(name: str):
+    if name not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown engine profile {name!r}, expected one of {sorted(ENGINE_PROFILES)}")
+    return ENGINE_PROFILES[name]
+
+
+def apply_pragmas(engine, pragmas):
+    """Run the profile's PRAGMAs on every new DBAPI connection"""
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def build_engine(path=DATABASE_PATH, profile=DB_PROFILE):
+    settings = get_engine_profile(profile)
+    sync_engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False},
+        poolclass=TimedQueuePool,
+        **settings["pool"]
+    )
+    apply_pragmas(sync_engine, settings["pragmas"])
+    instrument_engine(sync_engine)
+    track_engine(sync_engine, "sync")
+    return sync_engine
+
+
+def build_async_engine(path=DATABASE_PATH, profile=DB_PROFILE):
+    settings = get_engine_profile(profile)
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{path}", poolclass=TimedAsyncQueuePool, **settings["pool"]
+    )
+    apply_pragmas(async_engine.sync_engine, settings["pragmas"])
+    instrument_engine(async_engine.sync_engine)
+    track_engine(async_engine.sync_engine, "async")
+    return async_engine
+
+
+# Sync engine for tasks.py, seeds and startup schema work
+engine = build_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for the routers; aiosqlite runs each connection on its own
+# thread so queries never block the event loop
+async_engine = build_async_engine()
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
-# Dependency for FastAPI endpoints
+# Dependency for scripts and sync code paths
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+# Dependency for FastAPI endpoints
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,64 @@
+"""Hangul helpers for search: syllable -> jamo decomposition.
+
+A precomposed syllable (U+AC00..U+D7A3) encodes
+    0xAC00 + (initial * 21 + medial) * 28 + final
+so it can be split arithmetically, no lookup tables from Unicode data
+needed. Jamo are emitted as Hangul Compatibility Jamo (ㄱ, ㅏ, ...), the
+characters an IME produces while a syllable is still being typed, and
+compound vowels/finals are split further (ㅘ -> ㅗㅏ, ㄺ -> ㄹㄱ) so that
+partially typed syllables are prefixes of the full ones.
+"""
+
+SYLLABLE_BASE = 0xAC00
+SYLLABLE_LAST = 0xD7A3
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNGSEONG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONGSEONG = ("", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ",
+             "ㄿ", "ㅀ", "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ")
+
+# Compound jamo as typed key by key
+COMPOUND_JAMO = {
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ",
+    "ㄽ": "ㄹㅅ", "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+}
+
+
+def is_syllable(char):
+    return SYLLABLE_BASE <= ord(char) <= SYLLABLE_LAST
+
+
+def is_compatibility_jamo(char):
+    return 0x3131 <= ord(char) <= 0x318E
+
+
+def has_hangul(text):
+    return any(is_syllable(char) or is_compatibility_jamo(char) for char in text)
+
+
+def split_syllable(char):
+    """Return (initial, medial, final) compatibility jamo of one syllable; final may be ''"""
+    index = ord(char) - SYLLABLE_BASE
+    initial, rest = divmod(index, 21 * 28)
+    medial, final = divmod(rest, 28)
+    return CHOSEONG[initial], JUNGSEONG[medial], JONGSEONG[final]
+
+
+# str.translate tables covering every precomposed syllable, built once
+_DECOMPOSE_TABLE = {ord(jamo): parts for jamo, parts in COMPOUND_JAMO.items()}
+_CHOSEONG_TABLE = {}
+for _code in range(SYLLABLE_BASE, SYLLABLE_LAST + 1):
+    _jamo = split_syllable(chr(_code))
+    _DECOMPOSE_TABLE[_code] = "".join(COMPOUND_JAMO.get(jamo, jamo) for jamo in _jamo)
+    _CHOSEONG_TABLE[_code] = _jamo[0]
+
+
+def decompose(text):
+    """Spell text out as basic jamo: '관' -> 'ㄱㅗㅏㄴ'. Other characters pass through."""
+    return text.translate(_DECOMPOSE_TABLE)
+
+
+def choseong(text):
+    """Initial consonant of every syllable: '감사합니다' -> 'ㄱㅅㅎㄴㄷ'. Other characters pass through."""
+    return text.translate(_CHOSEONG_TABLE)
@@ -0,0 +1,145 @@
+"""Per-request SQL instrumentation.
+
+instrument_engine() hooks before/after_cursor_execute on an engine and
+SQLInstrumentationMiddleware opens a RequestStats for every HTTP request,
+so each response carries
+    Server-Timing: db;dur=3.21;desc="4 queries", app;dur=10.50
+Statements are grouped by shape (the SQL text, IN lists collapsed); one
+request running the same shape more than LANG_PORTAL_N_PLUS_ONE_THRESHOLD
+times is logged as a likely N+1 loop. Statements slower than
+LANG_PORTAL_SLOW_QUERY_MS are logged with their EXPLAIN QUERY PLAN,
+inside requests or not.
+"""
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+SQL_INSTRUMENTATION = os.environ.get("LANG_PORTAL_SQL_INSTRUMENTATION", "on") == "on"
+N_PLUS_ONE_THRESHOLD = int(os.environ.get("LANG_PORTAL_N_PLUS_ONE_THRESHOLD", "10"))
+SLOW_QUERY_MS = float(os.environ.get("LANG_PORTAL_SLOW_QUERY_MS", "100"))
+
+# Only IN lists: a multi-row VALUES (?, ?), (?, ?) keeps its shape
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)+\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+# Statements EXPLAIN QUERY PLAN can say something useful about
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+class RequestStats:
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0  # seconds
+        self.shapes = Counter()
+
+    def repeated_shapes(self, threshold):
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+
+_request_stats: ContextVar = ContextVar("request_stats", default=None)
+
+
+@lru_cache(maxsize=2048)
+def statement_shape(statement):
+    """SQL text with whitespace normalized and IN (?, ?, ...) lists collapsed to IN (?)"""
+    return _IN_LIST.sub("IN (?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+def explain_query_plan(connection, statement, parameters):
+    """Return SQLite's query plan for a statement as indented lines"""
+    cursor = connection.connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    depth, lines = {0: -1}, []
+    for node_id, parent_id, _, detail in rows:
+        depth[node_id] = depth.get(parent_id, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+
+# The start time lives on the statement's execution context, which is
+# dropped with it whether or not after_cursor_execute ever runs
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "query_started", None)
+    if started is None:
+        return
+    elapsed = time.perf_counter() - started
+
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.query_count += 1
+        stats.db_time += elapsed
+        stats.shapes[statement_shape(statement)] += 1
+
+    if elapsed * 1000 >= SLOW_QUERY_MS and not executemany and statement.lstrip().upper().startswith(_EXPLAINABLE):
+        try:
+            plan = "\n    ".join(explain_query_plan(conn, statement, parameters))
+        except Exception as e:
+            plan = f"(EXPLAIN QUERY PLAN failed: {e})"
+        logger.warning("Slow query (%.1fms): %s\n  parameters: %.200s\n  plan:\n    %s",
+                       elapsed * 1000, statement_shape(statement), repr(parameters), plan)
+
+
+def instrument_engine(sync_engine):
+    """Attach the timing hooks; pass async_engine.sync_engine for an AsyncEngine"""
+    if not SQL_INSTRUMENTATION:
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _server_timing(stats, total):
+    return (f'db;dur={stats.db_time * 1000:.2f};desc="{stats.query_count} queries", '
+            f'app;dur={total * 1000:.2f}')
+
+
+class SQLInstrumentationMiddleware:
+    """ASGI middleware that collects RequestStats for every HTTP request.
+
+    Server-Timing is added to the response head, so statements a
+    streaming response runs while sending its body are not in it; they
+    still count towards the N+1 check logged once the request is done.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not SQL_INSTRUMENTATION:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing(stats, time.perf_counter() - started).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            for shape, count in stats.repeated_shapes(N_PLUS_ONE_THRESHOLD):
+                logger.warning("Possible N+1: %s %s ran the same statement %d times: %s",
+                               scope["method"], scope["path"], count, shape)
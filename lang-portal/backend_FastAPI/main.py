@@ -1,25 +1,70 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from database import Base, engine
+from fastapi.responses import PlainTextResponse
+from compression import COMPRESSION, CompressionMiddleware
+from instrumentation import SQLInstrumentationMiddleware
+from metrics import MetricsMiddleware, render as render_metrics
+from review_buffer import review_buffer, REVIEW_BUFFER_MODE
+from analytics import shutdown_pool as shutdown_analytics_pool
+from startup import run_startup
 from routers import (
     words,
     groups,
     study_sessions,
     study_activities,
     dashboard,
+    export,
+    analytics,
 )
 
-# Initialize DB tables
-Base.metadata.create_all(bind=engine)
 
-# Initialize FastAPI app
-app = FastAPI(
-    title="Language Portal API",
-    version="1.0.0"
-)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema check (skipped when the database header says it is current),
+    # backfills, in-memory indexes and the cache warm-up
+    await run_startup(app)
+    if REVIEW_BUFFER_MODE != "off":
+        review_buffer.start()
+    yield
+    # Flush queued reviews before the process exits
+    await review_buffer.stop()
+    shutdown_analytics_pool()
+
+
+async def get_metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+def create_app():
+    """Build the app; nothing touches the database until the lifespan runs"""
+    app = FastAPI(
+        title="Language Portal API",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+
+    # gzip/brotli; innermost, so the latency metrics include the compression time
+    if COMPRESSION:
+        app.add_middleware(CompressionMiddleware)
+    # Server-Timing (query count, DB time) on every response, N+1 and slow query logging
+    app.add_middleware(SQLInstrumentationMiddleware)
+    # Per-route latency histograms and requests in flight for /metrics
+    app.add_middleware(MetricsMiddleware)
+
+    # Include routers
+    app.include_router(words.router, prefix="/api", tags=["Words"])
+    app.include_router(groups.router, prefix="/api", tags=["Groups"])
+    app.include_router(study_sessions.router, prefix="/api", tags=["Study Sessions"])
+    app.include_router(study_activities.router, prefix="/api", tags=["Study Activities"])
+    app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
+    app.include_router(export.router, prefix="/api", tags=["Export"])
+    app.include_router(analytics.router, prefix="/api/analytics", tags=["Analytics"])
+
+    app.add_api_route("/metrics", get_metrics, methods=["GET"], include_in_schema=False)
+    return app
+
 
-# Include routers
-app.include_router(words.router, prefix="/api", tags=["Words"])
-app.include_router(groups.router, prefix="/api", tags=["Groups"])
-app.include_router(study_sessions.router, prefix="/api", tags=["Study Sessions"])
-app.include_router(study_activities.router, prefix="/api", tags=["Study Activities"])
-app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
+# `uvicorn main:app`, or `uvicorn main:create_app --factory`
+app = create_app()
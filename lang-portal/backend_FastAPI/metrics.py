@@ -0,0 +1,264 @@
+"""Prometheus metrics for GET /metrics, without a client library.
+
+Collected on the hot paths:
+  - request latency histograms per method, route template and status
+    (MetricsMiddleware), plus the number of requests in flight
+  - pool checkout waits and connection hold times (TimedPool subclasses
+    and pool events, see track_engine)
+  - rows written per table from INSERT/UPDATE/DELETE rowcounts
+Observing is a bisect and two additions on plain Python objects, so each
+request costs a few microseconds. Pool sizes, the response cache and the
+review buffer are read only when /metrics is scraped.
+"""
+import re
+import time
+from bisect import bisect_left
+from functools import lru_cache
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from cache import response_cache
+from compression import compression_stats
+
+# Upper bounds in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POOL_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+_WRITE_STATEMENT = re.compile(r'^\s*(INSERT|UPDATE|DELETE)\b(?:\s+OR\s+\w+)?(?:\s+INTO|\s+FROM)?\s+"?(\w+)"?',
+                              re.IGNORECASE)
+
+
+class Histogram:
+    """Bucket counts for one label set; cumulated only when rendered"""
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class HistogramFamily:
+    def __init__(self, name, help_text, label_names, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self.children = {}  # label values tuple -> Histogram
+
+    def labels(self, *values):
+        histogram = self.children.get(values)
+        if histogram is None:
+            histogram = self.children[values] = Histogram(self.buckets)
+        return histogram
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for values, histogram in sorted(self.children.items()):
+            labels = _labels(zip(self.label_names, values))
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), histogram.counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {histogram.sum}" if labels else f"{self.name}_sum {histogram.sum}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}" if labels else f"{self.name}_count {cumulative}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+
+
+def _scalar(name, kind, help_text, samples):
+    """Lines for a counter or gauge; samples is [(labels dict, value)]"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{{{_labels(labels.items())}}} {value}" if labels else f"{name} {value}")
+    return lines
+
+
+request_duration = HistogramFamily(
+    "lang_portal_http_request_duration_seconds", "HTTP request latency by route template",
+    ("method", "route", "status"), LATENCY_BUCKETS
+)
+pool_wait = HistogramFamily(
+    "lang_portal_db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection",
+    ("engine",), POOL_BUCKETS
+)
+pool_hold = HistogramFamily(
+    "lang_portal_db_pool_connection_hold_seconds", "Time a connection stays checked out",
+    ("engine",), LATENCY_BUCKETS
+)
+rows_written = {}  # (table, operation) -> rows
+requests_in_flight = 0
+_engines = {}  # name -> Engine
+
+
+# Database side
+class _TimedCheckout:
+    """Pool mixin timing how long each checkout waits for a connection"""
+    metrics_name = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait.labels(self.metrics_name).observe(time.perf_counter() - started)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    metrics_name = "sync"
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    metrics_name = "async"
+
+
+@lru_cache(maxsize=2048)
+def _written_table(statement):
+    match = _WRITE_STATEMENT.match(statement)
+    return (match.group(2), match.group(1).lower()) if match else None
+
+
+def _count_rows_written(conn, cursor, statement, parameters, context, executemany):
+    key = _written_table(statement)
+    if key is not None and cursor.rowcount > 0:
+        rows_written[key] = rows_written.get(key, 0) + cursor.rowcount
+
+
+def track_engine(sync_engine, name):
+    """Record pool and write metrics for an engine (async_engine.sync_engine for an AsyncEngine)"""
+    _engines[name] = sync_engine
+    event.listen(sync_engine, "after_cursor_execute", _count_rows_written)
+
+    @event.listens_for(sync_engine, "checkout")
+    def _checked_out(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "checkin")
+    def _checked_in(dbapi_connection, connection_record):
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is not None:
+            pool_hold.labels(name).observe(time.perf_counter() - started)
+
+
+# HTTP side
+_route_templates = {}  # id(route) -> full path template; routes live as long as the app
+
+
+def route_template(scope):
+    """The matched route's full path template, e.g. /api/words/{word_id}.
+
+    Routes of an included router may carry their path without the include
+    prefix, so the prefix is recovered from the part of the request path
+    in front of the route's own (filled in) path. Worked out on a route's
+    first request and remembered: this app includes every router once.
+    """
+    route = scope.get("route")
+    if route is None:
+        return "unmatched"
+    template = _route_templates.get(id(route))
+    if template is None:
+        template = route.path
+        path = scope["path"]
+        try:
+            filled = route.path_format.format(**scope.get("path_params", {}))
+        except (AttributeError, KeyError, IndexError):
+            filled = None
+        if filled is not None and path.endswith(filled):
+            template = path[:len(path) - len(filled)] + route.path
+        _route_templates[id(route)] = template
+    return template
+
+
+class MetricsMiddleware:
+    """ASGI middleware observing request_duration and requests_in_flight.
+
+    Requests are labelled with the matched route's path template
+    (/api/words/{word_id}), so ids don't multiply the series; requests no
+    route matched share route="unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        global requests_in_flight
+        requests_in_flight += 1
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            requests_in_flight -= 1
+            request_duration.labels(scope["method"], route_template(scope), status).observe(
+                time.perf_counter() - started
+            )
+
+
+def render():
+    """The current metrics in the Prometheus text exposition format"""
+    # review_buffer imports database, which imports this module
+    from review_buffer import review_buffer
+
+    lines = request_duration.render()
+    lines += _scalar("lang_portal_http_requests_in_flight", "gauge",
+                     "HTTP requests being handled", [({}, requests_in_flight)])
+
+    pools = [(name, engine.pool) for name, engine in sorted(_engines.items())]
+    for metric, help_text, read in (
+        ("lang_portal_db_pool_size", "Configured pool size", lambda pool: pool.size()),
+        ("lang_portal_db_pool_checked_out", "Connections currently checked out", lambda pool: pool.checkedout()),
+        # QueuePool.overflow() counts down from -pool_size until the pool is full
+        ("lang_portal_db_pool_overflow", "Connections opened beyond pool_size", lambda pool: max(0, pool.overflow())),
+    ):
+        lines += _scalar(metric, "gauge", help_text, [
+            ({"engine": name}, read(pool)) for name, pool in pools if isinstance(pool, QueuePool)
+        ])
+    lines += pool_wait.render()
+    lines += pool_hold.render()
+
+    lines += _scalar("lang_portal_db_rows_written_total", "counter", "Rows inserted, updated or deleted", [
+        ({"table": table, "operation": operation}, count)
+        for (table, operation), count in sorted(rows_written.items())
+    ])
+
+    cache_stats = response_cache.stats()
+    lines += _scalar("lang_portal_response_cache_requests_total", "counter", "Cached GET lookups by result", [
+        ({"result": result}, cache_stats[key])
+        for result, key in (("hit", "hits"), ("miss", "misses"), ("not_modified", "not_modified"))
+    ])
+    lines += _scalar("lang_portal_response_cache_entries", "gauge", "Responses held in the cache",
+                     [({}, cache_stats["entries"])])
+    for metric, help_text, key in (
+        ("lang_portal_compressed_responses_total", "Responses compressed on the fly", "responses"),
+        ("lang_portal_compression_bytes_in_total", "Bytes before on-the-fly compression", "bytes_in"),
+        ("lang_portal_compression_bytes_out_total", "Bytes after on-the-fly compression", "bytes_out"),
+    ):
+        lines += _scalar(metric, "counter", help_text, [
+            ({"encoding": encoding}, stats[key]) for encoding, stats in compression_stats.items()
+        ])
+    lines += _scalar("lang_portal_review_buffer_depth", "gauge", "Reviews queued for the next flush",
+                     [({}, review_buffer.depth)])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,208 @@
+"""Versioned SQL migrations.
+
+Migrations are the NNNN_description.sql files in MIGRATIONS_DIR
+(lang-portal/migrations, or LANG_PORTAL_MIGRATIONS_DIR), applied in
+version order on top of the tables Base.metadata.create_all() makes.
+Every applied migration is recorded in schema_migrations with the
+SHA-256 of its file, and PRAGMA user_version holds the highest applied
+version. Checking for pending migrations is a header read plus a
+directory listing, so startup doesn't touch anything (and never rebuilds
+an index) when the database is up to date.
+
+Each migration runs in its own transaction together with its
+schema_migrations row and the user_version bump: it is applied
+completely or not at all, and a failure stops the run.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from functools import cached_property
+
+MIGRATIONS_DIR = os.environ.get(
+    "LANG_PORTAL_MIGRATIONS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "migrations")
+)
+
+_MIGRATION_FILE = re.compile(r"^(\d+)_(\w+)\.sql$")
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+
+CREATE_SCHEMA_MIGRATIONS = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    checksum TEXT NOT NULL,
+    applied_at TEXT NOT NULL
+)
+"""
+
+
+class MigrationError(Exception):
+    pass
+
+
+class Migration:
+    def __init__(self, version, name, path):
+        self.version = version
+        self.name = name
+        self.path = path
+
+    @property
+    def filename(self):
+        return os.path.basename(self.path)
+
+    @cached_property
+    def sql(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    @cached_property
+    def checksum(self):
+        return hashlib.sha256(self.sql.encode("utf-8")).hexdigest()
+
+
+def discover_migrations(directory=MIGRATIONS_DIR):
+    """Migrations in directory by version; files are only read when needed"""
+    if not os.path.isdir(directory):
+        return []
+
+    migrations = {}
+    for filename in sorted(os.listdir(directory)):
+        match = _MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise MigrationError(f"Migrations {migrations[version].filename} and {filename} share version {version}")
+        migrations[version] = Migration(version, match.group(2), os.path.join(directory, filename))
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def current_version(connection):
+    """Highest applied migration version, read from the database header"""
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def applied_migrations(connection):
+    """{version: (name, checksum, applied_at)} from schema_migrations"""
+    return {
+        version: (name, checksum, applied_at)
+        for version, name, checksum, applied_at in connection.execute(
+            "SELECT version, name, checksum, applied_at FROM schema_migrations"
+        )
+    }
+
+
+def verify_applied(connection, migrations):
+    """Raise MigrationError if an applied migration's file was edited or is missing"""
+    on_disk = {migration.version: migration for migration in migrations}
+    for version, (name, checksum, _) in sorted(applied_migrations(connection).items()):
+        migration = on_disk.get(version)
+        if migration is None:
+            raise MigrationError(f"Applied migration {version:04d}_{name}.sql is missing from the migrations folder")
+        if migration.checksum != checksum:
+            raise MigrationError(
+                f"{migration.filename} changed after it was applied (checksum {checksum[:12]}, "
+                f"now {migration.checksum[:12]}); add a new migration instead of editing it"
+            )
+
+
+def pending_migrations(connection, migrations):
+    """Migrations newer than user_version.
+
+    A file numbered at or below user_version that was never applied was
+    added out of order; it is reported rather than silently skipped.
+    """
+    version = current_version(connection)
+    applied = applied_migrations(connection)
+    skipped = [m.filename for m in migrations if m.version <= version and m.version not in applied]
+    if skipped:
+        raise MigrationError(f"Migrations numbered at or below the current version {version} were never applied: "
+                             f"{', '.join(skipped)}")
+    return [m for m in migrations if m.version > version]
+
+
+def split_statements(sql):
+    """Split a script into statements. sqlite3.complete_statement() decides
+    where one ends, so semicolons in comments, strings and trigger bodies
+    don't."""
+    statements, buffer = [], ""
+    for piece in sql.split(";"):
+        buffer += piece + ";"
+        if sqlite3.complete_statement(buffer):
+            if _COMMENTS.sub("", buffer).strip(" \t\r\n;"):
+                statements.append(buffer.strip())
+            buffer = ""
+    return statements
+
+
+def apply_migration(connection, migration):
+    """Run one migration and record it in a single transaction.
+
+    Returns False when another process applied it first: the write lock is
+    taken before user_version is checked again.
+    """
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        if current_version(connection) >= migration.version:
+            connection.rollback()
+            return False
+        for statement in split_statements(migration.sql):
+            connection.execute(statement)
+        connection.execute(
+            "INSERT INTO schema_migrations (version, name, checksum, applied_at) "
+            "VALUES (?, ?, ?, strftime('%Y-%m-%d %H:%M:%f', 'now'))",
+            (migration.version, migration.name, migration.checksum)
+        )
+        connection.execute(f"PRAGMA user_version = {migration.version:d}")
+        connection.commit()
+        return True
+    except Exception as e:
+        connection.rollback()
+        raise MigrationError(f"{migration.filename} failed: {e}") from e
+
+
+def migrate(engine, directory=MIGRATIONS_DIR, verify=True, on_applied=None):
+    """Apply pending migrations on a sync engine; returns [(Migration, ms)].
+
+    verify also checks the checksums of the migrations already applied.
+    on_applied(migration, ms) is called after each one commits.
+    """
+    migrations = discover_migrations(directory)
+    raw = engine.raw_connection()
+    try:
+        connection = raw.driver_connection
+        # The fast path: nothing newer than user_version on disk
+        if not verify and (not migrations or migrations[-1].version <= current_version(connection)):
+            return []
+
+        connection.execute(CREATE_SCHEMA_MIGRATIONS)
+        connection.commit()
+        if verify:
+            verify_applied(connection, migrations)
+
+        results = []
+        for migration in pending_migrations(connection, migrations):
+            started = time.perf_counter()
+            if not apply_migration(connection, migration):
+                continue
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+            results.append((migration, elapsed_ms))
+            if on_applied:
+                on_applied(migration, elapsed_ms)
+        return results
+    finally:
+        raw.close()
+
+
+def reset_migrations(engine):
+    """Forget every applied migration, e.g. after the tables were dropped"""
+    raw = engine.raw_connection()
+    try:
+        connection = raw.driver_connection
+        connection.execute("DROP TABLE IF EXISTS schema_migrations")
+        connection.execute("PRAGMA user_version = 0")
+        connection.commit()
+    finally:
+        raw.close()
@@ -1,6 +1,6 @@
 from sqlalchemy import (
-    Column, Integer, String, Text, Boolean,
-    DateTime, ForeignKey, JSON
+    Column, Integer, String, Text, Boolean, Float,
+    Date, DateTime, ForeignKey, JSON, Index
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -8,6 +8,9 @@ from database import Base
 
 class Word(Base):
     __tablename__ = "words"
+    __table_args__ = (
+        Index("uq_words_korean", "korean", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     korean = Column(String(200), nullable=False)
@@ -17,6 +20,7 @@ class Word(Base):
 
     groups = relationship("Group", secondary="words_groups", back_populates="words")
     review_items = relationship("WordReviewItem", back_populates="word")
+    review_stats = relationship("WordReviewStats", back_populates="word", uselist=False)
 
 
 class Group(Base):
@@ -31,6 +35,9 @@ class Group(Base):
 
 class WordGroup(Base):
     __tablename__ = "words_groups"
+    __table_args__ = (
+        Index("uq_words_groups_word_group", "word_id", "group_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     word_id = Column(Integer, ForeignKey("words.id"), nullable=False)
@@ -74,4 +81,66 @@ class WordReviewItem(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     word = relationship("Word", back_populates="review_items")
-    study_session = relationship("StudySession", back_populates="review_items")
\ No newline at end of file
+    study_session = relationship("StudySession", back_populates="review_items")
+
+
+class WordReviewStats(Base):
+    """Denormalized per-word review counters, kept in step with word_review_items"""
+    __tablename__ = "word_review_stats"
+    __table_args__ = (
+        Index("idx_word_review_stats_accuracy", "accuracy", "word_id"),
+        Index("idx_word_review_stats_review_count", "review_count", "word_id"),
+    )
+
+    word_id = Column(Integer, ForeignKey("words.id"), primary_key=True)
+    correct_count = Column(Integer, nullable=False, default=0)
+    wrong_count = Column(Integer, nullable=False, default=0)
+    review_count = Column(Integer, nullable=False, default=0)
+    accuracy = Column(Float, nullable=False, default=0.0)  # correct_count / review_count
+    last_reviewed_at = Column(DateTime, nullable=True)
+
+    word = relationship("Word", back_populates="review_stats")
+
+
+class WordSchedule(Base):
+    """Spaced-repetition (SM-2) state per word, updated on every review"""
+    __tablename__ = "word_schedules"
+    __table_args__ = (
+        Index("idx_word_schedules_due_at", "due_at", "word_id"),
+    )
+
+    word_id = Column(Integer, ForeignKey("words.id"), primary_key=True)
+    repetitions = Column(Integer, nullable=False, default=0)  # correct answers in a row
+    interval_days = Column(Float, nullable=False, default=0.0)
+    ease = Column(Float, nullable=False, default=2.5)
+    lapses = Column(Integer, nullable=False, default=0)
+    due_at = Column(DateTime, nullable=False)
+    last_reviewed_at = Column(DateTime, nullable=False)
+
+
+class DailyActivity(Base):
+    """Per-day totals behind the dashboard, kept in step with reviews and sessions"""
+    __tablename__ = "daily_activity"
+
+    day = Column(Date, primary_key=True)
+    review_count = Column(Integer, nullable=False, default=0)
+    correct_count = Column(Integer, nullable=False, default=0)
+    sessions_started = Column(Integer, nullable=False, default=0)
+    sessions_ended = Column(Integer, nullable=False, default=0)
+
+
+class DailyGroupActivity(Base):
+    """Sessions started per group per day, for the active groups count"""
+    __tablename__ = "daily_group_activity"
+
+    day = Column(Date, primary_key=True)
+    group_id = Column(Integer, ForeignKey("groups.id"), primary_key=True)
+    sessions_started = Column(Integer, nullable=False, default=0)
+
+
+class TableGeneration(Base):
+    """Write generation of each table, for the response cache (cache.py)"""
+    __tablename__ = "table_generations"
+
+    table_name = Column(String, primary_key=True)
+    generation = Column(Integer, nullable=False)
@@ -0,0 +1,113 @@
+import base64
+import binascii
+import json
+import math
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from schemas import PaginationInfo, CursorPaginationInfo
+
+
+def create_pagination(current_page: int, total_items: int, items_per_page: int):
+    total_pages = math.ceil(total_items / items_per_page) if total_items > 0 else 1
+    return PaginationInfo(
+        current_page=current_page,
+        total_pages=total_pages,
+        total_items=total_items,
+        items_per_page=items_per_page
+    )
+
+
+def encode_cursor(values):
+    """Opaque cursor holding the sort key of the last row on a page"""
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _is_key_value(value, python_type):
+    # bool is an int subclass, but never a sort key; ints are fine for float keys
+    if isinstance(value, bool):
+        return False
+    if python_type is float:
+        return isinstance(value, (int, float)) and math.isfinite(value)
+    return isinstance(value, python_type)
+
+
+def decode_cursor(cursor: str, types):
+    """Sort key values from a cursor; types is the Python type of each key,
+    anything else (wrong count, wrong type) is a 400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if (
+        not isinstance(values, list)
+        or len(values) != len(types)
+        or not all(map(_is_key_value, values, types))
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+async def paginate(db: AsyncSession, stmt, *, keys, row_key, page, cursor, items_per_page,
+                   descending=False, include_total=False, count_stmt=None):
+    """Run a list select in page-number or keyset (cursor) mode.
+
+    keys are the columns the listing is ordered by; the last one must be
+    unique (normally the primary key) so every row has a distinct position.
+    row_key maps a result row to its values for those columns. count_stmt
+    is an optional cheaper scalar COUNT select for the total.
+
+    Page mode (cursor is None) keeps the original OFFSET + COUNT(*)
+    behaviour. Cursor mode seeks past the previous page's last key, so deep
+    pages cost the same as the first one, and only counts the total when
+    include_total is set. An empty cursor starts from the beginning.
+
+    Returns (rows, pagination); rows are entities when stmt selects a single
+    entity and Row tuples otherwise.
+    """
+    order = [key.desc() if descending else key.asc() for key in keys]
+
+    async def fetch(stmt):
+        result = await db.execute(stmt)
+        if len(stmt.column_descriptions) == 1:
+            return result.scalars().all()
+        return result.all()
+
+    async def count_total():
+        if count_stmt is None:
+            return await db.scalar(select(func.count()).select_from(stmt.order_by(None).subquery()))
+        return await db.scalar(count_stmt)
+
+    if cursor is None:
+        total_items = await count_total()
+        rows = await fetch(stmt.order_by(*order).offset((page - 1) * items_per_page).limit(items_per_page))
+        return rows, create_pagination(page, total_items, items_per_page)
+
+    total_items = await count_total() if include_total else None
+
+    seek_stmt = stmt
+    if cursor:
+        values = decode_cursor(cursor, [key.type.python_type for key in keys])
+        if len(keys) == 1:
+            column, value = keys[0], values[0]
+        else:
+            column, value = tuple_(*keys), tuple_(*values)
+        seek_stmt = stmt.where(column < value if descending else column > value)
+
+    # Fetch one extra row to learn whether another page exists
+    rows = await fetch(seek_stmt.order_by(*order).limit(items_per_page + 1))
+    next_cursor = None
+    if len(rows) > items_per_page:
+        rows = rows[:items_per_page]
+        next_cursor = encode_cursor(row_key(rows[-1]))
+
+    return rows, CursorPaginationInfo(
+        items_per_page=items_per_page,
+        next_cursor=next_cursor,
+        total_items=total_items
+    )
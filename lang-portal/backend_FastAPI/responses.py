@@ -0,0 +1,113 @@
+"""Fast JSON responses for the list endpoints.
+
+A handler that returns a dict has FastAPI walk it with jsonable_encoder()
+and encode it with the stdlib json module; with Pydantic models per row it
+also builds and dumps one model per item. The list endpoints instead
+select plain columns, turn the row tuples into dicts with project() and
+return an ORJSONResponse, which encodes the page in one orjson call.
+Rows come from our own database, so there is nothing to validate.
+
+orjson is optional: without it ORJSONResponse falls back to json.dumps()
+with the same compact output.
+"""
+import json
+from datetime import datetime
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import func, select
+
+from models import Group, StudyActivity, StudySession, Word, WordGroup, WordReviewItem, WordReviewStats
+from schemas import GroupResponse, WordResponse
+
+
+def _default(value):
+    # Pagination info is still a Pydantic model; there is one per page
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered by orjson, with Pydantic models dumped as dicts"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return orjson.dumps(content, default=_default)
+
+
+def project(rows, fields):
+    """Row tuples as dicts keyed by fields, in order. Columns past the last
+    field (e.g. sort keys only needed for the cursor) are left out."""
+    return [dict(zip(fields, row)) for row in rows]
+
+
+# Word list items (WordResponse) straight from SQL: the columns in field
+# order, with 0/0 for words that were never reviewed. Select them from
+# Word outer joined to WordReviewStats.
+WORD_COLUMNS = (
+    Word.korean,
+    Word.transliteration,
+    Word.english,
+    func.coalesce(WordReviewStats.correct_count, 0),
+    func.coalesce(WordReviewStats.wrong_count, 0),
+)
+WORD_FIELDS = tuple(WordResponse.model_fields)
+
+
+def group_words_select(group_id):
+    """A group's words as WORD_COLUMNS followed by Word.id"""
+    return select(*WORD_COLUMNS, Word.id).join(WordGroup).where(WordGroup.group_id == group_id).outerjoin(
+        WordReviewStats, WordReviewStats.word_id == Word.id
+    )
+
+
+GROUP_FIELDS = tuple(GroupResponse.model_fields)
+
+
+def group_list_select():
+    """Group list rows with their word counts in one statement:
+    (id, name, word count)"""
+    return select(Group.id, Group.name, func.count(WordGroup.word_id)).outerjoin(
+        WordGroup, WordGroup.group_id == Group.id
+    ).group_by(Group.id)
+
+
+def session_list_select():
+    """Study session list rows, review counts included, in one statement:
+    (id, activity name, group name, created_at, ended_at, review count)"""
+    review_count = select(func.count(WordReviewItem.study_session_id)).where(
+        WordReviewItem.study_session_id == StudySession.id
+    ).scalar_subquery()
+    return select(
+        StudySession.id,
+        StudyActivity.name,
+        Group.name,
+        StudySession.created_at,
+        StudySession.ended_at,
+        review_count
+    ).outerjoin(StudySession.activity).outerjoin(StudySession.group)
+
+
+def session_items(rows):
+    """session_list_select() rows as study session list items; sessions
+    that haven't ended report the current time as end_time"""
+    now = datetime.utcnow().isoformat() + "Z"
+    return [
+        {
+            "id": session_id,
+            "activity_name": activity_name,
+            "group_name": group_name,
+            "start_time": created_at.isoformat() + "Z",
+            "end_time": ended_at.isoformat() + "Z" if ended_at else now,
+            "review_items_count": review_count
+        }
+        for session_id, activity_name, group_name, created_at, ended_at, review_count in rows
+    ]
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import os
+from collections import deque
+from contextlib import asynccontextmanager
+
+from database import AsyncSessionLocal
+from reviews import write_reviews
+
+logger = logging.getLogger(__name__)
+
+# LANG_PORTAL_REVIEW_BUFFER selects how create_word_review writes:
+#   off     - one transaction per answer (default)
+#   durable - group commit: answers are batched, but each request waits
+#             until the batch holding it has committed
+#   async   - write-behind: the request returns once the answer is queued;
+#             queued answers are lost if the process dies before a flush
+REVIEW_BUFFER_MODE = os.environ.get("LANG_PORTAL_REVIEW_BUFFER", "off")
+REVIEW_BUFFER_FLUSH_MS = int(os.environ.get("LANG_PORTAL_REVIEW_BUFFER_FLUSH_MS", "50"))
+REVIEW_BUFFER_MAX_ITEMS = int(os.environ.get("LANG_PORTAL_REVIEW_BUFFER_MAX_ITEMS", "500"))
+# Flushes a write-behind row may fail before it is dropped
+REVIEW_BUFFER_MAX_ATTEMPTS = int(os.environ.get("LANG_PORTAL_REVIEW_BUFFER_MAX_ATTEMPTS", "3"))
+
+if REVIEW_BUFFER_MODE not in ("off", "durable", "async"):
+    raise ValueError(f"Unknown LANG_PORTAL_REVIEW_BUFFER mode {REVIEW_BUFFER_MODE!r}")
+
+
+class ReviewBuffer:
+    """In-process queue that turns many review writes into few transactions.
+
+    A background task flushes everything queued as one write_reviews()
+    transaction every flush_interval_ms, or as soon as max_items are
+    waiting. stop() flushes whatever is left, so it belongs in the app's
+    shutdown path.
+
+    When a batch fails its rows are retried one transaction each, so one bad
+    row doesn't take the others down with it. A durable row that still fails
+    fails its request. A write-behind row is queued again for the next flush
+    until it has failed max_attempts times, then dropped: logged, counted
+    and kept in dead_letters.
+    """
+
+    def __init__(self, session_factory=AsyncSessionLocal, flush_interval_ms=REVIEW_BUFFER_FLUSH_MS,
+                 max_items=REVIEW_BUFFER_MAX_ITEMS, durable=True, max_attempts=REVIEW_BUFFER_MAX_ATTEMPTS):
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_items = max_items
+        self.durable = durable
+        self.max_attempts = max_attempts
+        self.flushed_batches = 0
+        self.flushed_rows = 0
+        self.failed_batches = 0
+        self.failed_rows = 0  # durable rows whose request got the error
+        self.dropped_rows = 0  # write-behind rows given up on
+        self.dead_letters = deque(maxlen=100)  # the most recently dropped rows
+        self._pending = []  # (row, future or None, failed attempts)
+        self._wakeup = None
+        self._lock = None
+        self._task = None
+        self._stopping = False
+
+    @property
+    def running(self):
+        return self._task is not None
+
+    @property
+    def depth(self):
+        """Number of queued reviews not yet committed"""
+        return len(self._pending)
+
+    def start(self):
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if not self._task:
+            return
+        # Let the loop finish its current flush rather than cancelling it
+        # mid-transaction, which would drop the batch it had taken
+        self._stopping = True
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        await self.flush()
+
+    async def submit(self, row):
+        """Queue one word_review_items row; in durable mode wait for its commit"""
+        future = asyncio.get_running_loop().create_future() if self.durable else None
+        self._pending.append((row, future, 0))
+        if len(self._pending) >= self.max_items:
+            self._wakeup.set()
+        if future is not None:
+            await future
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._stopping:
+                return
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Review buffer flush failed")
+
+    async def flush(self):
+        async with self._lock:
+            await self._flush_pending()
+
+    @asynccontextmanager
+    async def drained(self):
+        """Write everything queued, then hold off further flushes until the
+        block exits. The reset endpoints wipe the review tables inside it, so
+        answers queued before the reset can't come back after it."""
+        if not self.running:
+            yield
+            return
+        async with self._lock:
+            await self._flush_pending()
+            yield
+
+    async def _write(self, rows):
+        async with self.session_factory() as db:
+            await write_reviews(db, rows)
+            await db.commit()
+
+    async def _flush_pending(self):
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        try:
+            await self._write([row for row, _, _ in batch])
+        except Exception:
+            self.failed_batches += 1
+            logger.exception("Review buffer batch of %d rows failed, retrying row by row", len(batch))
+        else:
+            self._committed(batch)
+            return
+
+        retry = []
+        for entry in batch:
+            row, future, attempts = entry
+            try:
+                await self._write([row])
+            except Exception as e:
+                if future is not None:
+                    self.failed_rows += 1
+                    if not future.done():
+                        future.set_exception(e)
+                elif attempts + 1 < self.max_attempts:
+                    retry.append((row, None, attempts + 1))
+                else:
+                    self.dropped_rows += 1
+                    self.dead_letters.append(row)
+                    logger.error("Dropping review %r after %d failed flushes: %s", row, attempts + 1, e)
+            else:
+                self._committed([entry])
+        # Ahead of anything queued meanwhile, to keep the answers in order
+        self._pending[:0] = retry
+
+    def _committed(self, entries):
+        self.flushed_batches += 1
+        self.flushed_rows += len(entries)
+        for _, future, _ in entries:
+            if future is not None and not future.done():
+                future.set_result(None)
+
+    def stats(self):
+        return {
+            "mode": REVIEW_BUFFER_MODE if self.running else "off",
+            "depth": self.depth,
+            "flushed_batches": self.flushed_batches,
+            "flushed_rows": self.flushed_rows,
+            "failed_batches": self.failed_batches,
+            "failed_rows": self.failed_rows,
+            "dropped_rows": self.dropped_rows,
+            "flush_interval_ms": int(self.flush_interval * 1000),
+            "max_items": self.max_items,
+        }
+
+
+review_buffer = ReviewBuffer(durable=REVIEW_BUFFER_MODE != "async")
@@ -0,0 +1,30 @@
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cache import mark_changed
+from membership import queue_studied
+from models import DailyActivity, WordReviewItem, WordReviewStats, WordSchedule
+from rollups import record_daily_reviews
+from scheduler import record_schedules
+from stats import record_reviews
+
+
+async def write_reviews(db: AsyncSession, rows):
+    """Insert word_review_items rows and update everything derived from them.
+
+    rows are dicts with word_id, study_session_id, correct and created_at.
+    All rows go in with one executemany, on the caller's transaction; the
+    caller commits.
+    """
+    if not rows:
+        return
+
+    # The insert comes first so the transaction holds SQLite's write lock
+    # before record_schedules() reads the state it is about to update
+    await db.execute(insert(WordReviewItem), rows)
+    reviews = [(row["word_id"], row["correct"], row["created_at"]) for row in rows]
+    await record_reviews(db, reviews)
+    await record_daily_reviews(db, rows)
+    await record_schedules(db, reviews)
+    mark_changed(db, WordReviewItem, WordReviewStats, DailyActivity, WordSchedule)
+    queue_studied(db, {row["word_id"] for row in rows})
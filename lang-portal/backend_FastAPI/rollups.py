@@ -0,0 +1,109 @@
+from sqlalchemy import func, case, insert, literal, select, union_all
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from cache import mark_changed
+from models import DailyActivity, DailyGroupActivity, StudySession, WordReviewItem
+
+
+async def _bump(db: AsyncSession, model, keys, rows):
+    """Upsert rows into a rollup table, adding every non-key column to the stored value"""
+    if not rows:
+        return
+
+    stmt = sqlite_insert(model)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[getattr(model, key) for key in keys],
+        set_={
+            column: getattr(model, column) + getattr(stmt.excluded, column)
+            for column in rows[0] if column not in keys
+        }
+    )
+    await db.execute(stmt, rows)
+
+
+async def record_daily_reviews(db: AsyncSession, rows):
+    """Fold word_review_items rows (dicts with correct and created_at) into daily_activity"""
+    days = {}
+    for row in rows:
+        day = days.setdefault(row["created_at"].date(), {
+            "day": row["created_at"].date(),
+            "review_count": 0,
+            "correct_count": 0,
+            "sessions_started": 0,
+            "sessions_ended": 0,
+        })
+        day["review_count"] += 1
+        day["correct_count"] += 1 if row["correct"] else 0
+
+    await _bump(db, DailyActivity, ["day"], list(days.values()))
+
+
+async def record_session_started(db: AsyncSession, group_id: int, started_at):
+    day = started_at.date()
+    await _bump(db, DailyActivity, ["day"], [{
+        "day": day, "review_count": 0, "correct_count": 0, "sessions_started": 1, "sessions_ended": 0
+    }])
+    await _bump(db, DailyGroupActivity, ["day", "group_id"], [{
+        "day": day, "group_id": group_id, "sessions_started": 1
+    }])
+
+
+async def record_session_ended(db: AsyncSession, ended_at):
+    await _bump(db, DailyActivity, ["day"], [{
+        "day": ended_at.date(), "review_count": 0, "correct_count": 0, "sessions_started": 0, "sessions_ended": 1
+    }])
+
+
+# Maintenance helpers below run on a sync Session from tasks.py, seeds and startup
+def rebuild_daily_rollups(db: Session):
+    """Recompute daily_activity and daily_group_activity from scratch. Returns the day count."""
+    zero = literal(0)
+    per_source = union_all(
+        select(
+            func.date(WordReviewItem.created_at).label("day"),
+            func.count(WordReviewItem.id).label("review_count"),
+            func.sum(case((WordReviewItem.correct == True, 1), else_=0)).label("correct_count"),
+            zero.label("sessions_started"),
+            zero.label("sessions_ended")
+        ).group_by(func.date(WordReviewItem.created_at)),
+        select(
+            func.date(StudySession.created_at), zero, zero, func.count(StudySession.id), zero
+        ).group_by(func.date(StudySession.created_at)),
+        select(
+            func.date(StudySession.ended_at), zero, zero, zero, func.count(StudySession.id)
+        ).where(StudySession.ended_at.isnot(None)).group_by(func.date(StudySession.ended_at)),
+    ).subquery()
+
+    db.query(DailyActivity).delete()
+    db.query(DailyGroupActivity).delete()
+    db.execute(insert(DailyActivity).from_select(
+        ["day", "review_count", "correct_count", "sessions_started", "sessions_ended"],
+        select(
+            per_source.c.day,
+            func.sum(per_source.c.review_count),
+            func.sum(per_source.c.correct_count),
+            func.sum(per_source.c.sessions_started),
+            func.sum(per_source.c.sessions_ended)
+        ).where(per_source.c.day.isnot(None)).group_by(per_source.c.day)
+    ))
+    db.execute(insert(DailyGroupActivity).from_select(
+        ["day", "group_id", "sessions_started"],
+        select(
+            func.date(StudySession.created_at),
+            StudySession.group_id,
+            func.count(StudySession.id)
+        ).where(StudySession.created_at.isnot(None)).group_by(
+            func.date(StudySession.created_at), StudySession.group_id
+        )
+    ))
+    mark_changed(db, DailyActivity, DailyGroupActivity)
+    return db.query(func.count(DailyActivity.day)).scalar()
+
+
+def backfill_daily_rollups(db: Session):
+    """Build the rollups for databases that have sessions but no daily_activity rows yet"""
+    if db.query(DailyActivity.day).first() is None and db.query(StudySession.id).first() is not None:
+        rebuild_daily_rollups(db)
+        db.commit()
@@ -3,11 +3,15 @@ from . import groups
 from . import study_sessions
 from . import study_activities
 from . import dashboard
+from . import export
+from . import analytics
 
 __all__ = [
     "words",
     "groups", 
     "study_sessions",
     "study_activities",
-    "dashboard"
+    "dashboard",
+    "export",
+    "analytics"
 ]
\ No newline at end of file
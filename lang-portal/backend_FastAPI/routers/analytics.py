@@ -0,0 +1,75 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from analytics import MAX_ATTEMPTS, current_analytics, daily_accuracy, word_curve
+from cache import CachedRoute, cached
+from database import DATABASE_PATH, get_async_db
+from models import Group, StudySession, Word, WordReviewItem
+
+router = APIRouter(route_class=CachedRoute)
+
+
+async def _analytics():
+    # Loading and summarizing the history is CPU bound; keep it off the event loop
+    return await run_in_threadpool(current_analytics, DATABASE_PATH)
+
+
+async def _check_group(db: AsyncSession, group_id):
+    if group_id is not None and not await db.get(Group, group_id):
+        raise HTTPException(status_code=404, detail="Group not found")
+
+
+@router.get("/learning_curve")
+@cached(WordReviewItem, StudySession, Group)
+async def get_learning_curve(
+    group_id: Optional[int] = Query(None),
+    max_attempts: int = Query(20, ge=1, le=MAX_ATTEMPTS),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """GET /api/analytics/learning_curve
+    Accuracy of the first, second, ... review of a word, over every word or
+    over the reviews made in one group's sessions.
+    """
+    await _check_group(db, group_id)
+    _, summary = await _analytics()
+    return {"group_id": group_id, "items": summary.learning_curve(group_id, max_attempts)}
+
+
+@router.get("/retention")
+@cached(WordReviewItem, StudySession, Group)
+async def get_retention(group_id: Optional[int] = Query(None), db: AsyncSession = Depends(get_async_db)):
+    """GET /api/analytics/retention
+    Accuracy by the time since the word's previous review
+    """
+    await _check_group(db, group_id)
+    _, summary = await _analytics()
+    return {"group_id": group_id, "items": summary.retention(group_id)}
+
+
+@router.get("/accuracy")
+@cached(WordReviewItem, StudySession)
+async def get_daily_accuracy(window: int = Query(7, ge=1, le=365)):
+    """GET /api/analytics/accuracy
+    Reviews and accuracy per day, with the accuracy over the last `window` days
+    """
+    history, _ = await _analytics()
+    return {"window": window, "items": daily_accuracy(history, window)}
+
+
+@router.get("/words/{word_id}")
+@cached(Word, WordReviewItem, StudySession)
+async def get_word_learning_curve(
+    word_id: int,
+    window: int = Query(5, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """GET /api/analytics/words/:id
+    The word's reviews in order, with the rolling accuracy after each one
+    """
+    if not await db.get(Word, word_id):
+        raise HTTPException(status_code=404, detail="Word not found")
+    history, _ = await _analytics()
+    return {"word_id": word_id, "window": window, "items": word_curve(history, word_id, window)}
@@ -1,17 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy import func, desc, select
 
-from database import get_db
-from models import StudySession, WordReviewItem, Group, StudyActivity, Word
+from database import get_async_db
+from models import StudySession, Group, Word, WordReviewStats, DailyActivity, DailyGroupActivity
+from cache import CachedRoute, cached
 
-router = APIRouter()
+router = APIRouter(route_class=CachedRoute)
 
 
 @router.get("/last_study_session")
-async def get_last_study_session(db: Session = Depends(get_db)):
+@cached(StudySession, Group)
+async def get_last_study_session(db: AsyncSession = Depends(get_async_db)):
     """GET /api/dashboard/last_study_session"""
-    last_session = db.query(StudySession).order_by(desc(StudySession.created_at)).first()
+    last_session = await db.scalar(
+        select(StudySession).options(joinedload(StudySession.group))
+        .order_by(desc(StudySession.created_at)).limit(1)
+    )
     
     if not last_session:
         raise HTTPException(status_code=404, detail="No study sessions found")
@@ -26,16 +32,19 @@ async def get_last_study_session(db: Session = Depends(get_db)):
 
 
 @router.get("/study_progress")
-async def get_study_progress(db: Session = Depends(get_db)):
+@cached(Word, WordReviewStats)
+async def get_study_progress(db: AsyncSession = Depends(get_async_db)):
     """GET /api/dashboard/study_progress
     Returns study progress statistics.
     Frontend will determine progress bar based on total words studied and total available words
     """
     # Get unique words that have been reviewed (studied)
-    total_words_studied = db.query(func.count(func.distinct(WordReviewItem.word_id))).scalar() or 0
+    total_words_studied = await db.scalar(
+        select(func.count(WordReviewStats.word_id)).where(WordReviewStats.review_count > 0)
+    ) or 0
     
     # Get total available words in database
-    total_available_words = db.query(func.count(Word.id)).scalar() or 0
+    total_available_words = await db.scalar(select(func.count(Word.id))) or 0
     
     return {
         "total_words_studied": total_words_studied,
@@ -44,29 +53,28 @@ async def get_study_progress(db: Session = Depends(get_db)):
 
 
 @router.get("/quick_stats")
-async def get_quick_stats(db: Session = Depends(get_db)):
+@cached(DailyActivity, DailyGroupActivity)
+async def get_quick_stats(db: AsyncSession = Depends(get_async_db)):
     """GET /api/dashboard/quick_stats
-    Returns quick overview statistics
+    Returns quick overview statistics, read from the daily rollup tables
     """
+    totals = (await db.execute(select(
+        func.sum(DailyActivity.review_count),
+        func.sum(DailyActivity.correct_count),
+        func.sum(DailyActivity.sessions_started),
+        # Study streak days - simplified calculation (count dates with sessions)
+        # Note: This is a simplified version. Real streak calculation would need more complex logic
+        func.count(DailyActivity.day).filter(DailyActivity.sessions_started > 0)
+    ))).one()
+    total_reviews, correct_reviews, total_study_sessions, study_streak_days = (value or 0 for value in totals)
+
     # Calculate success rate (percentage of correct reviews)
-    total_reviews = db.query(func.count(WordReviewItem.id)).scalar() or 0
-    correct_reviews = db.query(func.count(WordReviewItem.id)).filter(
-        WordReviewItem.correct == True
-    ).scalar() or 0
-    
     success_rate = (correct_reviews / total_reviews * 100) if total_reviews > 0 else 0.0
-    
-    # Total study sessions
-    total_study_sessions = db.query(func.count(StudySession.id)).scalar() or 0
-    
+
     # Total active groups (groups that have had study sessions)
-    total_active_groups = db.query(func.count(func.distinct(StudySession.group_id))).scalar() or 0
-    
-    # Study streak days - simplified calculation (count distinct dates with sessions)
-    # Note: This is a simplified version. Real streak calculation would need more complex logic
-    study_streak_days = db.query(
-        func.count(func.distinct(func.date(StudySession.created_at)))
-    ).scalar() or 0
+    total_active_groups = await db.scalar(
+        select(func.count(func.distinct(DailyGroupActivity.group_id)))
+    ) or 0
     
     return {
         "success_rate": round(success_rate, 1),
@@ -0,0 +1,173 @@
+import csv
+import io
+import json
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import select
+from starlette.background import BackgroundTask
+
+from database import AsyncSessionLocal, SessionLocal
+from models import Group, StudyActivity, StudySession, Word, WordReviewItem
+from snapshots import SNAPSHOT_FORMATS, SNAPSHOT_TABLES, SnapshotUnavailable, write_snapshots
+
+router = APIRouter()
+
+# Rows fetched from SQLite (and written to the client) per batch
+EXPORT_BATCH_SIZE = 2000
+
+EXPORT_COLUMNS = (
+    "review_id", "reviewed_at", "correct",
+    "word_id", "korean", "transliteration", "english",
+    "study_session_id", "session_started_at", "session_ended_at",
+    "group_id", "group_name", "study_activity_id", "activity_name",
+)
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "reviews.ndjson"),
+    "csv": ("text/csv; charset=utf-8", "reviews.csv"),
+}
+
+
+def _naive_utc(moment):
+    # Stored timestamps are naive UTC like datetime.utcnow()
+    if moment is not None and moment.tzinfo:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def _isoformat(moment):
+    return moment.isoformat() + "Z" if moment else None
+
+
+def export_query(start, end):
+    stmt = select(
+        WordReviewItem.id, WordReviewItem.created_at, WordReviewItem.correct,
+        Word.id, Word.korean, Word.transliteration, Word.english,
+        StudySession.id, StudySession.created_at, StudySession.ended_at,
+        Group.id, Group.name, StudyActivity.id, StudyActivity.name
+    ).join(
+        Word, Word.id == WordReviewItem.word_id
+    ).join(
+        StudySession, StudySession.id == WordReviewItem.study_session_id
+    ).join(
+        Group, Group.id == StudySession.group_id
+    ).join(
+        StudyActivity, StudyActivity.id == StudySession.study_activity_id
+    ).order_by(WordReviewItem.id)
+
+    if start is not None:
+        stmt = stmt.where(WordReviewItem.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(WordReviewItem.created_at < end)
+    return stmt.execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+
+def _export_values(row):
+    values = list(row)
+    for index in (1, 8, 9):  # reviewed_at, session_started_at, session_ended_at
+        values[index] = _isoformat(values[index])
+    return values
+
+
+def _csv_values(row):
+    values = _export_values(row)
+    # true/false as in the NDJSON export, not Python's True/False
+    values[2] = "true" if values[2] else "false"
+    return values
+
+
+def _ndjson_batch(rows):
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, _export_values(row))), ensure_ascii=False) + "\n"
+        for row in rows
+    )
+
+
+def _csv_batch(rows, header=False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(_csv_values(row) for row in rows)
+    return buffer.getvalue()
+
+
+async def stream_reviews(format, start, end):
+    """Yield the export one encoded batch at a time.
+
+    The generator owns its session: the request's dependencies are torn
+    down before a StreamingResponse finishes sending. Rows come from a
+    server-side cursor in yield_per batches, so memory use doesn't grow
+    with the size of the history.
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(export_query(start, end))
+        if format == "csv":
+            yield _csv_batch([], header=True).encode()
+        async for rows in result.partitions():
+            chunk = _ndjson_batch(rows) if format == "ndjson" else _csv_batch(rows)
+            yield chunk.encode()
+
+
+@router.get("/export/reviews")
+async def export_reviews(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None)
+):
+    """GET /api/export/reviews
+    Streams every word review joined with its word, study session, group and
+    activity, oldest first, as NDJSON (one object per line) or CSV.
+    start (inclusive) and end (exclusive) filter on the review time.
+    """
+    start, end = _naive_utc(start), _naive_utc(end)
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    media_type, filename = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        stream_reviews(format, start, end),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/export/snapshots/{table}")
+def export_snapshot(
+    table: str,
+    format: str = Query("parquet", pattern="^(parquet|arrow)$"),
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None)
+):
+    """GET /api/export/snapshots/:table
+    One table (reviews, study_sessions or words) as a zstd-compressed
+    Parquet or Arrow IPC file for notebooks. start (inclusive) and end
+    (exclusive) filter reviews and sessions by creation time.
+    Runs in the threadpool: the file is written from the sync engine.
+    """
+    if table not in SNAPSHOT_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown table, expected one of {list(SNAPSHOT_TABLES)}")
+    start, end = _naive_utc(start), _naive_utc(end)
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    output_dir = tempfile.mkdtemp(prefix="lang_portal_snapshot_")
+    try:
+        with SessionLocal() as db:
+            report = write_snapshots(db, output_dir, format, start, end, tables=[table])
+    except SnapshotUnavailable as e:
+        shutil.rmtree(output_dir)
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception:
+        shutil.rmtree(output_dir)
+        raise
+
+    path = report["tables"][table]["path"]
+    extension, media_type = SNAPSHOT_FORMATS[format]
+    return FileResponse(path, media_type=media_type, filename=table + extension,
+                        background=BackgroundTask(shutil.rmtree, output_dir))
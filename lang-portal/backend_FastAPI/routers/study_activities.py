@@ -1,30 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select
 from datetime import datetime
+from typing import Optional
 
-from database import get_db
-from models import StudyActivity, StudySession, WordReviewItem, Group
-from schemas import StudyActivityResponse, PaginationInfo
+from database import get_async_db
+from models import StudyActivity, StudySession, Group, DailyActivity, DailyGroupActivity
+from schemas import StudyActivityResponse
+from pagination import paginate
+from responses import ORJSONResponse, session_items, session_list_select
+from cache import CATALOG_MAX_AGE, CachedRoute, cached, mark_changed
+from rollups import record_session_started
 
-import math
-
-router = APIRouter()
-
-
-def create_pagination(current_page: int, total_items: int, items_per_page: int):
-    total_pages = math.ceil(total_items / items_per_page) if total_items > 0 else 1
-    return PaginationInfo(
-        current_page=current_page,
-        total_pages=total_pages,
-        total_items=total_items,
-        items_per_page=items_per_page
-    )
+router = APIRouter(route_class=CachedRoute)
 
 
 @router.get("/study_activities")
-async def get_study_activities(db: Session = Depends(get_db)):
-    activities = db.query(StudyActivity).all()
+@cached(StudyActivity, compress_body=True, max_age=CATALOG_MAX_AGE)
+async def get_study_activities(db: AsyncSession = Depends(get_async_db)):
+    activities = (await db.scalars(select(StudyActivity))).all()
 
     items = []
     for activity in activities:
@@ -39,8 +33,9 @@ async def get_study_activities(db: Session = Depends(get_db)):
 
 
 @router.get("/study_activities/{activity_id}")
-async def get_study_activity(activity_id: int, db: Session = Depends(get_db)):
-    activity = db.query(StudyActivity).filter(StudyActivity.id == activity_id).first()
+@cached(StudyActivity)
+async def get_study_activity(activity_id: int, db: AsyncSession = Depends(get_async_db)):
+    activity = await db.get(StudyActivity, activity_id)
     if not activity:
         raise HTTPException(status_code=404, detail="Study activity not found")
 
@@ -53,42 +48,34 @@ async def get_study_activity(activity_id: int, db: Session = Depends(get_db)):
     }
 
 
-@router.get("/study_activities/{activity_id}/study_sessions")
+@router.get("/study_activities/{activity_id}/study_sessions", response_class=ORJSONResponse)
 async def get_activity_study_sessions(
     activity_id: int,
     page: int = Query(1, ge=1),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db)
 ):
     items_per_page = 20
-    offset = (page - 1) * items_per_page
 
-    total_items = db.query(func.count(StudySession.id)).filter(
-        StudySession.study_activity_id == activity_id
-    ).scalar()
-
-    sessions = db.query(StudySession).filter(
-        StudySession.study_activity_id == activity_id
-    ).offset(offset).limit(items_per_page).all()
-
-    items = []
-    for session in sessions:
-        review_count = db.query(func.count(WordReviewItem.study_session_id)).filter(
-            WordReviewItem.study_session_id == session.id
-        ).scalar()
-
-        items.append({
-            "id": session.id,
-            "activity_name": session.activity.name,
-            "group_name": session.group.name,
-            "start_time": session.created_at.isoformat() + "Z",
-            "end_time": (session.ended_at or datetime.utcnow()).isoformat() + "Z",
-            "review_items_count": review_count
-        })
+    rows, pagination = await paginate(
+        db,
+        session_list_select().where(StudySession.study_activity_id == activity_id),
+        keys=[StudySession.id],
+        row_key=lambda row: (row.id,),
+        page=page,
+        cursor=cursor,
+        items_per_page=items_per_page,
+        include_total=include_total,
+        count_stmt=select(func.count(StudySession.id)).where(
+            StudySession.study_activity_id == activity_id
+        )
+    )
 
-    return {
-        "items": items,
-        "pagination": create_pagination(page, total_items, items_per_page)
-    }
+    return ORJSONResponse({
+        "items": session_items(rows),
+        "pagination": pagination
+    })
 
 
 # MOVED FROM study_sessions.py - This route belongs here according to specs
@@ -96,14 +83,14 @@ async def get_activity_study_sessions(
 async def create_study_session(
     group_id: int = Query(...),
     study_activity_id: int = Query(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """POST /api/study_activities
     Request Params: group_id integer, study_activity_id integer
     Creates a new study session for the specified group and activity
     """
-    group = db.query(Group).filter(Group.id == group_id).first()
-    activity = db.query(StudyActivity).filter(StudyActivity.id == study_activity_id).first()
+    group = await db.get(Group, group_id)
+    activity = await db.get(StudyActivity, study_activity_id)
 
     if not group:
         raise HTTPException(status_code=404, detail="Group not found")
@@ -112,12 +99,15 @@ async def create_study_session(
 
     session = StudySession(
         group_id=group_id,
-        study_activity_id=study_activity_id
+        study_activity_id=study_activity_id,
+        created_at=datetime.utcnow()
     )
 
     db.add(session)
-    db.commit()
-    db.refresh(session)
+    await record_session_started(db, group_id, session.created_at)
+    mark_changed(db, StudySession, DailyActivity, DailyGroupActivity)
+    await db.commit()
+    await db.refresh(session)
 
     return {
         "id": session.id,
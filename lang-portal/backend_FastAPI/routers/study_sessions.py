@@ -1,48 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import datetime
-from database import get_db
+from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlalchemy import func, select, update, delete
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from database import Base, get_async_db
 from models import (
     StudySession,
     WordReviewItem,
     Word,
     Group,
     StudyActivity,
-    WordGroup
+    WordGroup,
+    WordReviewStats,
+    WordSchedule,
+    DailyActivity,
+    DailyGroupActivity
 )
 from schemas import (
     ReviewRequest,
-    WordResponse,
-    PaginationInfo
+    BulkReviewItem,
+    BulkReviewResponse,
+    NextWord
 )
-import math
+from pagination import paginate
+from responses import WORD_FIELDS, ORJSONResponse, group_words_select, project, session_items, session_list_select
+from reviews import write_reviews
+from review_buffer import review_buffer
+from rollups import record_session_ended
+from cache import mark_changed
+from search import words_fts
+from autocomplete import autocomplete_index
+from membership import membership_index
 
 router = APIRouter()
 
-
-def get_word_stats(db: Session, word_id: int):
-    correct_count = db.query(func.count(WordReviewItem.word_id)).filter(
-        WordReviewItem.word_id == word_id,
-        WordReviewItem.correct == True
-    ).scalar() or 0
-
-    wrong_count = db.query(func.count(WordReviewItem.word_id)).filter(
-        WordReviewItem.word_id == word_id,
-        WordReviewItem.correct == False
-    ).scalar() or 0
-
-    return correct_count, wrong_count
-
-
-def create_pagination(current_page: int, total_items: int, items_per_page: int):
-    total_pages = math.ceil(total_items / items_per_page) if total_items > 0 else 1
-    return PaginationInfo(
-        current_page=current_page,
-        total_pages=total_pages,
-        total_items=total_items,
-        items_per_page=items_per_page
-    )
+# Client clocks run a little ahead of ours; further than this is an error
+ANSWERED_AT_SKEW = timedelta(minutes=1)
 
 
 def format_session_times(session):
@@ -60,49 +54,44 @@ def format_session_times(session):
     return start_time, end_time
 
 
-@router.get("/study_sessions")
+@router.get("/study_sessions", response_class=ORJSONResponse)
 async def get_study_sessions(
     page: int = Query(1, ge=1),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db)
 ):
     items_per_page = 100
-    offset = (page - 1) * items_per_page
-
-    total_items = db.query(func.count(StudySession.id)).scalar()
-    sessions = db.query(StudySession).offset(offset).limit(items_per_page).all()
-
-    items = []
-    for session in sessions:
-        review_count = db.query(func.count(WordReviewItem.study_session_id)).filter(
-            WordReviewItem.study_session_id == session.id
-        ).scalar()
-
-        start_time, end_time = format_session_times(session)
-
-        items.append({
-            "id": session.id,
-            "activity_name": session.activity.name,
-            "group_name": session.group.name,
-            "start_time": start_time,
-            "end_time": end_time,
-            "review_items_count": review_count
-        })
 
-    return {
-        "items": items,
-        "pagination": create_pagination(page, total_items, items_per_page)
-    }
+    rows, pagination = await paginate(
+        db,
+        session_list_select(),
+        keys=[StudySession.id],
+        row_key=lambda row: (row.id,),
+        page=page,
+        cursor=cursor,
+        items_per_page=items_per_page,
+        include_total=include_total,
+        count_stmt=select(func.count(StudySession.id))
+    )
+
+    return ORJSONResponse({
+        "items": session_items(rows),
+        "pagination": pagination
+    })
 
 
 @router.get("/study_session/{session_id}")
-async def get_study_session(session_id: int, db: Session = Depends(get_db)):
-    session = db.query(StudySession).filter(StudySession.id == session_id).first()
+async def get_study_session(session_id: int, db: AsyncSession = Depends(get_async_db)):
+    session = await db.get(StudySession, session_id, options=[
+        joinedload(StudySession.activity), joinedload(StudySession.group)
+    ])
     if not session:
         raise HTTPException(status_code=404, detail="Study session not found")
 
-    review_count = db.query(func.count(WordReviewItem.study_session_id)).filter(
+    review_count = await db.scalar(select(func.count(WordReviewItem.study_session_id)).where(
         WordReviewItem.study_session_id == session.id
-    ).scalar()
+    ))
 
     start_time, end_time = format_session_times(session)
 
@@ -116,42 +105,105 @@ async def get_study_session(session_id: int, db: Session = Depends(get_db)):
     }
 
 
-@router.get("/study_session/{session_id}/words")
+@router.get("/study_session/{session_id}/words", response_class=ORJSONResponse)
 async def get_study_session_words(
     session_id: int,
     page: int = Query(1, ge=1),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    session = db.query(StudySession).filter(StudySession.id == session_id).first()
+    session = await db.get(StudySession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Study session not found")
 
     items_per_page = 100
-    offset = (page - 1) * items_per_page
 
-    total_items = db.query(func.count(Word.id)).join(WordGroup).filter(
-        WordGroup.group_id == session.group_id
-    ).scalar()
+    rows, pagination = await paginate(
+        db,
+        group_words_select(session.group_id),
+        keys=[Word.id],
+        row_key=lambda row: (row.id,),
+        page=page,
+        cursor=cursor,
+        items_per_page=items_per_page,
+        include_total=include_total,
+        count_stmt=select(func.count(Word.id)).join(WordGroup).where(
+            WordGroup.group_id == session.group_id
+        )
+    )
 
-    words = db.query(Word).join(WordGroup).filter(
-        WordGroup.group_id == session.group_id
-    ).offset(offset).limit(items_per_page).all()
+    return ORJSONResponse({
+        "items": project(rows, WORD_FIELDS),
+        "pagination": pagination
+    })
 
-    items = []
-    for word in words:
-        correct_count, wrong_count = get_word_stats(db, word.id)
-        items.append(WordResponse(
+
+@router.get("/study_sessions/{session_id}/next_words")
+async def get_next_words(
+    session_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """GET /api/study_sessions/:id/next_words
+    The next words to study from the session's group: words whose
+    spaced-repetition review is due (most overdue first), then words
+    never reviewed. Due words come off the word_schedules due_at index.
+    """
+    session = await db.get(StudySession, session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Study session not found")
+
+    now = datetime.utcnow()
+    in_group = WordGroup.group_id == session.group_id
+
+    due = (await db.execute(
+        select(Word, WordSchedule)
+        .join(WordSchedule, WordSchedule.word_id == Word.id)
+        .join(WordGroup, WordGroup.word_id == Word.id)
+        .where(in_group, WordSchedule.due_at <= now)
+        .order_by(WordSchedule.due_at, WordSchedule.word_id)
+        .limit(limit)
+    )).all()
+
+    new = []
+    if len(due) < limit:
+        new = (await db.scalars(
+            select(Word)
+            .join(WordGroup, WordGroup.word_id == Word.id)
+            .outerjoin(WordSchedule, WordSchedule.word_id == Word.id)
+            .where(in_group, WordSchedule.word_id.is_(None))
+            .order_by(Word.id)
+            .limit(limit - len(due))
+        )).all()
+
+    items = [
+        NextWord(
+            id=word.id,
             korean=word.korean,
             transliteration=word.transliteration,
             english=word.english,
-            correct_count=correct_count,
-            wrong_count=wrong_count
-        ))
+            is_new=False,
+            due_at=schedule.due_at.isoformat() + "Z",
+            interval_days=schedule.interval_days,
+            repetitions=schedule.repetitions
+        )
+        for word, schedule in due
+    ] + [
+        NextWord(
+            id=word.id,
+            korean=word.korean,
+            transliteration=word.transliteration,
+            english=word.english,
+            is_new=True,
+            due_at=None,
+            interval_days=0.0,
+            repetitions=0
+        )
+        for word in new
+    ]
 
-    return {
-        "items": items,
-        "pagination": create_pagination(page, total_items, items_per_page)
-    }
+    return {"items": items}
 
 
 @router.post("/study_sessions/{session_id}/words/{word_id}/review")
@@ -159,39 +211,105 @@ async def create_word_review(
     session_id: int,
     word_id: int,
     review: ReviewRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    session = db.query(StudySession).filter(StudySession.id == session_id).first()
-    word = db.query(Word).filter(Word.id == word_id).first()
+    session = await db.get(StudySession, session_id)
+    word = await db.get(Word, word_id)
 
     if not session:
         raise HTTPException(status_code=404, detail="Study session not found")
     if not word:
         raise HTTPException(status_code=404, detail="Word not found")
 
-    review_item = WordReviewItem(
-        word_id=word_id,
-        study_session_id=session_id,
-        correct=review.correct
-    )
+    created_at = datetime.utcnow()
+    row = {
+        "word_id": word_id,
+        "study_session_id": session_id,
+        "correct": review.correct,
+        "created_at": created_at
+    }
 
-    db.add(review_item)
-    db.commit()
+    if review_buffer.running:
+        # Group commit / write-behind, see review_buffer.py. Hand the
+        # connection back before waiting on the batch commit
+        await db.close()
+        await review_buffer.submit(row)
+    else:
+        await write_reviews(db, [row])
+        await db.commit()
 
     return {
         "success": True,
         "word_id": word_id,
         "study_session_id": session_id,
         "correct": review.correct,
-        "created_at": review_item.created_at.isoformat() + "Z"
+        "created_at": created_at.isoformat() + "Z"
     }
 
 
+@router.post("/study_sessions/{session_id}/reviews")
+async def create_word_reviews(
+    session_id: int,
+    reviews: List[BulkReviewItem] = Body(..., min_length=1, max_length=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """POST /api/study_sessions/:id/reviews
+    Records a whole run of answers ([{word_id, correct, answered_at}]) in one
+    transaction. Word ids are validated with a single query and nothing is
+    written if any of them is unknown, or if an answered_at is in the future.
+    """
+    session = await db.get(StudySession, session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Study session not found")
+
+    word_ids = {review.word_id for review in reviews}
+    found_ids = set((await db.scalars(select(Word.id).where(Word.id.in_(word_ids)))).all())
+    missing_ids = sorted(word_ids - found_ids)
+    if missing_ids:
+        raise HTTPException(status_code=404, detail=f"Words not found: {missing_ids}")
+
+    now = datetime.utcnow()
+    rows = []
+    for review in reviews:
+        created_at = now
+        if review.answered_at:
+            created_at = review.answered_at
+            if created_at.tzinfo:
+                # Stored timestamps are naive UTC like datetime.utcnow()
+                created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+            if created_at > now + ANSWERED_AT_SKEW:
+                raise HTTPException(status_code=400, detail=f"answered_at is in the future: {review.answered_at}")
+        rows.append({
+            "word_id": review.word_id,
+            "study_session_id": session_id,
+            "correct": review.correct,
+            "created_at": created_at
+        })
+
+    await write_reviews(db, rows)
+    await db.commit()
+
+    return BulkReviewResponse(
+        success=True,
+        study_session_id=session_id,
+        reviews_created=len(rows),
+        correct_count=sum(1 for row in rows if row["correct"])
+    )
+
+
+@router.get("/review_buffer")
+async def get_review_buffer_stats():
+    """GET /api/review_buffer
+    Queue depth and flush counters of the review write buffer
+    """
+    return review_buffer.stats()
+
+
 # NEW ENDPOINT: End a study session
 @router.post("/study_sessions/{session_id}/end")
-async def end_study_session(session_id: int, db: Session = Depends(get_db)):
+async def end_study_session(session_id: int, db: AsyncSession = Depends(get_async_db)):
     """End a study session by setting ended_at timestamp"""
-    session = db.query(StudySession).filter(StudySession.id == session_id).first()
+    session = await db.get(StudySession, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Study session not found")
     
@@ -199,7 +317,9 @@ async def end_study_session(session_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Study session already ended")
     
     session.ended_at = datetime.utcnow()
-    db.commit()
+    await record_session_ended(db, session.ended_at)
+    mark_changed(db, StudySession, DailyActivity)
+    await db.commit()
     
     return {
         "success": True,
@@ -209,10 +329,26 @@ async def end_study_session(session_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/reset/history")
-async def reset_history(db: Session = Depends(get_db)):
-    db.query(WordReviewItem).delete()
-    db.query(StudySession).delete()
-    db.commit()
+async def reset_history(db: AsyncSession = Depends(get_async_db)):
+    # Answers still queued in the review buffer are written first and wiped with the rest
+    async with review_buffer.drained():
+        await db.execute(delete(WordReviewItem))
+        await db.execute(delete(StudySession))
+        await db.execute(delete(DailyActivity))
+        await db.execute(delete(DailyGroupActivity))
+        await db.execute(delete(WordSchedule))
+        await db.execute(update(WordReviewStats).values(
+            correct_count=0,
+            wrong_count=0,
+            review_count=0,
+            accuracy=0.0,
+            last_reviewed_at=None
+        ))
+        mark_changed(
+            db, WordReviewItem, StudySession, DailyActivity, DailyGroupActivity, WordReviewStats, WordSchedule
+        )
+        await db.commit()
+        membership_index.clear_studied()
 
     return {
         "success": True,
@@ -221,16 +357,25 @@ async def reset_history(db: Session = Depends(get_db)):
 
 
 @router.post("/full_reset")
-async def full_reset(db: Session = Depends(get_db)):
+async def full_reset(db: AsyncSession = Depends(get_async_db)):
     from models import WordGroup, Group, Word, StudyActivity
 
-    db.query(WordReviewItem).delete()
-    db.query(StudySession).delete()
-    db.query(WordGroup).delete()
-    db.query(Word).delete()
-    db.query(Group).delete()
-    db.query(StudyActivity).delete()
-    db.commit()
+    async with review_buffer.drained():
+        await db.execute(delete(WordReviewItem))
+        await db.execute(delete(WordReviewStats))
+        await db.execute(delete(WordSchedule))
+        await db.execute(delete(DailyActivity))
+        await db.execute(delete(DailyGroupActivity))
+        await db.execute(delete(StudySession))
+        await db.execute(delete(WordGroup))
+        await db.execute(delete(Word))
+        await db.execute(delete(words_fts))
+        await db.execute(delete(Group))
+        await db.execute(delete(StudyActivity))
+        mark_changed(db, *Base.metadata.tables)
+        await db.commit()
+        autocomplete_index.clear()
+        membership_index.clear()
 
     return {
         "success": True,
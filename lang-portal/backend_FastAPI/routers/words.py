@@ -1,57 +1,189 @@
 # routers/words.py
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-
-from database import get_db
-from models import Word, WordReviewItem
-from schemas import WordResponse, WordDetailResponse, WordStats, GroupInfo, PaginationInfo
-
-import math
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy import func, select
+from typing import List, Optional
+
+from database import get_async_db
+from models import Word, WordReviewStats
+from schemas import (
+    CursorPaginationInfo,
+    WordDetailResponse,
+    WordStats,
+    GroupInfo,
+    WordSearchResult,
+    WordSearchResponse,
+    WordSuggestion,
+    WordSuggestionResponse
+)
+from pagination import decode_cursor, encode_cursor, paginate
+from responses import WORD_COLUMNS, WORD_FIELDS, ORJSONResponse, project
+from autocomplete import autocomplete_index
+from membership import iter_ids, membership_index
+from search import search_word_ids
+from stats import get_word_stats, get_word_stats_bulk
 
 router = APIRouter()
 
 
-def get_word_stats(db: Session, word_id: int):
-    correct_count = db.query(func.count(WordReviewItem.word_id)).filter(
-        WordReviewItem.word_id == word_id,
-        WordReviewItem.correct == True
-    ).scalar() or 0
-
-    wrong_count = db.query(func.count(WordReviewItem.word_id)).filter(
-        WordReviewItem.word_id == word_id,
-        WordReviewItem.correct == False
-    ).scalar() or 0
+# Sort keys backed by the word_review_stats indexes
+SORT_COLUMNS = {
+    "accuracy": WordReviewStats.accuracy,
+    "review_count": WordReviewStats.review_count,
+}
 
-    return correct_count, wrong_count
 
-
-def create_pagination(current_page: int, total_items: int, items_per_page: int):
-    total_pages = math.ceil(total_items / items_per_page) if total_items > 0 else 1
-    return PaginationInfo(
-        current_page=current_page,
-        total_pages=total_pages,
-        total_items=total_items,
-        items_per_page=items_per_page
-    )
-
-
-@router.get("/words")
+@router.get("/words", response_class=ORJSONResponse)
 async def get_words(
     page: int = Query(1, ge=1),
-    db: Session = Depends(get_db)
+    sort_by: str = Query("id", pattern="^(id|accuracy|review_count)$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db)
 ):
     items_per_page = 100
-    offset = (page - 1) * items_per_page
 
-    total_items = db.query(func.count(Word.id)).scalar()
-    words = db.query(Word).offset(offset).limit(items_per_page).all()
+    # The item columns, then the sort keys for the cursor
+    if sort_by == "id":
+        stmt = select(*WORD_COLUMNS, Word.id).outerjoin(WordReviewStats, WordReviewStats.word_id == Word.id)
+        keys = [Word.id]
+        count_stmt = select(func.count(Word.id))
+    else:
+        # Inner join so SQLite can walk the (sort column, word_id) index
+        # and look words up by primary key instead of sorting every row
+        keys = [SORT_COLUMNS[sort_by], WordReviewStats.word_id]
+        stmt = select(*WORD_COLUMNS, *keys).join(WordReviewStats, WordReviewStats.word_id == Word.id)
+        count_stmt = select(func.count(WordReviewStats.word_id))
+
+    rows, pagination = await paginate(
+        db,
+        stmt,
+        keys=keys,
+        row_key=lambda row: tuple(row[len(WORD_COLUMNS):]),
+        page=page,
+        cursor=cursor,
+        items_per_page=items_per_page,
+        descending=order == "desc",
+        include_total=include_total,
+        count_stmt=count_stmt
+    )
+
+    return ORJSONResponse({
+        "items": project(rows, WORD_FIELDS),
+        "pagination": pagination
+    })
+
+
+# Declared before /words/{word_id} so "search", "autocomplete" and "query" aren't parsed as ids
+@router.get("/words/autocomplete")
+async def autocomplete_words(
+    q: str = Query(..., min_length=1, max_length=50),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """GET /api/words/autocomplete?q=
+    Prefix suggestions on Hangul (partial syllables included), choseong
+    (ㄱㅅ -> 감사합니다), romanization or English, served from memory
+    """
+    if autocomplete_index.is_stale():
+        await db.run_sync(autocomplete_index.load)
+    return WordSuggestionResponse(items=[
+        WordSuggestion(id=word_id, korean=korean, transliteration=transliteration, english=english)
+        for word_id, korean, transliteration, english in autocomplete_index.search(q, limit)
+    ])
+
+
+@router.get("/words/query", response_class=ORJSONResponse)
+async def query_words(
+    in_all: List[int] = Query([]),
+    in_any: List[int] = Query([]),
+    not_in: List[int] = Query([]),
+    studied: Optional[bool] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """GET /api/words/query?in_all=&in_any=&not_in=&studied=
+    Words in every in_all group, at least one in_any group and no not_in
+    group, optionally only studied or never studied ones. The set is worked
+    out on the in-memory membership bitmaps; only the page of words is read
+    from the database, in id order
+    """
+    if membership_index.is_stale():
+        await db.run_sync(membership_index.load)
+
+    group_ids = {*in_all, *in_any, *not_in}
+    if not group_ids.issubset(membership_index.groups):
+        raise HTTPException(status_code=404, detail="Group not found")
+
+    matches = membership_index.query(in_all, in_any, not_in, studied)
+
+    start = 0
+    if cursor:
+        last_id, = decode_cursor(cursor, [int])
+        if last_id < 0:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        start = last_id + 1
+
+    # One extra id to learn whether another page exists
+    word_ids = []
+    for word_id in iter_ids(matches, start):
+        word_ids.append(word_id)
+        if len(word_ids) > limit:
+            break
+    next_cursor = None
+    if len(word_ids) > limit:
+        word_ids = word_ids[:limit]
+        next_cursor = encode_cursor([word_ids[-1]])
+
+    rows = []
+    if word_ids:
+        rows = (await db.execute(
+            select(Word.id, *WORD_COLUMNS).outerjoin(
+                WordReviewStats, WordReviewStats.word_id == Word.id
+            ).where(Word.id.in_(word_ids)).order_by(Word.id)
+        )).all()
+
+    return ORJSONResponse({
+        "items": project(rows, ("id", *WORD_FIELDS)),
+        "pagination": CursorPaginationInfo(
+            items_per_page=limit,
+            next_cursor=next_cursor,
+            total_items=matches.bit_count()
+        )
+    })
+
+
+@router.get("/words/search")
+async def search_words(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """GET /api/words/search?q=
+    Full-text search over Hangul (jamo aware), romanization and English,
+    ranked by bm25 through the words_fts index
+    """
+    word_ids = await search_word_ids(db, q, limit)
+    words = {
+        word.id: word
+        for word in (await db.scalars(select(Word).where(Word.id.in_(word_ids)))).all()
+    }
+    stats = await get_word_stats_bulk(db, word_ids)
 
     items = []
-    for word in words:
-        correct_count, wrong_count = get_word_stats(db, word.id)
-        items.append(WordResponse(
+    for word_id in word_ids:
+        # words_fts can still hold a word deleted outside the ORM hooks
+        # until ensure_search_index() runs on the next start
+        word = words.get(word_id)
+        if word is None:
+            continue
+        correct_count, wrong_count = stats[word_id]
+        items.append(WordSearchResult(
+            id=word.id,
             korean=word.korean,
             transliteration=word.transliteration,
             english=word.english,
@@ -59,19 +191,18 @@ async def get_words(
             wrong_count=wrong_count
         ))
 
-    return {
-        "items": items,
-        "pagination": create_pagination(page, total_items, items_per_page)
-    }
+    return WordSearchResponse(items=items)
 
 
 @router.get("/words/{word_id}")
-async def get_word(word_id: int, db: Session = Depends(get_db)):
-    word = db.query(Word).filter(Word.id == word_id).first()
+async def get_word(word_id: int, db: AsyncSession = Depends(get_async_db)):
+    word = await db.scalar(
+        select(Word).options(selectinload(Word.groups)).where(Word.id == word_id)
+    )
     if not word:
         raise HTTPException(status_code=404, detail="Word not found")
 
-    correct_count, wrong_count = get_word_stats(db, word.id)
+    correct_count, wrong_count = await get_word_stats(db, word.id)
 
     # FIXED: Now properly typed as List[GroupInfo] instead of List[dict]
     groups = [GroupInfo(id=group.id, name=group.name) for group in word.groups]
@@ -82,4 +213,4 @@ async def get_word(word_id: int, db: Session = Depends(get_db)):
         english=word.english,
         stats=WordStats(correct_count=correct_count, wrong_count=wrong_count),
         groups=groups
-    )
\ No newline at end of file
+    )
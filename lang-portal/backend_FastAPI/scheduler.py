@@ -0,0 +1,145 @@
+from datetime import timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from cache import mark_changed
+from models import WordReviewItem, WordSchedule
+
+# SM-2 with pass/fail answers mapped onto its 0-5 quality scale
+CORRECT_QUALITY = 4
+WRONG_QUALITY = 2
+MIN_EASE = 1.3
+INITIAL_EASE = 2.5
+# Long correct streaks would otherwise grow the interval past datetime's range
+MAX_INTERVAL_DAYS = 36500.0
+# A missed word comes back within the same study session
+RELEARN_DELAY = timedelta(minutes=10)
+
+SCHEDULE_FIELDS = ("repetitions", "interval_days", "ease", "lapses", "due_at", "last_reviewed_at")
+
+
+def new_schedule(word_id):
+    return {"word_id": word_id, "repetitions": 0, "interval_days": 0.0, "ease": INITIAL_EASE, "lapses": 0}
+
+
+def apply_review(schedule, correct, reviewed_at):
+    """Advance one word's schedule dict by a single answer (SM-2)"""
+    quality = CORRECT_QUALITY if correct else WRONG_QUALITY
+    schedule["ease"] = max(
+        MIN_EASE, schedule["ease"] + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
+    )
+
+    if correct:
+        if schedule["repetitions"] == 0:
+            schedule["interval_days"] = 1.0
+        elif schedule["repetitions"] == 1:
+            schedule["interval_days"] = 6.0
+        else:
+            schedule["interval_days"] = min(
+                MAX_INTERVAL_DAYS, round(schedule["interval_days"] * schedule["ease"], 2)
+            )
+        schedule["repetitions"] += 1
+        schedule["due_at"] = reviewed_at + timedelta(days=schedule["interval_days"])
+    else:
+        schedule["repetitions"] = 0
+        schedule["interval_days"] = 0.0
+        schedule["lapses"] += 1
+        schedule["due_at"] = reviewed_at + RELEARN_DELAY
+
+    schedule["last_reviewed_at"] = reviewed_at
+    return schedule
+
+
+async def record_schedules(db: AsyncSession, reviews):
+    """Fold (word_id, correct, reviewed_at) tuples into word_schedules.
+
+    Reads the current state, replays the answers in time order and writes
+    it back. Call it after the transaction's first write, so SQLite's
+    write lock is already held and no other writer can interleave between
+    the read and the upsert.
+
+    SM-2 state only moves forward, so an answer older than the word's
+    last_reviewed_at (a backdated answered_at, buffered rows arriving out
+    of order) can't be folded in. Those words are replayed from their
+    whole review history instead, which already holds the new rows.
+    """
+    word_ids = {word_id for word_id, _, _ in reviews}
+    if not word_ids:
+        return
+
+    schedules = {word_id: new_schedule(word_id) for word_id in word_ids}
+    rows = await db.execute(
+        select(WordSchedule.word_id, *(getattr(WordSchedule, field) for field in SCHEDULE_FIELDS))
+        .where(WordSchedule.word_id.in_(word_ids))
+    )
+    for row in rows:
+        schedules[row.word_id].update(row._mapping)
+
+    out_of_order = {
+        word_id for word_id, _, reviewed_at in reviews
+        if schedules[word_id].get("last_reviewed_at") and reviewed_at < schedules[word_id]["last_reviewed_at"]
+    }
+    if out_of_order:
+        history = await db.execute(
+            select(WordReviewItem.word_id, WordReviewItem.correct, WordReviewItem.created_at)
+            .where(WordReviewItem.word_id.in_(out_of_order))
+            .order_by(WordReviewItem.word_id, WordReviewItem.created_at, WordReviewItem.id)
+        )
+        for word_id in out_of_order:
+            schedules[word_id] = new_schedule(word_id)
+        for word_id, correct, reviewed_at in history:
+            apply_review(schedules[word_id], correct, reviewed_at)
+        reviews = [review for review in reviews if review[0] not in out_of_order]
+
+    for word_id, correct, reviewed_at in sorted(reviews, key=lambda review: review[2]):
+        apply_review(schedules[word_id], correct, reviewed_at)
+
+    stmt = sqlite_insert(WordSchedule)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[WordSchedule.word_id],
+        set_={field: getattr(stmt.excluded, field) for field in SCHEDULE_FIELDS}
+    )
+    await db.execute(stmt, list(schedules.values()))
+
+
+# Maintenance helpers below run on a sync Session from tasks.py, seeds and startup
+def rebuild_schedules(db: Session, chunk_size=5000):
+    """Replay the whole review history into word_schedules. Returns the row count."""
+    db.query(WordSchedule).delete()
+
+    reviews = db.execute(
+        select(WordReviewItem.word_id, WordReviewItem.correct, WordReviewItem.created_at)
+        .order_by(WordReviewItem.word_id, WordReviewItem.created_at, WordReviewItem.id)
+        .execution_options(yield_per=chunk_size)
+    )
+
+    batch, schedule, row_count = [], None, 0
+    for word_id, correct, created_at in reviews:
+        if schedule is None or schedule["word_id"] != word_id:
+            if schedule is not None:
+                batch.append(schedule)
+            schedule = new_schedule(word_id)
+        apply_review(schedule, correct, created_at)
+
+        if len(batch) >= chunk_size:
+            db.execute(insert(WordSchedule), batch)
+            row_count += len(batch)
+            batch = []
+
+    if schedule is not None:
+        batch.append(schedule)
+    if batch:
+        db.execute(insert(WordSchedule), batch)
+        row_count += len(batch)
+    mark_changed(db, WordSchedule)
+    return row_count
+
+
+def backfill_schedules(db: Session):
+    """Build word_schedules for databases that have reviews but no schedules yet"""
+    if db.query(WordSchedule.word_id).first() is None and db.query(WordReviewItem.id).first() is not None:
+        rebuild_schedules(db)
+        db.commit()
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
 from typing import List, Optional
+from datetime import datetime
 
 
 # ---------- Pagination ----------
@@ -10,6 +11,12 @@ class PaginationInfo(BaseModel):
     items_per_page: int
 
 
+class CursorPaginationInfo(BaseModel):
+    items_per_page: int
+    next_cursor: Optional[str]  # None on the last page
+    total_items: Optional[int]  # Only counted when include_total=true
+
+
 # ---------- Word ----------
 class WordStats(BaseModel):
     correct_count: int
@@ -24,6 +31,17 @@ class WordResponse(BaseModel):
     wrong_count: int
 
 
+class NextWord(BaseModel):
+    id: int
+    korean: str
+    transliteration: str
+    english: str
+    is_new: bool  # Never reviewed, no schedule yet
+    due_at: Optional[str]
+    interval_days: float
+    repetitions: int
+
+
 class GroupInfo(BaseModel):
     id: int
     name: str
@@ -42,6 +60,30 @@ class WordListResponse(BaseModel):
     pagination: PaginationInfo
 
 
+class WordSearchResult(BaseModel):
+    id: int
+    korean: str
+    transliteration: str
+    english: str
+    correct_count: int
+    wrong_count: int
+
+
+class WordSearchResponse(BaseModel):
+    items: List[WordSearchResult]  # Best match first
+
+
+class WordSuggestion(BaseModel):
+    id: int
+    korean: str
+    transliteration: str
+    english: str
+
+
+class WordSuggestionResponse(BaseModel):
+    items: List[WordSuggestion]
+
+
 # ---------- Group ----------
 class GroupResponse(BaseModel):
     id: int
@@ -163,6 +205,19 @@ class ReviewResponse(BaseModel):
     created_at: str
 
 
+class BulkReviewItem(BaseModel):
+    word_id: int
+    correct: bool
+    answered_at: Optional[datetime] = None  # Defaults to the time of the request
+
+
+class BulkReviewResponse(BaseModel):
+    success: bool
+    study_session_id: int
+    reviews_created: int
+    correct_count: int
+
+
 # ---------- Reset ----------
 class ResetResponse(BaseModel):
     success: bool
@@ -0,0 +1,147 @@
+from sqlalchemy import DDL, Column, Integer, MetaData, Table, Text, delete, event, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database import Base
+from hangul import decompose, has_hangul
+from models import Word
+
+# FTS5 index over the vocabulary, one row per word with rowid = words.id.
+# Hangul is stored spelled out as jamo so the trigram tokenizer indexes
+# jamo n-grams and a half-typed syllable ('하' for '한') still matches.
+# Kept out of Base.metadata: create_all can't create virtual tables.
+words_fts = Table(
+    "words_fts", MetaData(),
+    Column("rowid", Integer, primary_key=True),
+    Column("korean_jamo", Text),
+    Column("transliteration", Text),
+    Column("english", Text),
+)
+
+CREATE_WORDS_FTS = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS words_fts "
+    "USING fts5(korean_jamo, transliteration, english, tokenize='trigram')"
+)
+
+# Create and drop it alongside the ORM tables
+event.listen(Base.metadata, "after_create", DDL(CREATE_WORDS_FTS))
+event.listen(Base.metadata, "before_drop", DDL("DROP TABLE IF EXISTS words_fts"))
+
+# bm25 column weights: a Hangul hit counts double
+BM25_WEIGHTS = (2.0, 1.0, 1.0)
+
+# The trigram tokenizer can't serve terms shorter than this through MATCH
+MIN_MATCH_LENGTH = 3
+
+
+def search_row(word):
+    return {
+        "rowid": word.id,
+        "korean_jamo": decompose(word.korean),
+        "transliteration": word.transliteration,
+        "english": word.english,
+    }
+
+
+# Keep words_fts in step with ORM writes to Word (API, seeds, tasks).
+# Bulk Core statements bypass these; ensure_search_index() catches up.
+@event.listens_for(Word, "after_insert")
+def _index_word(mapper, connection, word):
+    connection.execute(insert(words_fts), [search_row(word)])
+
+
+@event.listens_for(Word, "after_update")
+def _reindex_word(mapper, connection, word):
+    connection.execute(delete(words_fts).where(words_fts.c.rowid == word.id))
+    connection.execute(insert(words_fts), [search_row(word)])
+
+
+@event.listens_for(Word, "after_delete")
+def _unindex_word(mapper, connection, word):
+    connection.execute(delete(words_fts).where(words_fts.c.rowid == word.id))
+
+
+def _fts_phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def build_search_filter(query):
+    """Turn a user query into (MATCH expression or None, LIKE clauses, params).
+
+    Every whitespace separated term must match. Hangul terms are searched
+    as jamo in korean_jamo, anything else in transliteration and english.
+    Terms too short for the trigram index fall back to LIKE.
+    """
+    match_terms, like_clauses, params = [], [], {}
+    for i, term in enumerate(query.lower().split()):
+        if has_hangul(term):
+            term, columns = decompose(term), ["korean_jamo"]
+        else:
+            columns = ["transliteration", "english"]
+
+        if len(term) >= MIN_MATCH_LENGTH:
+            match_terms.append("{" + " ".join(columns) + "} : " + _fts_phrase(term))
+        else:
+            params[f"like_{i}"] = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            like_clauses.append("(" + " OR ".join(
+                f"{column} LIKE :like_{i} ESCAPE '\\'" for column in columns
+            ) + ")")
+
+    match = " AND ".join(match_terms) or None
+    if match:
+        params["match"] = match
+    return match, like_clauses, params
+
+
+async def search_word_ids(db: AsyncSession, query: str, limit: int):
+    """Return the ids of the best matching words, best first"""
+    match, like_clauses, params = build_search_filter(query)
+    if not match and not like_clauses:
+        return []
+
+    where = " AND ".join((["words_fts MATCH :match"] if match else []) + like_clauses)
+    if match:
+        weights = ", ".join(map(str, BM25_WEIGHTS))
+        # Every match is scored before the LIMIT, so the best ones win
+        # however many words the query matches
+        sql = (
+            f"SELECT rowid FROM words_fts WHERE {where} "
+            f"ORDER BY bm25(words_fts, {weights}), rowid LIMIT :limit"
+        )
+    else:
+        sql = f"SELECT rowid FROM words_fts WHERE {where} ORDER BY rowid LIMIT :limit"
+
+    rows = await db.execute(text(sql), {**params, "limit": limit})
+    return [row[0] for row in rows]
+
+
+# Maintenance helpers below run on a sync Session from tasks.py and startup
+def rebuild_search_index(db: Session, chunk_size=5000):
+    """Refill words_fts from the words table. Returns the row count."""
+    db.execute(text(CREATE_WORDS_FTS))
+    db.execute(delete(words_fts))
+
+    last_id = 0
+    while True:
+        words = db.execute(
+            select(Word.id, Word.korean, Word.transliteration, Word.english)
+            .where(Word.id > last_id).order_by(Word.id).limit(chunk_size)
+        ).all()
+        if not words:
+            break
+        db.execute(insert(words_fts), [search_row(word) for word in words])
+        last_id = words[-1].id
+
+    return db.execute(select(func.count()).select_from(words_fts)).scalar()
+
+
+def ensure_search_index(db: Session):
+    """Create words_fts and rebuild it when it has drifted from the words table"""
+    db.execute(text(CREATE_WORDS_FTS))
+    word_count, max_word_id = db.execute(select(func.count(Word.id), func.max(Word.id))).one()
+    fts_count, max_fts_id = db.execute(
+        select(func.count(), func.max(words_fts.c.rowid)).select_from(words_fts)
+    ).one()
+    if (word_count, max_word_id) != (fts_count, max_fts_id):
+        rebuild_search_index(db)
+    db.commit()
@@ -0,0 +1,181 @@
+import glob
+import json
+import os
+import time
+
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from cache import mark_changed
+from migrator import discover_migrations, split_statements
+from models import Group, Word, WordGroup, WordReviewStats
+from search import CREATE_WORDS_FTS, search_row, words_fts
+
+# Seed files that aren't word lists
+NON_WORD_FILES = {"study_activities.json"}
+
+UNIQUE_WORD_GROUP_INDEX = "uq_words_groups_word_group"
+UNIQUE_WORD_INDEX = "uq_words_korean"
+UNIQUE_WORD_MIGRATION = "unique_words_korean"
+
+# Rows per executemany call
+CHUNK_SIZE = 5000
+
+
+def _index_exists(db: Session, name):
+    return db.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :name"
+    ), {"name": name}).first() is not None
+
+
+def ensure_unique_word_groups(db: Session):
+    """Drop duplicate words_groups links and add the unique (word_id, group_id) index.
+
+    Same as migrations/0003_unique_words_groups.sql, for databases it
+    hasn't been run on; a no-op once the index exists.
+    """
+    if _index_exists(db, UNIQUE_WORD_GROUP_INDEX):
+        return
+
+    db.execute(text(
+        "DELETE FROM words_groups WHERE id NOT IN "
+        "(SELECT MIN(id) FROM words_groups GROUP BY word_id, group_id)"
+    ))
+    db.execute(text(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS {UNIQUE_WORD_GROUP_INDEX} ON words_groups (word_id, group_id)"
+    ))
+
+
+def ensure_unique_words(db: Session):
+    """Merge words sharing a korean spelling and add the unique korean index.
+
+    Runs the statements of migrations/0005_unique_words_korean.sql, for
+    databases it hasn't been run on; a no-op once the index exists.
+    """
+    if _index_exists(db, UNIQUE_WORD_INDEX):
+        return
+
+    migration = next(m for m in discover_migrations() if m.name == UNIQUE_WORD_MIGRATION)
+    connection = db.connection()
+    for statement in split_statements(migration.sql):
+        connection.exec_driver_sql(statement)
+
+
+def parse_seed_files(seeds_dir, group_names):
+    """Read every word list in seeds_dir.
+
+    Returns (groups, words, links): group names in file order, one dict per
+    distinct korean (the first file to define it wins) and the distinct
+    (korean, group name) pairs. group_names maps file name -> group name;
+    other files are named after themselves (food_dining.json -> Food Dining).
+    """
+    groups, words, links = [], {}, set()
+    for path in sorted(glob.glob(os.path.join(seeds_dir, "*.json"))):
+        filename = os.path.basename(path)
+        if filename in NON_WORD_FILES:
+            continue
+
+        group_name = group_names.get(filename, filename.replace(".json", "").replace("_", " ").title())
+        if group_name not in groups:
+            groups.append(group_name)
+
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+
+        for entry in entries:
+            missing = {"korean", "transliteration", "english"} - set(entry)
+            if missing:
+                raise ValueError(f"{filename}: word entry without {sorted(missing)}: {entry}")
+
+            words.setdefault(entry["korean"], {
+                "korean": entry["korean"],
+                "transliteration": entry["transliteration"],
+                "english": entry["english"],
+                "parts": entry.get("parts", {}),
+            })
+            links.add((entry["korean"], group_name))
+
+    return groups, words, links
+
+
+def _chunks(rows):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        yield rows[start:start + CHUNK_SIZE]
+
+
+def bulk_load_seeds(db: Session, seeds_dir, group_names):
+    """Load all seed word lists in one transaction and return a timing report.
+
+    Groups, words (unique on korean) and word-group links go in with
+    INSERT ... ON CONFLICT DO NOTHING, so words already stored are kept
+    as they are. The new words get their words_fts rows here, which the
+    ORM hooks would otherwise have written, and their word_review_stats
+    rows from the words insert trigger.
+    """
+    report = {"timings_ms": {}}
+    started = last = time.perf_counter()
+
+    def lap(phase):
+        nonlocal last
+        now = time.perf_counter()
+        report["timings_ms"][phase] = round((now - last) * 1000, 1)
+        last = now
+
+    groups, words, links = parse_seed_files(seeds_dir, group_names)
+    report["files_words"] = len(words)
+    lap("parse")
+
+    ensure_unique_word_groups(db)
+    ensure_unique_words(db)
+    db.execute(text(CREATE_WORDS_FTS))
+    lap("schema")
+
+    if groups:
+        db.execute(
+            sqlite_insert(Group).on_conflict_do_nothing(index_elements=[Group.name]),
+            [{"name": name} for name in groups]
+        )
+    group_ids = dict(db.execute(select(Group.name, Group.id).where(Group.name.in_(groups))).all())
+    report["groups"] = len(group_ids)
+    lap("groups")
+
+    # Plain executemany on the Core tables; the new ids are read back in one
+    # query, which is safe because this transaction holds SQLite's write lock
+    last_word_id = db.execute(select(func.max(Word.id))).scalar() or 0
+    for chunk in _chunks(list(words.values())):
+        db.execute(sqlite_insert(Word.__table__).on_conflict_do_nothing(index_elements=[Word.korean]), chunk)
+
+    inserted = db.execute(
+        select(Word.id, Word.korean, Word.transliteration, Word.english).where(Word.id > last_word_id)
+    ).all()
+    for chunk in _chunks(inserted):
+        db.execute(insert(words_fts), [search_row(word) for word in chunk])
+    word_ids = {}
+    for chunk in _chunks(list(words)):
+        word_ids.update(db.execute(select(Word.korean, Word.id).where(Word.korean.in_(chunk))).all())
+    report["words_inserted"] = len(inserted)
+    report["words_existing"] = len(words) - len(inserted)
+    lap("words")
+
+    link_rows = [
+        {"word_id": word_ids[korean], "group_id": group_ids[group_name]}
+        for korean, group_name in sorted(links)
+    ]
+    links_before = db.execute(select(func.count(WordGroup.id))).scalar()
+    for chunk in _chunks(link_rows):
+        db.execute(
+            sqlite_insert(WordGroup.__table__).on_conflict_do_nothing(
+                index_elements=[WordGroup.word_id, WordGroup.group_id]
+            ),
+            chunk
+        )
+    report["links_inserted"] = db.execute(select(func.count(WordGroup.id))).scalar() - links_before
+    report["links_existing"] = len(link_rows) - report["links_inserted"]
+    lap("links")
+
+    mark_changed(db, Group, Word, WordGroup, WordReviewStats)
+    db.commit()
+    lap("commit")
+    report["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return report
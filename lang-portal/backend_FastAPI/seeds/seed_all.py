@@ -1,16 +1,29 @@
 import json
 from datetime import datetime, timedelta
+from sqlalchemy import delete
 from sqlalchemy.orm import Session
 from database import SessionLocal, engine
-from models import Base, Word, Group, WordGroup, StudyActivity, StudySession, WordReviewItem
+from models import (
+    Base, Word, Group, WordGroup, StudyActivity, StudySession, WordReviewItem, WordReviewStats,
+    WordSchedule, DailyActivity, DailyGroupActivity
+)
+from rollups import rebuild_daily_rollups
+from scheduler import rebuild_schedules
+from search import words_fts, rebuild_search_index
+from stats import rebuild_word_stats
 
 def clear_all_data(db: Session):
     """Clear all data from database"""
     print("🗑️  Clearing existing data...")
     db.query(WordReviewItem).delete()
+    db.query(WordReviewStats).delete()
+    db.query(WordSchedule).delete()
+    db.query(DailyActivity).delete()
+    db.query(DailyGroupActivity).delete()
     db.query(StudySession).delete()
     db.query(WordGroup).delete()
     db.query(Word).delete()
+    db.execute(delete(words_fts))
     db.query(Group).delete()
     db.query(StudyActivity).delete()
     db.commit()
@@ -248,6 +261,13 @@ def main():
         seed_study_sessions(db)
         seed_word_reviews(db)
         
+        # Denormalized counters and daily rollups are derived from the rows above
+        rebuild_word_stats(db)
+        rebuild_daily_rollups(db)
+        rebuild_schedules(db)
+        rebuild_search_index(db)
+        db.commit()
+        
         # Print final statistics
         print("\n🎉 Seeding completed!")
         print("=" * 40)
@@ -0,0 +1,222 @@
+"""Columnar snapshots of the review history for notebooks.
+
+write_snapshots() writes the reviews, study_sessions and words tables as
+zstd-compressed Parquet (.parquet) or Arrow IPC (.arrow) files, e.g.
+    invoke export-snapshot --output snapshots --start 2025-06-01 --end 2025-07-01
+and pandas.read_parquet / pyarrow.ipc.open_file load them without going
+through SQLite. Rows are read with fetchmany() in batches of batch_size
+on the raw SQLite connection and each batch becomes one Parquet row group
+or IPC record batch, so memory stays flat however long the history is.
+Timestamps are parsed by Arrow rather than row by row in Python.
+
+Low-cardinality text columns (group and activity names) are dictionary
+encoded; Parquet also dictionary-encodes every other column chunk where
+it pays off. pyarrow is optional: without it write_snapshots() raises
+SnapshotUnavailable.
+"""
+import os
+import time
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = ipc = pq = None
+
+from sqlalchemy.orm import Session
+
+from models import Group, StudyActivity, StudySession, Word, WordReviewItem
+
+SNAPSHOT_BATCH_SIZE = 65536
+SNAPSHOT_COMPRESSION = "zstd"
+
+SNAPSHOT_FORMATS = {
+    # format -> (file extension, media type)
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "arrow": (".arrow", "application/vnd.apache.arrow.file"),
+}
+
+# table -> (SELECT, column filtered by start/end or None, [(column, kind)])
+SNAPSHOT_TABLES = {
+    "reviews": (
+        f"SELECT id, word_id, study_session_id, correct, created_at FROM {WordReviewItem.__tablename__}",
+        "created_at",
+        [("id", "int"), ("word_id", "int"), ("study_session_id", "int"), ("correct", "bool"),
+         ("reviewed_at", "timestamp")],
+    ),
+    "study_sessions": (
+        f"SELECT s.id, s.group_id, g.name, s.study_activity_id, a.name, s.created_at, s.ended_at "
+        f"FROM {StudySession.__tablename__} s "
+        f"JOIN {Group.__tablename__} g ON g.id = s.group_id "
+        f"LEFT JOIN {StudyActivity.__tablename__} a ON a.id = s.study_activity_id",
+        "s.created_at",
+        [("id", "int"), ("group_id", "int"), ("group_name", "dictionary"), ("study_activity_id", "int"),
+         ("activity_name", "dictionary"), ("started_at", "timestamp"), ("ended_at", "timestamp")],
+    ),
+    "words": (
+        f"SELECT id, korean, transliteration, english, parts FROM {Word.__tablename__}",
+        None,
+        [("id", "int"), ("korean", "string"), ("transliteration", "string"), ("english", "string"),
+         ("parts", "string")],
+    ),
+}
+
+
+class SnapshotUnavailable(RuntimeError):
+    """pyarrow is not installed"""
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise SnapshotUnavailable("Snapshots need pyarrow: pip install pyarrow")
+
+
+def _arrow_type(kind):
+    return {
+        "int": pa.int64(),
+        "bool": pa.bool_(),
+        "timestamp": pa.timestamp("us"),
+        "string": pa.string(),
+        "dictionary": pa.dictionary(pa.int32(), pa.string()),
+    }[kind]
+
+
+def snapshot_schema(table):
+    _require_pyarrow()
+    return pa.schema([(name, _arrow_type(kind)) for name, kind in SNAPSHOT_TABLES[table][2]])
+
+
+class _Dictionary:
+    """One growing dictionary per column.
+
+    Every batch is encoded against the values seen so far plus its own new
+    ones, so each batch's dictionary extends the previous one: Arrow IPC
+    files accept that as a delta but not a replaced dictionary.
+    """
+
+    def __init__(self):
+        self.values = []
+        self.indices = {}
+
+    def encode(self, column):
+        indices = []
+        for value in column:
+            if value is None:
+                indices.append(None)
+                continue
+            index = self.indices.get(value)
+            if index is None:
+                index = self.indices[value] = len(self.values)
+                self.values.append(value)
+            indices.append(index)
+        return pa.DictionaryArray.from_arrays(pa.array(indices, pa.int32()), pa.array(self.values, pa.string()))
+
+
+def _arrow_column(kind, values, dictionary):
+    if kind == "dictionary":
+        return dictionary.encode(values)
+    if kind == "timestamp":
+        # Stored as text like '2025-06-01 09:14:05.123456'
+        return pa.array(values, pa.string()).cast(pa.timestamp("us"))
+    if kind == "bool":
+        return pa.array(values, pa.int8()).cast(pa.bool_())
+    return pa.array(values, _arrow_type(kind))
+
+
+def _filter_sql(table, start, end):
+    select_sql, time_column, _ = SNAPSHOT_TABLES[table]
+    conditions, params = [], []
+    if time_column is not None:
+        # Same text format SQLAlchemy stores DateTime columns in
+        if start is not None:
+            conditions.append(f"{time_column} >= ?")
+            params.append(start.isoformat(" ", "microseconds"))
+        if end is not None:
+            conditions.append(f"{time_column} < ?")
+            params.append(end.isoformat(" ", "microseconds"))
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    id_column = "s.id" if table == "study_sessions" else "id"
+    return f"{select_sql}{where} ORDER BY {id_column}", params
+
+
+def record_batches(connection, table, start=None, end=None, batch_size=SNAPSHOT_BATCH_SIZE):
+    """Yield the table as Arrow record batches from a DBAPI connection"""
+    schema = snapshot_schema(table)
+    columns = SNAPSHOT_TABLES[table][2]
+    dictionaries = {name: _Dictionary() for name, kind in columns if kind == "dictionary"}
+    sql, params = _filter_sql(table, start, end)
+
+    cursor = connection.cursor()
+    try:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            arrays = [
+                _arrow_column(kind, values, dictionaries.get(name))
+                for (name, kind), values in zip(columns, zip(*rows))
+            ]
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+    finally:
+        cursor.close()
+
+
+def write_snapshot(connection, table, path, format="parquet", start=None, end=None,
+                   batch_size=SNAPSHOT_BATCH_SIZE):
+    """Write one table to path and return the number of rows written"""
+    _require_pyarrow()
+    schema = snapshot_schema(table)
+    rows = 0
+    if format == "parquet":
+        with pq.ParquetWriter(path, schema, compression=SNAPSHOT_COMPRESSION) as writer:
+            for batch in record_batches(connection, table, start, end, batch_size):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    elif format == "arrow":
+        options = ipc.IpcWriteOptions(compression=SNAPSHOT_COMPRESSION, emit_dictionary_deltas=True)
+        with ipc.new_file(path, schema, options=options) as writer:
+            for batch in record_batches(connection, table, start, end, batch_size):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    else:
+        raise ValueError(f"Unknown snapshot format {format!r}, expected one of {list(SNAPSHOT_FORMATS)}")
+    return rows
+
+
+def write_snapshots(db: Session, output_dir, format="parquet", start=None, end=None, tables=None,
+                    batch_size=SNAPSHOT_BATCH_SIZE):
+    """Write the snapshot tables into output_dir and return a report.
+
+    All tables are read inside one SQLite read transaction, so they agree
+    with each other even while reviews keep coming in. start (inclusive)
+    and end (exclusive) filter reviews and sessions by their creation
+    time; words are always written whole.
+    """
+    _require_pyarrow()
+    extension = SNAPSHOT_FORMATS[format][0]
+    os.makedirs(output_dir, exist_ok=True)
+    connection = db.connection().connection.dbapi_connection
+
+    report = {"tables": {}}
+    started = time.perf_counter()
+    # sqlite3 only opens transactions before writes; SELECTs alone each see
+    # their own snapshot
+    if not connection.in_transaction:
+        connection.execute("BEGIN")
+    try:
+        for table in tables or SNAPSHOT_TABLES:
+            table_started = time.perf_counter()
+            path = os.path.join(output_dir, table + extension)
+            rows = write_snapshot(connection, table, path, format, start, end, batch_size)
+            report["tables"][table] = {
+                "path": path,
+                "rows": rows,
+                "bytes": os.path.getsize(path),
+                "ms": round((time.perf_counter() - table_started) * 1000, 1),
+            }
+    finally:
+        connection.rollback()
+    report["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return report
@@ -0,0 +1,220 @@
+"""Startup work run from the app's lifespan, before the first request.
+
+prepare_database() brings the schema up to date and backfills the
+derived tables. A fingerprint of Base.metadata is kept in PRAGMA
+application_id next to the migration version in PRAGMA user_version, so
+a worker restarting against a database that is already current reads
+the two header fields and skips create_all() (which reflects every table)
+and the migrations folder entirely.
+
+warm_pages() and warm_statements() then pull the hot tables and indexes
+into the SQLite page cache and run one GET against each hot route, so the
+first real requests don't pay for SQL compilation (SQLAlchemy caches the
+compiled statements per engine), the cold pool connection or cold pages.
+LANG_PORTAL_WARMUP=off skips the warm-up.
+"""
+import logging
+import os
+import time
+import zlib
+
+from autocomplete import autocomplete_index
+from database import Base, SessionLocal, engine
+from membership import membership_index
+from migrator import MIGRATIONS_DIR, current_version, discover_migrations, migrate
+from models import WordReviewItem
+from rollups import backfill_daily_rollups
+from scheduler import backfill_schedules
+from search import ensure_search_index
+from stats import backfill_word_stats
+
+logger = logging.getLogger(__name__)
+
+WARMUP = os.environ.get("LANG_PORTAL_WARMUP", "on") != "off"
+
+# Tables that grow without bound are left to the OS cache; warming them
+# would read the whole history on every restart
+WARM_SKIP_TABLES = {WordReviewItem.__tablename__}
+
+# One GET per hot route; the ids don't have to exist, a 404 still compiles
+# and runs the route's statements
+WARMUP_PATHS = [
+    ("/api/words", "page=1"),
+    ("/api/words", "page=1&sort_by=accuracy&order=desc"),
+    ("/api/words/search", "q=a"),
+    ("/api/words/query", ""),
+    ("/api/words/1", ""),
+    ("/api/groups", "page=1"),
+    ("/api/groups/1", ""),
+    ("/api/groups/1/words", "page=1"),
+    ("/api/groups/1/study_sessions", "page=1"),
+    ("/api/study_activities", ""),
+    ("/api/study_activities/1", ""),
+    ("/api/study_activities/1/study_sessions", "page=1"),
+    ("/api/study_sessions", "page=1"),
+    ("/api/study_session/1", ""),
+    ("/api/study_session/1/words", "page=1"),
+    ("/api/study_sessions/1/next_words", ""),
+    ("/api/dashboard/last_study_session", ""),
+    ("/api/dashboard/study_progress", ""),
+    ("/api/dashboard/quick_stats", ""),
+]
+
+
+def schema_fingerprint(metadata=Base.metadata):
+    """Positive 31-bit CRC of the tables, columns and indexes in metadata"""
+    parts = []
+    for table in metadata.sorted_tables:
+        parts.append(table.name)
+        parts.extend(f"{c.name} {c.type} {c.nullable} {c.primary_key}" for c in table.columns)
+        parts.extend(sorted(
+            f"{index.name} {[c.name for c in index.columns]} {index.unique}" for index in table.indexes
+        ))
+    return zlib.crc32("\n".join(parts).encode("utf-8")) & 0x7FFFFFFF
+
+
+def schema_is_current(connection, fingerprint, migrations):
+    """True when the database header says create_all() and every migration ran"""
+    application_id = connection.execute("PRAGMA application_id").fetchone()[0]
+    latest = migrations[-1].version if migrations else 0
+    return application_id == fingerprint and current_version(connection) >= latest
+
+
+def ensure_schema(engine=engine, directory=MIGRATIONS_DIR):
+    """create_all() and pending migrations, unless the header says the
+    schema is current; returns True when they were skipped"""
+    fingerprint = schema_fingerprint()
+    migrations = discover_migrations(directory)
+    raw = engine.raw_connection()
+    try:
+        if schema_is_current(raw.driver_connection, fingerprint, migrations):
+            return True
+    finally:
+        raw.close()
+
+    Base.metadata.create_all(bind=engine)
+    migrate(engine, directory, verify=False)
+
+    raw = engine.raw_connection()
+    try:
+        raw.driver_connection.execute(f"PRAGMA application_id = {fingerprint:d}")
+        raw.driver_connection.commit()
+    finally:
+        raw.close()
+    return False
+
+
+def prepare_database(engine=engine):
+    """Schema, derived-table backfills and the in-memory indexes; returns
+    {phase: ms} and whether the schema fast path was taken"""
+    timings = {}
+    started = time.perf_counter()
+    schema_current = ensure_schema(engine)
+    timings["schema"] = time.perf_counter() - started
+
+    # Backfill the derived tables (word_review_stats, daily rollups, word_schedules) for
+    # databases created before they existed and sync words_fts; each is a cheap check
+    # when there is nothing to do
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        backfill_word_stats(db)
+        backfill_daily_rollups(db)
+        backfill_schedules(db)
+        ensure_search_index(db)
+        timings["backfills"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        autocomplete_index.load(db)
+        timings["autocomplete"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        membership_index.load(db)
+        timings["membership"] = time.perf_counter() - started
+
+    return {phase: round(seconds * 1000, 1) for phase, seconds in timings.items()}, schema_current
+
+
+def warm_pages(engine=engine, skip=WARM_SKIP_TABLES):
+    """Read every page of the small tables and their indexes; returns the
+    number of b-trees read"""
+    raw = engine.raw_connection()
+    try:
+        connection = raw.driver_connection
+        tables = [
+            name for (name,) in connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND sql NOT LIKE 'CREATE VIRTUAL%'"
+            )
+            if name not in skip and not name.startswith("sqlite_")
+        ]
+        btrees = 0
+        for table in tables:
+            # count(*) walks the whole b-tree; NOT INDEXED makes it walk the table
+            connection.execute(f'SELECT count(*) FROM "{table}" NOT INDEXED').fetchone()
+            btrees += 1
+            for index in connection.execute(f'PRAGMA index_list("{table}")').fetchall():
+                connection.execute(f'SELECT count(*) FROM "{table}" INDEXED BY "{index[1]}"').fetchone()
+                btrees += 1
+        return btrees
+    finally:
+        raw.close()
+
+
+async def warm_statements(app, paths=WARMUP_PATHS):
+    """GET each path through the full app; returns how many answered 2xx"""
+    ok = 0
+    for path, query in paths:
+        status = await _get(app, path, query)
+        if 200 <= status < 300:
+            ok += 1
+    return ok
+
+
+async def _get(app, path, query):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode("ascii"),
+        "root_path": "",
+        "query_string": query.encode("ascii"),
+        "headers": [(b"host", b"warmup")],
+        "client": ("127.0.0.1", 0),
+        "server": ("warmup", 80),
+        "state": {},
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run_startup(app, warmup=WARMUP):
+    """Everything the lifespan does before serving; the timings end up in
+    app.state.startup_ms and the log"""
+    timings, schema_current = prepare_database()
+
+    if warmup:
+        started = time.perf_counter()
+        btrees = warm_pages()
+        timings["warm_pages"] = round((time.perf_counter() - started) * 1000, 1)
+
+        started = time.perf_counter()
+        answered = await warm_statements(app)
+        timings["warm_statements"] = round((time.perf_counter() - started) * 1000, 1)
+        logger.info("Warmed %d b-trees and %d/%d routes", btrees, answered, len(WARMUP_PATHS))
+
+    app.state.startup_ms = timings
+    logger.info("Startup (%s schema): %s", "current" if schema_current else "updated",
+                ", ".join(f"{phase} {ms}ms" for phase, ms in timings.items()))
+    return timings
@@ -0,0 +1,114 @@
+from sqlalchemy import func, case, insert, literal, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from cache import mark_changed
+from models import Word, WordReviewItem, WordReviewStats
+
+
+async def get_word_stats_bulk(db: AsyncSession, word_ids):
+    """Return {word_id: (correct_count, wrong_count)} for a page of word ids.
+
+    Reads the denormalized word_review_stats counters with one primary key
+    lookup per page instead of counting word_review_items. Words without a
+    counter row map to (0, 0).
+    """
+    stats = {word_id: (0, 0) for word_id in word_ids}
+    if not stats:
+        return stats
+
+    rows = await db.execute(select(
+        WordReviewStats.word_id,
+        WordReviewStats.correct_count,
+        WordReviewStats.wrong_count
+    ).where(
+        WordReviewStats.word_id.in_(list(stats))
+    ))
+
+    for word_id, correct_count, wrong_count in rows:
+        stats[word_id] = (correct_count, wrong_count)
+
+    return stats
+
+
+async def get_word_stats(db: AsyncSession, word_id: int):
+    return (await get_word_stats_bulk(db, [word_id]))[word_id]
+
+
+async def record_reviews(db: AsyncSession, reviews):
+    """Fold (word_id, correct, reviewed_at) tuples into word_review_stats.
+
+    Runs on the caller's session so the counters commit in the same
+    transaction as the word_review_items rows they describe.
+    """
+    deltas = {}
+    for word_id, correct, reviewed_at in reviews:
+        delta = deltas.setdefault(word_id, {
+            "word_id": word_id,
+            "correct_count": 0,
+            "wrong_count": 0,
+            "review_count": 0,
+            "accuracy": 0.0,
+            "last_reviewed_at": reviewed_at,
+        })
+        delta["correct_count"] += 1 if correct else 0
+        delta["wrong_count"] += 0 if correct else 1
+        delta["review_count"] += 1
+        delta["accuracy"] = delta["correct_count"] / delta["review_count"]
+        delta["last_reviewed_at"] = max(delta["last_reviewed_at"], reviewed_at)
+
+    if not deltas:
+        return
+
+    stmt = sqlite_insert(WordReviewStats)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[WordReviewStats.word_id],
+        set_={
+            "correct_count": WordReviewStats.correct_count + stmt.excluded.correct_count,
+            "wrong_count": WordReviewStats.wrong_count + stmt.excluded.wrong_count,
+            "review_count": WordReviewStats.review_count + stmt.excluded.review_count,
+            "accuracy": (WordReviewStats.correct_count + stmt.excluded.correct_count) * 1.0
+                        / (WordReviewStats.review_count + stmt.excluded.review_count),
+            "last_reviewed_at": func.max(
+                func.coalesce(WordReviewStats.last_reviewed_at, stmt.excluded.last_reviewed_at),
+                stmt.excluded.last_reviewed_at
+            ),
+        }
+    )
+    await db.execute(stmt, list(deltas.values()))
+
+
+# Maintenance helpers below run on a sync Session from tasks.py, seeds and startup
+def rebuild_word_stats(db: Session):
+    """Recompute word_review_stats from scratch, one row per word. Returns the row count."""
+    correct_count = func.sum(case((WordReviewItem.correct == True, 1), else_=0))
+    review_count = func.count(WordReviewItem.id)
+
+    select_stats = db.query(
+        Word.id,
+        correct_count,
+        review_count - correct_count,
+        review_count,
+        case((review_count > 0, correct_count * 1.0 / review_count), else_=literal(0.0)),
+        func.max(WordReviewItem.created_at)
+    ).outerjoin(
+        WordReviewItem, WordReviewItem.word_id == Word.id
+    ).group_by(Word.id)
+
+    db.query(WordReviewStats).delete()
+    db.execute(insert(WordReviewStats).from_select(
+        ["word_id", "correct_count", "wrong_count", "review_count", "accuracy", "last_reviewed_at"],
+        select_stats.statement
+    ))
+    mark_changed(db, WordReviewStats)
+    return db.query(func.count(WordReviewStats.word_id)).scalar()
+
+
+def backfill_word_stats(db: Session):
+    """Rebuild the counters when some words have no word_review_stats row yet"""
+    word_count = db.query(func.count(Word.id)).scalar()
+    stats_count = db.query(func.count(WordReviewStats.word_id)).scalar()
+    if word_count != stats_count:
+        rebuild_word_stats(db)
+        db.commit()
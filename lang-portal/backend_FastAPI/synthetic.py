@@ -0,0 +1,283 @@
+"""Synthetic datasets for load and capacity testing.
+
+generate_dataset() appends a reproducible set of words, groups, study
+sessions and review items to a database, sized by its parameters, e.g.
+    invoke generate-data --path /tmp/load.db --sessions 20000 --reviews-per-session 50
+for a 1M review dataset. Rows are generated as they are written, in
+executemany batches on the session's raw SQLite connection, skipping the
+ORM, so memory stays flat however many reviews are asked for. The
+denormalized tables (word_review_stats, daily rollups, word_schedules,
+words_fts) are filled from the same rows as they are generated, into
+dicts sized by words and days, instead of being rebuilt from the whole
+database afterwards. On a 1-core VM 200k reviews take 6-7s in all, 0.3s
+of it for the derived tables (a full rebuild took 6s), and 1M reviews
+take ~33s, mostly inserting the reviews and building their indexes.
+"""
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from heapq import heappop, heappush
+from itertools import count, islice
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from cache import mark_changed
+from hangul import SYLLABLE_BASE, decompose
+from models import (
+    DailyActivity, DailyGroupActivity, Group, StudyActivity, StudySession, Word, WordGroup, WordReviewItem,
+    WordReviewStats, WordSchedule,
+)
+from scheduler import SCHEDULE_FIELDS, apply_review, new_schedule
+from search import CREATE_WORDS_FTS
+
+# Revised Romanization of the initial / medial / final jamo, in Unicode order
+ROMAN_INITIALS = ("g", "kk", "n", "d", "tt", "r", "m", "b", "pp", "s", "ss", "", "j", "jj", "ch", "k", "t", "p", "h")
+ROMAN_MEDIALS = ("a", "ae", "ya", "yae", "eo", "e", "yeo", "ye", "o", "wa", "wae", "oe", "yo", "u", "wo", "we", "wi",
+                 "yu", "eu", "ui", "i")
+ROMAN_FINALS = ("", "k", "k", "k", "n", "n", "n", "t", "l", "k", "m", "p", "t", "t", "p", "l", "m", "p", "p", "t",
+                "t", "ng", "t", "t", "k", "t", "p", "t")
+
+GLOSSES = ("apple", "river", "friend", "window", "to study", "to walk", "teacher", "morning", "market", "rain",
+           "book", "to cook", "station", "music", "family", "weather", "to buy", "hospital", "summer", "letter")
+
+# Share of words that also belong to a second group
+SECOND_GROUP_RATE = 0.1
+# Seconds between two answers in a session, before jitter
+SECONDS_PER_REVIEW = 8
+
+BATCH_SIZE = 10000
+
+
+def synthetic_word(rng, number):
+    """Return (korean, transliteration, english) for a random 1-3 syllable word"""
+    korean, roman = [], []
+    for _ in range(rng.randint(1, 3)):
+        initial, medial = rng.randrange(19), rng.randrange(21)
+        final = rng.randrange(1, 28) if rng.random() < 0.4 else 0
+        korean.append(chr(SYLLABLE_BASE + (initial * 21 + medial) * 28 + final))
+        roman.append(ROMAN_INITIALS[initial] + ROMAN_MEDIALS[medial] + ROMAN_FINALS[final])
+    return "".join(korean), "".join(roman), f"{rng.choice(GLOSSES)} {number}"
+
+
+def _timestamp(moment):
+    # The format SQLAlchemy's SQLite DateTime type stores and parses
+    return moment.isoformat(" ", "microseconds")
+
+
+def _insert_batches(cursor, table, columns, rows, batch_size):
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    total = 0
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return total
+        cursor.executemany(sql, batch)
+        total += len(batch)
+
+
+def _add_batches(cursor, table, keys, columns, rows, batch_size):
+    """Upsert rows, adding every column after the keys to the stored value"""
+    sql = (
+        f"INSERT INTO {table} ({', '.join(keys + columns)}) VALUES ({', '.join('?' * len(keys + columns))}) "
+        f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET "
+        + ", ".join(f"{column} = {column} + excluded.{column}" for column in columns)
+    )
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        cursor.executemany(sql, batch)
+
+
+def generate_dataset(db: Session, words=5000, groups=50, sessions=20000, reviews_per_session=50,
+                     accuracy=0.75, accuracy_spread=0.15, days=365, end=None, seed=42, batch_size=BATCH_SIZE):
+    """Append a synthetic dataset in one transaction and return a report.
+
+    Each word gets its own probability of being answered correctly, drawn
+    from a normal distribution around accuracy (clamped to 0..1), so some
+    words are easy and some are hard. Sessions are spread uniformly over
+    the `days` days before end (default: the start of the current UTC
+    day), pick a random group and review words from it; each holds
+    reviews_per_session answers on average (+-50%). The same seed and end
+    give the same rows.
+    """
+    if sessions and not (words and groups):
+        raise ValueError("Sessions need at least one word and one group to review")
+
+    rng = random.Random(seed)
+    report = {"timings_ms": {}}
+    started = last = time.perf_counter()
+
+    def lap(phase):
+        nonlocal last
+        now = time.perf_counter()
+        report["timings_ms"][phase] = round((now - last) * 1000, 1)
+        last = now
+
+    def next_id(column):
+        return (db.execute(select(func.max(column))).scalar() or 0) + 1
+
+    first_word, first_group, first_session = next_id(Word.id), next_id(Group.id), next_id(StudySession.id)
+    activity_id = db.execute(select(func.min(StudyActivity.id))).scalar()
+    cursor = db.connection().connection.cursor()
+
+    if activity_id is None:
+        activity_id = 1
+        cursor.execute(
+            f"INSERT INTO {StudyActivity.__tablename__} (id, name, thumbnail, description, url) VALUES (?, ?, ?, ?, ?)",
+            (activity_id, "Synthetic Quiz", "", "Generated for load testing", "")
+        )
+
+    group_ids = list(range(first_group, first_group + groups))
+    _insert_batches(cursor, Group.__tablename__, ("id", "name"), (
+        (group_id, f"Synthetic Group {group_id}") for group_id in group_ids
+    ), batch_size)
+    report["groups"] = groups
+    lap("groups")
+
+    # korean is unique: redraw spellings that are taken
+    taken = set(db.execute(select(Word.korean)).scalars())
+    word_ids = range(first_word, first_word + words)
+    word_rows = []
+    for word_id in word_ids:
+        korean, transliteration, english = synthetic_word(rng, word_id)
+        while korean in taken:
+            korean, transliteration, english = synthetic_word(rng, word_id)
+        taken.add(korean)
+        word_rows.append((word_id, korean, transliteration, english))
+    report["words"] = _insert_batches(cursor, Word.__tablename__, ("id", "korean", "transliteration", "english", "parts"), (
+        (*row, "{}") for row in word_rows
+    ), batch_size)
+    cursor.execute(CREATE_WORDS_FTS)
+    _insert_batches(cursor, "words_fts", ("rowid", "korean_jamo", "transliteration", "english"), (
+        (word_id, decompose(korean), transliteration, english)
+        for word_id, korean, transliteration, english in word_rows
+    ), batch_size)
+
+    group_words = {group_id: [] for group_id in group_ids}
+    for word_id in word_ids:
+        group_words[group_ids[word_id % groups]].append(word_id)
+        if groups > 1 and rng.random() < SECOND_GROUP_RATE:
+            group_words[group_ids[(word_id + rng.randrange(1, groups)) % groups]].append(word_id)
+    report["links"] = _insert_batches(cursor, WordGroup.__tablename__, ("word_id", "group_id"), (
+        (word_id, group_id) for group_id, members in group_words.items() for word_id in members
+    ), batch_size)
+    lap("words")
+
+    word_accuracy = {
+        word_id: min(1.0, max(0.0, rng.gauss(accuracy, accuracy_spread))) for word_id in word_ids
+    }
+    span_seconds = days * 86400
+    if end is None:
+        end = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    origin = end - timedelta(seconds=span_seconds)
+    offsets = sorted(rng.uniform(0, span_seconds) for _ in range(sessions))
+    active_groups = [group_id for group_id in group_ids if group_words[group_id]]
+
+    # Sessions and their reviews are drawn together in one pass and written
+    # out every batch_size reviews. The inner loop runs once per review, so
+    # it sticks to rng.random() and precomputed gaps over randint/choice.
+    # The derived tables are accumulated on the way: only the new words
+    # are reviewed and only new sessions are added, so their counters start
+    # from zero and the daily rollups can be added to the stored days.
+    # Schedules must see each word's answers in (created_at, id) order, but
+    # sessions can overlap. Answers wait in a heap until a session starts
+    # after them: sessions are drawn in start order, so nothing earlier can
+    # follow, and the heap holds about one session's answers.
+    draw = rng.random
+    gaps = [timedelta(seconds=seconds) for seconds in range(SECONDS_PER_REVIEW // 2, SECONDS_PER_REVIEW * 2 + 1)]
+    min_reviews = max(1, reviews_per_session // 2)
+    max_reviews = max(1, reviews_per_session * 3 // 2)
+    # Into an empty table, dropping the review indexes and building each
+    # once after the load is ~2x faster than updating all of them per row
+    review_indexes = []
+    if db.execute(select(WordReviewItem.id).limit(1)).first() is None:
+        review_indexes = cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (WordReviewItem.__tablename__,)
+        ).fetchall()
+        for name, _ in review_indexes:
+            cursor.execute(f'DROP INDEX "{name}"')
+
+    session_rows, review_rows = [], []
+    word_stats = defaultdict(lambda: [0, 0, ""])  # word_id -> [correct, reviews, last created_at]
+    days = defaultdict(lambda: [0, 0, 0, 0])  # day -> [reviews, correct, sessions started, sessions ended]
+    group_days = defaultdict(int)  # (day, group_id) -> sessions started
+    schedules, pending, sequence = {}, [], count()  # pending: heap of (moment, sequence, word_id, correct)
+
+    def apply_pending(until=None):
+        while pending and (until is None or pending[0][0] <= until):
+            reviewed_at, _, word_id, correct = heappop(pending)
+            schedule = schedules.get(word_id) or schedules.setdefault(word_id, new_schedule(word_id))
+            apply_review(schedule, correct, reviewed_at)
+
+    report["sessions"] = report["reviews"] = 0
+    for number, offset in enumerate(offsets):
+        session_id = first_session + number
+        group_id = active_groups[int(draw() * len(active_groups))]
+        members = group_words[group_id]
+        started_at = moment = origin + timedelta(seconds=offset)
+        apply_pending(started_at)
+
+        for _ in range(rng.randint(min_reviews, max_reviews)):
+            moment += gaps[int(draw() * len(gaps))]
+            word_id = members[int(draw() * len(members))]
+            correct = draw() < word_accuracy[word_id]
+            created_at = _timestamp(moment)
+            review_rows.append((word_id, session_id, correct, created_at))
+
+            stats = word_stats[word_id]
+            stats[0] += correct
+            stats[1] += 1
+            if created_at > stats[2]:
+                stats[2] = created_at
+            day = days[created_at[:10]]
+            day[0] += 1
+            day[1] += correct
+            heappush(pending, (moment, next(sequence), word_id, correct))
+
+        created_at, ended_at = _timestamp(started_at), _timestamp(moment + gaps[-1])
+        session_rows.append((session_id, group_id, activity_id, created_at, ended_at))
+        days[created_at[:10]][2] += 1
+        days[ended_at[:10]][3] += 1
+        group_days[created_at[:10], group_id] += 1
+
+        if len(review_rows) >= batch_size or number == len(offsets) - 1:
+            report["sessions"] += _insert_batches(cursor, StudySession.__tablename__, (
+                "id", "group_id", "study_activity_id", "created_at", "ended_at"
+            ), iter(session_rows), batch_size)
+            report["reviews"] += _insert_batches(cursor, WordReviewItem.__tablename__, (
+                "word_id", "study_session_id", "correct", "created_at"
+            ), iter(review_rows), batch_size)
+            session_rows, review_rows = [], []
+    for _, sql in review_indexes:
+        cursor.execute(sql)
+    apply_pending()
+    lap("reviews")
+
+    # OR REPLACE: the insert trigger on words may already have added zeroed rows
+    cursor.executemany(
+        f"INSERT OR REPLACE INTO {WordReviewStats.__tablename__} (word_id, correct_count, wrong_count, "
+        "review_count, accuracy, last_reviewed_at) VALUES (?, ?, ?, ?, ?, ?)",
+        ((word_id, correct, total - correct, total, correct / total if total else 0.0, last or None)
+         for word_id in word_ids for correct, total, last in [word_stats.get(word_id, (0, 0, ""))])
+    )
+    _add_batches(cursor, DailyActivity.__tablename__, ("day",), (
+        "review_count", "correct_count", "sessions_started", "sessions_ended"
+    ), ((day, *counts) for day, counts in sorted(days.items())), batch_size)
+    _add_batches(cursor, DailyGroupActivity.__tablename__, ("day", "group_id"), ("sessions_started",), (
+        (*key, started) for key, started in sorted(group_days.items())
+    ), batch_size)
+    _insert_batches(cursor, WordSchedule.__tablename__, ("word_id", *SCHEDULE_FIELDS), (
+        (word_id, *(schedule[column] for column in SCHEDULE_FIELDS[:-2]),
+         _timestamp(schedule["due_at"]), _timestamp(schedule["last_reviewed_at"]))
+        for word_id, schedule in schedules.items()
+    ), batch_size)
+    lap("derived")
+
+    mark_changed(db, DailyActivity, DailyGroupActivity, Group, StudyActivity, StudySession, Word, WordGroup,
+                 WordReviewItem, WordReviewStats, WordSchedule)
+    db.commit()
+    lap("commit")
+    report["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return report
@@ -1,7 +1,6 @@
 from invoke import task
 import os
 import json
-import glob
 from database import Base, engine, SessionLocal
 
 
@@ -15,45 +14,24 @@ def init_db(c):
 
 @task 
 def migrate_db(c):
-    """Migrate Database - run SQL files in migrations/ folder"""
+    """Migrate Database - apply the SQL files in migrations/ that haven't been applied yet"""
     print("Running database migrations...")
     
-    migrations_dir = "migrations"
-    if not os.path.exists(migrations_dir):
-        print(f"No {migrations_dir} directory found")
-        return
-    
-    # Get all SQL files and sort by filename (0001_init.sql, 0002_create_tables.sql, etc.)
-    sql_files = sorted(glob.glob(os.path.join(migrations_dir, "*.sql")))
+    from migrator import MIGRATIONS_DIR, MigrationError, migrate
     
-    if not sql_files:
-        print("No migration files found")
-        return
+    def applied(migration, elapsed_ms):
+        print(f"  ✅ {migration.filename} applied in {elapsed_ms}ms")
     
-    db = SessionLocal()
     try:
-        for sql_file in sql_files:
-            print(f"Running migration: {os.path.basename(sql_file)}")
-            
-            with open(sql_file, 'r') as f:
-                sql_content = f.read()
-            
-            # Split by semicolon and execute each statement
-            statements = [stmt.strip() for stmt in sql_content.split(';') if stmt.strip()]
-            
-            for statement in statements:
-                db.execute(statement)
-            
-            db.commit()
-            print(f"  ✅ {os.path.basename(sql_file)} completed")
-            
-    except Exception as e:
+        results = migrate(engine, verify=True, on_applied=applied)
+    except MigrationError as e:
         print(f"Migration failed: {e}")
-        db.rollback()
-    finally:
-        db.close()
+        return
     
-    print("Database migrations completed")
+    if results:
+        print(f"Database migrations completed: {len(results)} applied")
+    else:
+        print(f"Database is up to date with {os.path.normpath(MIGRATIONS_DIR)}")
 
 
 @task
@@ -61,6 +39,7 @@ def seed_study_activities(c):
     """Seed Study Activities from JSON file"""
     print("Seeding study activities...")
     
+    from cache import mark_changed
     from models import StudyActivity
     
     activities_file = "seeds/study_activities.json"
@@ -91,6 +70,7 @@ def seed_study_activities(c):
             else:
                 print(f"  - Activity already exists: {activity_data['name']}")
         
+        mark_changed(db, StudyActivity)
         db.commit()
         print(f"Study activities seeding completed: {activities_added} new activities added")
         
@@ -103,7 +83,7 @@ def seed_study_activities(c):
 
 @task
 def seed_data(c):
-    """Seed Data - import JSON files from seeds/ folder"""
+    """Seed Data - bulk load the JSON word lists in seeds/ in one transaction"""
     print("Seeding database...")
     
     seeds_dir = "seeds"
@@ -111,80 +91,28 @@ def seed_data(c):
         print(f"No {seeds_dir} directory found")
         return
     
-    # Import models here to avoid circular imports - FIXED: WordsGroups -> WordGroup
-    from models import Word, Group, WordGroup
+    from seeding import bulk_load_seeds
     
-    # Get all JSON files from seeds directory
-    json_files = glob.glob(os.path.join(seeds_dir, "*.json"))
-    
-    if not json_files:
-        print("No seed files found")
-        return
+    # DSL: Map filename to group name
+    # You can customize this mapping based on your seed file naming convention;
+    # unmapped files become "File Name" groups
+    file_to_group_mapping = {
+        "basic_greetings.json": "Basic Greetings",
+        "food_dining.json": "Food & Dining", 
+        "daily_conversations.json": "Daily Conversations",
+        "numbers.json": "Numbers",
+        "colors.json": "Colors"
+    }
     
     db = SessionLocal()
     try:
-        # DSL: Map filename to group name
-        # You can customize this mapping based on your seed file naming convention
-        file_to_group_mapping = {
-            "basic_greetings.json": "Basic Greetings",
-            "food_dining.json": "Food & Dining", 
-            "daily_conversations.json": "Daily Conversations",
-            "numbers.json": "Numbers",
-            "colors.json": "Colors"
-        }
+        report = bulk_load_seeds(db, seeds_dir, file_to_group_mapping)
         
-        for json_file in json_files:
-            filename = os.path.basename(json_file)
-            print(f"Processing seed file: {filename}")
-            
-            # Determine group name
-            group_name = file_to_group_mapping.get(filename, 
-                                                 filename.replace('.json', '').replace('_', ' ').title())
-            
-            # Create or get group
-            group = db.query(Group).filter(Group.name == group_name).first()
-            if not group:
-                group = Group(name=group_name)
-                db.add(group)
-                db.commit()
-                db.refresh(group)
-            
-            # Load and process words from JSON
-            with open(json_file, 'r', encoding='utf-8') as f:
-                words_data = json.load(f)
-            
-            for word_data in words_data:
-                # Check if word already exists
-                existing_word = db.query(Word).filter(
-                    Word.korean == word_data['korean']
-                ).first()
-                
-                if not existing_word:
-                    # Create new word
-                    word = Word(
-                        korean=word_data['korean'],
-                        transliteration=word_data['transliteration'],
-                        english=word_data['english'],
-                        parts=word_data.get('parts', {})  # FIXED: Pass dict directly, not json.dumps()
-                    )
-                    db.add(word)
-                    db.commit()
-                    db.refresh(word)
-                else:
-                    word = existing_word
-                
-                # Link word to group (if not already linked) - FIXED: WordsGroups -> WordGroup
-                existing_link = db.query(WordGroup).filter(
-                    WordGroup.word_id == word.id,
-                    WordGroup.group_id == group.id
-                ).first()
-                
-                if not existing_link:
-                    word_group_link = WordGroup(word_id=word.id, group_id=group.id)
-                    db.add(word_group_link)
-            
-            db.commit()
-            print(f"  ✅ {filename} processed into group '{group_name}'")
+        print(f"  ✅ {report['groups']} groups, "
+              f"{report['words_inserted']} new words ({report['words_existing']} already present), "
+              f"{report['links_inserted']} new word-group links ({report['links_existing']} already present)")
+        timings = ", ".join(f"{phase} {ms}ms" for phase, ms in report["timings_ms"].items())
+        print(f"  Timing: {timings} - total {report['total_ms']}ms")
             
     except Exception as e:
         print(f"Seeding failed: {e}")
@@ -195,15 +123,151 @@ def seed_data(c):
     print("Database seeding completed")
 
 
+@task
+def generate_data(c, path=None, words=5000, groups=50, sessions=20000, reviews_per_session=50,
+                  accuracy=0.75, accuracy_spread=0.15, days=365, end=None, seed=42):
+    """Generate a synthetic load-testing dataset (20000 sessions x 50 reviews = 1M reviews by default)"""
+    from datetime import datetime
+    from database import build_engine
+    from sqlalchemy.orm import Session
+    from synthetic import generate_dataset
+    
+    target_engine = build_engine(path) if path else engine
+    print(f"Generating synthetic data into {path or 'the configured database'}...")
+    Base.metadata.create_all(bind=target_engine)
+    
+    db = Session(target_engine)
+    try:
+        report = generate_dataset(
+            db, words=int(words), groups=int(groups), sessions=int(sessions),
+            reviews_per_session=int(reviews_per_session), accuracy=float(accuracy),
+            accuracy_spread=float(accuracy_spread), days=int(days),
+            end=datetime.fromisoformat(end) if end else None, seed=int(seed)
+        )
+        
+        print(f"  ✅ {report['words']} words, {report['groups']} groups, {report['links']} word-group links, "
+              f"{report['sessions']} sessions, {report['reviews']} reviews")
+        timings = ", ".join(f"{phase} {ms}ms" for phase, ms in report["timings_ms"].items())
+        print(f"  Timing: {timings} - total {report['total_ms']}ms")
+    except Exception as e:
+        print(f"Generating data failed: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+@task
+def export_snapshot(c, output="snapshots", format="parquet", start=None, end=None):
+    """Write reviews, study_sessions and words as Parquet (or --format arrow) files for notebooks"""
+    from datetime import datetime
+    from snapshots import write_snapshots
+
+    print(f"Writing {format} snapshot to {output}/...")
+
+    db = SessionLocal()
+    try:
+        report = write_snapshots(
+            db, output, format,
+            start=datetime.fromisoformat(start) if start else None,
+            end=datetime.fromisoformat(end) if end else None
+        )
+        for table, result in report["tables"].items():
+            print(f"  ✅ {result['path']}: {result['rows']} rows, {result['bytes'] / 2**20:.1f} MB in {result['ms']}ms")
+        print(f"Snapshot written in {report['total_ms']}ms")
+    except Exception as e:
+        print(f"Writing snapshot failed: {e}")
+    finally:
+        db.close()
+
+
+@task
+def rebuild_word_stats(c):
+    """Rebuild the denormalized per-word review counters from word_review_items"""
+    print("Rebuilding word review stats...")
+
+    from stats import rebuild_word_stats as rebuild
+
+    db = SessionLocal()
+    try:
+        row_count = rebuild(db)
+        db.commit()
+        print(f"Word review stats rebuilt: {row_count} words")
+    except Exception as e:
+        print(f"Rebuilding word review stats failed: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+@task
+def rebuild_daily_rollups(c):
+    """Rebuild the daily_activity and daily_group_activity rollups behind the dashboard"""
+    print("Rebuilding daily rollups...")
+
+    from rollups import rebuild_daily_rollups as rebuild
+
+    db = SessionLocal()
+    try:
+        day_count = rebuild(db)
+        db.commit()
+        print(f"Daily rollups rebuilt: {day_count} days")
+    except Exception as e:
+        print(f"Rebuilding daily rollups failed: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+@task
+def rebuild_schedules(c):
+    """Replay review history into the spaced-repetition word_schedules table"""
+    print("Rebuilding word schedules...")
+
+    from scheduler import rebuild_schedules as rebuild
+
+    db = SessionLocal()
+    try:
+        row_count = rebuild(db)
+        db.commit()
+        print(f"Word schedules rebuilt: {row_count} words")
+    except Exception as e:
+        print(f"Rebuilding word schedules failed: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+@task
+def rebuild_search_index(c):
+    """Rebuild the words_fts full-text index behind /api/words/search"""
+    print("Rebuilding search index...")
+
+    from search import rebuild_search_index as rebuild
+
+    db = SessionLocal()
+    try:
+        row_count = rebuild(db)
+        db.commit()
+        print(f"Search index rebuilt: {row_count} words")
+    except Exception as e:
+        print(f"Rebuilding search index failed: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+
 @task
 def reset_db(c):
     """Complete database reset - drop, create, migrate, and seed"""
     print("Performing complete database reset...")
     
-    # Drop all tables
+    # Drop all tables; the migrations have to run again on the new ones
     print("Dropping existing tables...")
     Base.metadata.drop_all(bind=engine)
     
+    from migrator import reset_migrations
+    reset_migrations(engine)
+    
     # Initialize database
     init_db(c)
     
@@ -216,6 +280,12 @@ def reset_db(c):
     # Seed data
     seed_data(c)
     
+    # Rebuild denormalized counters and rollups
+    rebuild_word_stats(c)
+    rebuild_daily_rollups(c)
+    rebuild_schedules(c)
+    rebuild_search_index(c)
+    
     print("Database reset completed successfully")
 
 
@@ -224,7 +294,8 @@ def create_dirs(c):
     """Create necessary directories for the project"""
     print("Creating project directories...")
     
-    directories = ["migrations", "seeds"]
+    # migrations/ is checked in next to this folder (migrator.MIGRATIONS_DIR)
+    directories = ["seeds"]
     
     for directory in directories:
         if not os.path.exists(directory):
@@ -233,23 +304,6 @@ def create_dirs(c):
         else:
             print(f"Directory already exists: {directory}")
     
-    # Create sample migration file if migrations directory is empty
-    migrations_dir = "migrations"
-    if not os.listdir(migrations_dir):
-        sample_migration = """-- 0001_init.sql
--- Initial database setup
-
--- This file can contain additional SQL commands
--- that need to be run during database initialization
-
--- Example: Create indexes
--- CREATE INDEX idx_words_korean ON words(korean);
--- CREATE INDEX idx_word_review_items_created_at ON word_review_items(created_at);
-"""
-        with open(os.path.join(migrations_dir, "0001_init.sql"), 'w') as f:
-            f.write(sample_migration)
-        print("Created sample migration file: 0001_init.sql")
-    
     print("Directory creation completed")
 
 
@@ -315,6 +369,8 @@ def setup(c):
     # Seed data (if seed files exist)
     if os.path.exists("seeds") and os.listdir("seeds"):
         seed_data(c)
+        rebuild_word_stats(c)
+        rebuild_search_index(c)
     else:
         print("No seed files found. Add JSON files to seeds/ directory and run 'invoke seed-data'")
     
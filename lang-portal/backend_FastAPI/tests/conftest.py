@@ -0,0 +1,101 @@
+"""Shared fixtures: every test that needs a database gets its own migrated
+SQLite file under tmp_path.
+
+pytest-asyncio isn't a dependency, so async code runs through
+run_async(), one event loop per call.
+"""
+import asyncio
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+# database.py builds its module-level engines from LANG_PORTAL_DB when it is
+# imported; point them at a scratch file so nothing here can touch words.db
+os.environ["LANG_PORTAL_DB"] = os.path.join(tempfile.mkdtemp(prefix="lang-portal-tests-"), "words.db")
+os.environ.setdefault("LANG_PORTAL_WARMUP", "off")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker  # noqa: E402
+
+from database import build_async_engine, build_engine  # noqa: E402
+from startup import ensure_schema  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Path of an empty database with every table and migration"""
+    path = str(tmp_path / "words.db")
+    engine = build_engine(path)
+    ensure_schema(engine)
+    engine.dispose()
+    return path
+
+
+@pytest.fixture
+def sync_engine(db_path):
+    engine = build_engine(db_path)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def run_async(db_path):
+    """run_async(f) runs the coroutine function f(session_factory) against
+    the test database on a fresh event loop and returns its result"""
+    def run(f):
+        async def main():
+            engine = build_async_engine(db_path)
+            try:
+                return await f(async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False))
+            finally:
+                await engine.dispose()
+        return asyncio.run(main())
+    return run
+
+
+# Two groups, one activity, three words; session 1 ended, session 2 still open
+HISTORY_START = datetime(2025, 3, 1, 9, 0)
+HISTORY_REVIEWS = [
+    # (word, session, correct, minutes after HISTORY_START)
+    (0, 0, True, 1), (1, 0, False, 2), (0, 0, True, 3),
+    (2, 1, True, 60 * 24 + 1), (1, 1, True, 60 * 24 + 2), (2, 1, False, 60 * 24 + 3),
+]
+
+
+@pytest.fixture
+def review_history(sync_engine):
+    """Write a small review history through Core; returns the ids"""
+    from models import Group, StudyActivity, StudySession, Word, WordGroup, WordReviewItem
+
+    with sync_engine.begin() as conn:
+        def add(model, rows):
+            return conn.execute(insert(model).returning(model.id), rows).scalars().all()
+
+        groups = add(Group, [{"name": "Fruit"}, {"name": "Greetings"}])
+        activity, = add(StudyActivity, [{"name": "Flashcards", "url": "http://localhost/flashcards"}])
+        words = add(Word, [
+            {"korean": "사과", "transliteration": "sagwa", "english": "apple", "parts": {}},
+            {"korean": "배", "transliteration": "bae", "english": "pear, \"nashi\"", "parts": {}},
+            {"korean": "안녕하세요", "transliteration": "annyeonghaseyo", "english": "hello", "parts": {}},
+        ])
+        add(WordGroup, [
+            {"group_id": groups[0], "word_id": words[0]},
+            {"group_id": groups[0], "word_id": words[1]},
+            {"group_id": groups[1], "word_id": words[2]},
+        ])
+        sessions = add(StudySession, [
+            {"group_id": groups[0], "study_activity_id": activity,
+             "created_at": HISTORY_START, "ended_at": HISTORY_START + timedelta(minutes=10)},
+            {"group_id": groups[1], "study_activity_id": activity,
+             "created_at": HISTORY_START + timedelta(days=1), "ended_at": None},
+        ])
+        reviews = add(WordReviewItem, [
+            {"word_id": words[word], "study_session_id": sessions[session], "correct": correct,
+             "created_at": HISTORY_START + timedelta(minutes=minutes)}
+            for word, session, correct, minutes in HISTORY_REVIEWS
+        ])
+    return {"groups": groups, "activity": activity, "words": words, "sessions": sessions, "reviews": reviews}
@@ -0,0 +1,120 @@
+from datetime import timedelta, timezone
+
+import numpy as np
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+import analytics
+import cache
+from analytics import (
+    ReviewHistory, Summary, _summarize_chunk, attempt_numbers, current_analytics, daily_accuracy,
+    review_gaps, rolling_accuracy, word_curve,
+)
+from cache import TableGenerations, mark_changed
+from conftest import HISTORY_START
+from models import WordReviewItem
+
+
+def test_array_helpers():
+    word = np.array([1, 1, 1, 4, 7, 7])
+    timestamp = np.array([0, 60, 600, 5, 100, 160])
+    assert attempt_numbers(word).tolist() == [0, 1, 2, 0, 0, 1]
+    assert review_gaps(word, timestamp).tolist() == [-1, 60, 540, -1, -1, 60]
+    assert rolling_accuracy(np.array([1, 0, 1, 1]), 2).tolist() == [1.0, 0.5, 0.5, 1.0]
+
+
+@pytest.fixture
+def history(db_path, review_history):
+    return ReviewHistory.load(db_path)
+
+
+def test_load(history, review_history):
+    assert len(history) == 6
+    # Sorted by word, then time
+    assert history.word.tolist() == [review_history["words"][n] for n in (0, 0, 1, 1, 2, 2)]
+    fruit, greetings = review_history["groups"]
+    assert history.group.tolist() == [fruit, fruit, fruit, greetings, greetings, greetings]
+    # Epoch seconds of the stored naive UTC time
+    assert history.timestamp[0] == HISTORY_START.replace(tzinfo=timezone.utc).timestamp() + 60
+
+
+def test_learning_curve_and_retention(history, review_history):
+    summary = Summary(history, workers=1)
+    fruit, greetings = review_history["groups"]
+    assert summary.learning_curve() == [
+        {"attempt": 1, "reviews": 3, "accuracy": 0.6667}, {"attempt": 2, "reviews": 3, "accuracy": 0.6667},
+    ]
+    assert summary.learning_curve(fruit) == [
+        {"attempt": 1, "reviews": 2, "accuracy": 0.5}, {"attempt": 2, "reviews": 1, "accuracy": 1.0},
+    ]
+    assert summary.learning_curve(greetings, max_attempts=1) == [{"attempt": 1, "reviews": 1, "accuracy": 1.0}]
+    assert summary.learning_curve(999) == []
+
+    retention = summary.retention()
+    # Two reviews within the hour (one right), one a day later (right)
+    assert retention[0] == {"min_days": 0.0, "max_days": 0.0417, "reviews": 2, "accuracy": 0.5}
+    assert retention[1] == {"min_days": 0.0417, "max_days": 1, "reviews": 1, "accuracy": 1.0}
+    assert all(bucket["reviews"] == 0 and bucket["accuracy"] is None for bucket in retention[2:])
+    assert retention[-1]["max_days"] is None
+
+
+def test_chunked_summaries_add_up(history):
+    whole = Summary(history, workers=1)
+    group_index = np.unique(history.group, return_inverse=True)[1].reshape(-1)
+    chunks = history.chunks(3)
+    assert len(chunks) == 3 and chunks[0][0] == 0 and chunks[-1][1] == len(history)
+    parts = [
+        _summarize_chunk(history.word[start:stop], group_index[start:stop], history.timestamp[start:stop],
+                         history.correct[start:stop], len(whole.group_ids))
+        for start, stop in chunks
+    ]
+    for table, chunked in zip((whole.curve_reviews, whole.curve_correct, whole.retention_reviews,
+                               whole.retention_correct), zip(*parts)):
+        assert (table == sum(chunked)).all()
+
+
+def test_daily_accuracy_and_word_curve(history, review_history):
+    assert daily_accuracy(history, window=1) == [
+        {"day": "2025-03-01", "reviews": 3, "accuracy": 0.6667, "rolling_accuracy": 0.6667},
+        {"day": "2025-03-02", "reviews": 3, "accuracy": 0.6667, "rolling_accuracy": 0.6667},
+    ]
+    pear = review_history["words"][1]
+    assert word_curve(history, pear) == [
+        {"attempt": 1, "reviewed_at": "2025-03-01T09:02:00Z", "correct": False,
+         "study_session_id": review_history["sessions"][0], "days_since_previous": None, "rolling_accuracy": 0.0},
+        {"attempt": 2, "reviewed_at": "2025-03-02T09:02:00Z", "correct": True,
+         "study_session_id": review_history["sessions"][1], "days_since_previous": 1.0, "rolling_accuracy": 0.5},
+    ]
+    assert word_curve(history, 999) == []
+
+
+def test_empty_history(db_path):
+    history = ReviewHistory.load(db_path)
+    assert len(history) == 0
+    assert daily_accuracy(history) == []
+    assert Summary(history).learning_curve() == []
+
+
+def test_current_analytics_reloads_after_a_commit(monkeypatch, db_path, sync_engine, review_history):
+    generations = TableGenerations(db_path)
+    monkeypatch.setattr(cache, "table_generations", generations)
+    monkeypatch.setattr(analytics, "_current", None)
+
+    history, summary = current_analytics(db_path)
+    assert current_analytics(db_path) == (history, summary)
+
+    with Session(sync_engine) as db:
+        db.execute(insert(WordReviewItem), {
+            "word_id": review_history["words"][2], "study_session_id": review_history["sessions"][1],
+            "correct": True, "created_at": HISTORY_START + timedelta(days=3),
+        })
+        mark_changed(db, WordReviewItem)
+        db.commit()
+    reloaded, _ = current_analytics(db_path)
+    assert len(history) == 6 and len(reloaded) == 7
+
+    # Unknown generations: always a fresh load, never the kept one
+    monkeypatch.setattr(generations, "current", lambda: None)
+    assert current_analytics(db_path)[0] is not current_analytics(db_path)[0]
+    generations.close()
@@ -0,0 +1,95 @@
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+import autocomplete
+import cache
+import routers.words as words_router
+from autocomplete import PrefixIndex, classify
+from cache import TableGenerations, mark_changed
+from models import Word
+from routers.words import autocomplete_words
+
+WORDS = {
+    1: ("감사합니다", "gamsahamnida", "thank you"),
+    2: ("감자", "gamja", "potato"),
+    3: ("사과", "sagwa", "apple"),
+    4: ("아이스 크림", "aiseu keurim", "ice cream"),
+}
+
+
+@pytest.fixture
+def index():
+    index = PrefixIndex()
+    for word_id, fields in WORDS.items():
+        index.add(word_id, *fields)
+    return index
+
+
+def ids(results):
+    return [result[0] for result in results]
+
+
+@pytest.mark.parametrize("query, kind", [
+    ("ㄱㅅ", "choseong"),
+    ("감ㅅ", "jamo"),
+    (" Potato ", "latin"),
+])
+def test_classify(query, kind):
+    assert classify(query)[0] == kind
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("감", [1, 2]),
+    ("감ㅅ", [1]),
+    ("감사", [1]),
+    ("ㄱㅈ", [2]),
+    ("ㅅㄱ", [3]),
+    ("gam", [2, 1]),
+    ("Thank", [1]),
+    # later words of a multi-word entry start matches too
+    ("크", [4]),
+    ("cream", [4]),
+    ("zzz", []),
+])
+def test_search(index, query, expected):
+    assert ids(index.search(query)) == expected
+
+
+def test_limit_and_removal(index):
+    assert len(index.search("ㄱ", limit=1)) == 1
+    index.remove(1)
+    index.remove(99)
+    assert ids(index.search("감")) == [2]
+    index.add(2, "감자튀김", "gamjatwigim", "french fries")
+    assert index.search("french") == [(2, "감자튀김", "gamjatwigim", "french fries")]
+    assert index.search("potato") == []
+
+
+def test_words_inserted_through_core_are_suggested(monkeypatch, run_async, sync_engine, db_path):
+    generations = TableGenerations(db_path)
+    index = PrefixIndex()
+    monkeypatch.setattr(cache, "table_generations", generations)
+    monkeypatch.setattr(autocomplete, "autocomplete_index", index)
+    monkeypatch.setattr(words_router, "autocomplete_index", index)
+
+    def suggest(q):
+        async def request(session_factory):
+            async with session_factory() as db:
+                return await autocomplete_words(q=q, limit=10, db=db)
+        return [item.korean for item in run_async(request).items]
+
+    assert suggest("감") == []
+    # A bulk insert, as seeding or another worker would make: no mapper hooks
+    with Session(sync_engine) as db:
+        db.execute(insert(Word), [
+            {"korean": korean, "transliteration": transliteration, "english": english, "parts": {}}
+            for korean, transliteration, english in WORDS.values()
+        ])
+        mark_changed(db, Word)
+        db.commit()
+    assert index.is_stale()
+    assert suggest("감") == ["감사합니다", "감자"]
+    assert suggest("ice") == ["아이스 크림"]
+    assert not index.is_stale()
+    generations.close()
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from database import build_async_engine, get_async_db
+from models import WordReviewItem
+from routers import study_sessions
+
+
+@pytest.fixture
+def client(db_path):
+    engine = build_async_engine(db_path)
+    session_factory = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+    async def test_db():
+        async with session_factory() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(study_sessions.router, prefix="/api")
+    app.dependency_overrides[get_async_db] = test_db
+    with TestClient(app) as client:
+        yield client
+        client.portal.call(engine.dispose)
+
+
+def review_count(engine):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count(WordReviewItem.id))).scalar()
+
+
+def post(client, session_id, reviews):
+    return client.post(f"/api/study_sessions/{session_id}/reviews", json=reviews)
+
+
+def test_bulk_reviews_are_written_together(client, sync_engine, review_history):
+    session_id = review_history["sessions"][1]
+    apple, pear, _ = review_history["words"]
+    answered = datetime.now(timezone(timedelta(hours=9))).replace(microsecond=0) - timedelta(minutes=5)
+
+    response = post(client, session_id, [
+        {"word_id": apple, "correct": True, "answered_at": answered.isoformat()},
+        {"word_id": pear, "correct": False},
+        {"word_id": apple, "correct": True},
+    ])
+    assert response.status_code == 200
+    assert response.json() == {
+        "success": True, "study_session_id": session_id, "reviews_created": 3, "correct_count": 2,
+    }
+    assert review_count(sync_engine) == 9
+
+    with sync_engine.connect() as conn:
+        first = conn.execute(select(WordReviewItem).order_by(WordReviewItem.id.desc()).limit(3)).all()[-1]
+    # Stored as naive UTC
+    assert first.created_at == answered.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@pytest.mark.parametrize("reviews, status, detail", [
+    # every word id is checked before anything is written
+    ([{"word_id": "apple", "correct": True}, {"word_id": 998, "correct": True},
+      {"word_id": 999, "correct": False}], 404, "Words not found: [998, 999]"),
+    ([{"word_id": "apple", "correct": True},
+      {"word_id": "apple", "correct": True, "answered_at": "2999-01-01T00:00:00Z"}], 400,
+     "answered_at is in the future"),
+    ([], 422, None),
+    ([{"word_id": "apple", "correct": True}] * 1001, 422, None),
+    ([{"word_id": "apple"}], 422, None),
+    ([{"word_id": "apple", "correct": True, "answered_at": "yesterday"}], 422, None),
+])
+def test_invalid_batches_write_nothing(client, sync_engine, review_history, reviews, status, detail):
+    apple = review_history["words"][0]
+    reviews = [{**review, "word_id": apple} if review["word_id"] == "apple" else review for review in reviews]
+
+    response = post(client, review_history["sessions"][0], reviews)
+    assert response.status_code == status
+    if detail:
+        assert response.json()["detail"].startswith(detail)
+    assert review_count(sync_engine) == 6
+
+
+def test_unknown_session(client, sync_engine, review_history):
+    response = post(client, 999, [{"word_id": review_history["words"][0], "correct": True}])
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Study session not found"
+    assert review_count(sync_engine) == 6
@@ -0,0 +1,126 @@
+import sqlite3
+import time
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+import cache
+from cache import CachedRoute, ResponseCache, TableGenerations, cached, mark_changed
+
+
+def write_words(engine):
+    """Commit a write to words through its own connection, as another worker would"""
+    with Session(engine) as db:
+        mark_changed(db, "words")
+        db.commit()
+
+
+def test_generations_follow_commits_from_other_connections(sync_engine, db_path):
+    generations = TableGenerations(db_path)
+    try:
+        assert generations.current() == {}
+        write_words(sync_engine)
+        first = generations.current()["words"]
+        assert generations.current()["words"] == first
+        write_words(sync_engine)
+        assert generations.current()["words"] != first
+    finally:
+        generations.close()
+
+
+def test_missing_table_means_nothing_written(tmp_path):
+    generations = TableGenerations(str(tmp_path / "empty.db"))
+    try:
+        assert generations.current() == {}
+    finally:
+        generations.close()
+
+
+def test_unreadable_generations_are_unknown(tmp_path):
+    garbage = tmp_path / "garbage.db"
+    garbage.write_bytes(b"not a database" * 512)
+    generations = TableGenerations(str(garbage))
+    try:
+        assert generations.current() is None
+    finally:
+        generations.close()
+
+
+def test_locked_database_gives_up_quickly(tmp_path):
+    path = str(tmp_path / "locked.db")
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("CREATE TABLE table_generations (table_name TEXT PRIMARY KEY, generation INTEGER)")
+    writer.execute("BEGIN EXCLUSIVE")
+    generations = TableGenerations(path)
+    try:
+        started = time.perf_counter()
+        assert generations.current() is None
+        assert time.perf_counter() - started < 1
+        writer.execute("ROLLBACK")
+        assert generations.current() == {}
+    finally:
+        generations.close()
+        writer.close()
+
+
+@pytest.fixture
+def client(monkeypatch, db_path):
+    generations = TableGenerations(db_path)
+    monkeypatch.setattr(cache, "table_generations", generations)
+    monkeypatch.setattr(cache, "response_cache", ResponseCache(max_entries=8))
+
+    router = APIRouter(route_class=CachedRoute)
+    calls = []
+
+    @router.get("/words")
+    @cached("words")
+    def list_words(page: int = 1):
+        calls.append(page)
+        return {"page": page, "computed": len(calls)}
+
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app) as client:
+        client.calls = calls
+        yield client
+    generations.close()
+
+
+def test_etag_and_not_modified(client):
+    first = client.get("/words")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+
+    assert client.get("/words", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/words", headers={"If-None-Match": f'W/{etag}, "other"'}).status_code == 304
+    # Replayed from the cache without running the endpoint
+    assert client.get("/words").json() == first.json()
+    # The query string is part of the key
+    assert client.get("/words?page=2").headers["etag"] != etag
+    assert client.calls == [1, 2]
+    assert cache.response_cache.stats()["not_modified"] == 2
+
+
+def test_write_from_another_connection_invalidates(client, sync_engine):
+    etag = client.get("/words").headers["etag"]
+    write_words(sync_engine)
+
+    fresh = client.get("/words", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert fresh.json()["computed"] == 2
+    assert client.get("/words", headers={"If-None-Match": fresh.headers["etag"]}).status_code == 304
+
+
+def test_unknown_generations_skip_the_cache(client, monkeypatch):
+    etag = client.get("/words").headers["etag"]
+    monkeypatch.setattr(cache.table_generations, "current", lambda: None)
+
+    for _ in range(2):
+        response = client.get("/words", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert "etag" not in response.headers
+    assert client.calls == [1, 1, 1]
@@ -0,0 +1,63 @@
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+import cache
+from cache import CachedRoute, ResponseCache, TableGenerations, cached
+from compression import negotiate
+
+BOTH = ("br", "gzip")
+
+
+@pytest.mark.parametrize("header, available, expected", [
+    (None, BOTH, None),
+    ("", BOTH, None),
+    ("gzip", BOTH, "gzip"),
+    ("GZip", BOTH, "gzip"),
+    ("deflate", BOTH, None),
+    # equal weights: the server's order decides
+    ("gzip, br", BOTH, "br"),
+    ("gzip, br", ("gzip",), "gzip"),
+    # higher q wins whatever the order
+    ("br;q=0.5, gzip;q=0.8", BOTH, "gzip"),
+    ("gzip;q=0.9, br", BOTH, "br"),
+    # q=0 means "not acceptable"
+    ("gzip;q=0", BOTH, None),
+    ("br;q=0, gzip;q=0.1", BOTH, "gzip"),
+    ("gzip;q=0.000", ("gzip",), None),
+    # the wildcard covers encodings not listed by name
+    ("*", BOTH, "br"),
+    ("*;q=0.2, br;q=0", BOTH, "gzip"),
+    ("br;q=0.1, *;q=0.5", BOTH, "gzip"),
+    ("identity, *;q=0", BOTH, None),
+    # malformed weights count as zero
+    ("gzip;q=high", BOTH, None),
+    (" br ; q=0.7 ,gzip;q=0.3", BOTH, "br"),
+])
+def test_negotiate(header, available, expected):
+    assert negotiate(header, available) == expected
+
+
+def test_cached_catalog_keeps_its_encodings(monkeypatch, db_path):
+    monkeypatch.setattr(cache, "table_generations", TableGenerations(db_path))
+    monkeypatch.setattr(cache, "response_cache", ResponseCache(max_entries=8))
+    router = APIRouter(route_class=CachedRoute)
+
+    @router.get("/catalog")
+    @cached("groups", compress_body=True)
+    def catalog():
+        return {"items": ["group"] * 200}
+
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app) as client:
+        plain = client.get("/catalog", headers={"Accept-Encoding": "identity"})
+        gzipped = client.get("/catalog", headers={"Accept-Encoding": "gzip"})
+    cache.table_generations.close()
+
+    assert "content-encoding" not in plain.headers
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+    assert gzipped.headers["vary"] == "Accept-Encoding"
+    assert gzipped.json() == plain.json()
+    assert cache.response_cache.stats()["hits"] == 1
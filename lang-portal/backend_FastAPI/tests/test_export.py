@@ -0,0 +1,68 @@
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+import routers.export as export
+from conftest import HISTORY_REVIEWS
+from routers.export import EXPORT_COLUMNS, export_reviews, stream_reviews
+
+
+@pytest.fixture
+def read_export(monkeypatch, run_async):
+    """read_export(format, start, end) -> the streamed export as text"""
+    def read(format, start=None, end=None):
+        async def run(session_factory):
+            monkeypatch.setattr(export, "AsyncSessionLocal", session_factory)
+            return b"".join([chunk async for chunk in stream_reviews(format, start, end)]).decode()
+        return run_async(run)
+    return read
+
+
+def test_ndjson(read_export, review_history):
+    lines = [json.loads(line) for line in read_export("ndjson").splitlines()]
+    assert [line["review_id"] for line in lines] == review_history["reviews"]
+    assert [line["correct"] for line in lines] == [correct for _, _, correct, _ in HISTORY_REVIEWS]
+    assert lines[0] == {
+        "review_id": review_history["reviews"][0], "reviewed_at": "2025-03-01T09:01:00Z", "correct": True,
+        "word_id": review_history["words"][0], "korean": "사과", "transliteration": "sagwa", "english": "apple",
+        "study_session_id": review_history["sessions"][0],
+        "session_started_at": "2025-03-01T09:00:00Z", "session_ended_at": "2025-03-01T09:10:00Z",
+        "group_id": review_history["groups"][0], "group_name": "Fruit",
+        "study_activity_id": review_history["activity"], "activity_name": "Flashcards",
+    }
+    assert lines[-1]["session_ended_at"] is None
+
+
+def test_csv_matches_ndjson(read_export, review_history):
+    rows = list(csv.reader(io.StringIO(read_export("csv"))))
+    assert tuple(rows[0]) == EXPORT_COLUMNS
+    lines = [json.loads(line) for line in read_export("ndjson").splitlines()]
+    assert len(rows) == len(lines) + 1
+
+    for row, line in zip(rows[1:], lines):
+        expected = [
+            "" if value is None else json.dumps(value) if isinstance(value, bool) else str(value)
+            for value in line.values()
+        ]
+        assert row == expected
+    # Quotes and commas in a gloss survive the round trip
+    assert rows[2][6] == 'pear, "nashi"'
+    assert [row[2] for row in rows[1:4]] == ["true", "false", "true"]
+
+
+def test_time_range(read_export, review_history):
+    day_one = read_export("ndjson", end=datetime(2025, 3, 2)).splitlines()
+    day_two = read_export("ndjson", start=datetime(2025, 3, 2)).splitlines()
+    assert len(day_one) == 3 and len(day_two) == 3
+    assert read_export("csv", start=datetime(2025, 4, 1)) == ",".join(EXPORT_COLUMNS) + "\r\n"
+
+
+def test_empty_range_is_rejected():
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(export_reviews(format="csv", start=datetime(2025, 3, 2), end=datetime(2025, 3, 2)))
+    assert error.value.status_code == 400
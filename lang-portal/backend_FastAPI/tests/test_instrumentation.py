@@ -0,0 +1,58 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+import instrumentation
+from instrumentation import RequestStats, instrument_engine, statement_shape
+
+
+@pytest.mark.parametrize("statement, shape", [
+    ("SELECT * FROM words WHERE id IN (?, ?, ?)", "SELECT * FROM words WHERE id IN (?)"),
+    ("SELECT *\n  FROM words\n WHERE id not in (?,?)", "SELECT * FROM words WHERE id not IN (?)"),
+    ("SELECT * FROM words WHERE id = ?", "SELECT * FROM words WHERE id = ?"),
+    # multi-row inserts are distinct statements, not an IN list
+    ("INSERT INTO t (a, b) VALUES (?, ?), (?, ?)", "INSERT INTO t (a, b) VALUES (?, ?), (?, ?)"),
+    ("SELECT coalesce(?, ?) FROM t", "SELECT coalesce(?, ?) FROM t"),
+])
+def test_statement_shape(statement, shape):
+    assert statement_shape(statement) == shape
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def stats():
+    stats = RequestStats()
+    token = instrumentation._request_stats.set(stats)
+    yield stats
+    instrumentation._request_stats.reset(token)
+
+
+def test_failed_statements_leave_nothing_behind(engine, stats):
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM no_such_table"))
+        conn.execute(text("SELECT 1"))
+        conn.execute(text("SELECT 2 WHERE 1 IN (1, 2)"))
+        assert "query_started" not in conn.info
+
+    # Only the statements that ran are counted
+    assert stats.query_count == 2
+    assert 0 <= stats.db_time < 1
+    assert set(stats.shapes) == {"SELECT 1", "SELECT 2 WHERE 1 IN (1, 2)"}
+
+
+def test_repeated_shapes(engine, stats):
+    with engine.connect() as conn:
+        for word_id in range(4):
+            conn.execute(text("SELECT :id"), {"id": word_id})
+            conn.execute(text("SELECT :a IN (:a, :b)"), {"a": word_id, "b": 0})
+    assert stats.repeated_shapes(3) == [("SELECT ?", 4), ("SELECT ? IN (?)", 4)]
+    assert stats.repeated_shapes(4) == []
@@ -0,0 +1,133 @@
+import orjson
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+import cache
+import membership
+import routers.words as words_router
+from cache import TableGenerations, mark_changed
+from membership import MembershipIndex, iter_ids, to_bitmap
+from models import Group, Word, WordGroup
+from routers.words import query_words
+
+
+def ids(bitmap, start=0):
+    return list(iter_ids(bitmap, start))
+
+
+def test_bitmap_round_trip():
+    assert to_bitmap([]) == 0
+    assert to_bitmap([0, 3, 3, 64]) == (1 << 0) | (1 << 3) | (1 << 64)
+    assert ids(to_bitmap([900, 1, 17, 8])) == [1, 8, 17, 900]
+    assert ids(to_bitmap(range(1, 200, 3)), start=100) == list(range(100, 200, 3))
+
+
+@pytest.fixture
+def index():
+    # words 1-10; group 1: 1-5, group 2: 4-8, group 3: even ids; 2, 4 and 9 studied
+    index = MembershipIndex()
+    for word_id in range(1, 11):
+        index.add_word(word_id)
+    for group_id, members in {1: range(1, 6), 2: range(4, 9), 3: range(2, 11, 2)}.items():
+        index.add_group(group_id)
+        for word_id in members:
+            index.add_link(group_id, word_id)
+    index.add_studied([2, 4, 9])
+    return index
+
+
+@pytest.mark.parametrize("query, expected", [
+    ({}, list(range(1, 11))),
+    ({"in_all": (1, 2)}, [4, 5]),
+    ({"in_all": (1, 2, 3)}, [4]),
+    ({"in_any": (1, 2)}, [1, 2, 3, 4, 5, 6, 7, 8]),
+    ({"in_any": (1, 2), "not_in": (3,)}, [1, 3, 5, 7]),
+    ({"not_in": (1, 2)}, [9, 10]),
+    ({"in_all": (1,), "in_any": (2, 3)}, [2, 4, 5]),
+    ({"studied": True}, [2, 4, 9]),
+    ({"in_all": (1, 2), "studied": False}, [5]),
+    ({"not_in": (1,), "studied": False}, [6, 7, 8, 10]),
+])
+def test_query(index, query, expected):
+    assert ids(index.query(**query)) == expected
+    assert index.query(**query).bit_count() == len(expected)
+
+
+def test_unknown_group_raises(index):
+    with pytest.raises(KeyError):
+        index.query(in_all=(99,))
+
+
+def test_removals(index):
+    index.remove_word(4)
+    assert ids(index.query(in_all=(1, 2))) == [5]
+    assert ids(index.query(studied=True)) == [2, 9]
+
+    index.remove_link(2, 5)
+    assert ids(index.query(in_all=(1, 2))) == []
+    index.remove_link(99, 5)  # unknown group: nothing to do
+
+    index.remove_group(3)
+    with pytest.raises(KeyError):
+        index.query(not_in=(3,))
+
+    index.clear_studied()
+    assert ids(index.query(studied=False)) == ids(index.words)
+
+
+@pytest.fixture
+def live_index(monkeypatch, db_path):
+    """A fresh membership_index whose generations come from the test database"""
+    generations = TableGenerations(db_path)
+    index = MembershipIndex()
+    monkeypatch.setattr(cache, "table_generations", generations)
+    monkeypatch.setattr(membership, "membership_index", index)
+    monkeypatch.setattr(words_router, "membership_index", index)
+    yield index
+    generations.close()
+
+
+QUERY_DEFAULTS = {"in_all": [], "in_any": [], "not_in": [], "studied": None, "cursor": None, "limit": 100}
+
+
+def write(engine, table, rows):
+    """Insert through Core in a session of its own, the way bulk tasks and
+    other workers write: no mapper hooks, only the generation bump"""
+    with Session(engine) as db:
+        ids = db.execute(insert(table).returning(table.id), rows).scalars().all()
+        mark_changed(db, table)
+        db.commit()
+    return ids
+
+
+def test_query_words_reloads_after_writes_elsewhere(run_async, sync_engine, live_index):
+    word_ids = write(sync_engine, Word, [
+        {"korean": korean, "transliteration": korean, "english": korean, "parts": {}}
+        for korean in ("사과", "배", "포도")
+    ])
+    group_id, = write(sync_engine, Group, [{"name": "Fruit"}])
+    write(sync_engine, WordGroup, [{"group_id": group_id, "word_id": word_ids[0]}])
+
+    def run(**params):
+        async def query(session_factory):
+            async with session_factory() as db:
+                response = await query_words(**{**QUERY_DEFAULTS, **params}, db=db)
+            return [item["id"] for item in orjson.loads(response.body)["items"]]
+        return run_async(query)
+
+    assert run(in_all=[group_id]) == word_ids[:1]
+    assert not live_index.is_stale()
+
+    write(sync_engine, WordGroup, [{"group_id": group_id, "word_id": word_ids[2]}])
+    assert live_index.is_stale()
+    assert run(in_all=[group_id]) == [word_ids[0], word_ids[2]]
+    assert run(not_in=[group_id]) == [word_ids[1]]
+
+
+def test_unknown_generations_always_reload(monkeypatch, sync_engine, live_index):
+    with Session(sync_engine) as db:
+        live_index.load(db)
+    assert not live_index.is_stale()
+    monkeypatch.setattr(cache.table_generations, "current", lambda: None)
+    assert live_index.is_stale()
@@ -0,0 +1,107 @@
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine
+
+from migrator import MigrationError, migrate, split_statements
+
+
+@pytest.fixture
+def migrations_dir(tmp_path):
+    directory = tmp_path / "migrations"
+    directory.mkdir()
+    (directory / "0001_create_notes.sql").write_text(
+        "-- notes; with a semicolon in a comment\n"
+        "CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT NOT NULL);\n"
+        "INSERT INTO notes (body) VALUES ('a;b');\n"
+    )
+    (directory / "0002_note_trigger.sql").write_text(
+        "ALTER TABLE notes ADD COLUMN length INTEGER;\n"
+        "CREATE TRIGGER trg_notes_length AFTER INSERT ON notes\n"
+        "BEGIN\n"
+        "    UPDATE notes SET length = length(NEW.body) WHERE id = NEW.id;\n"
+        "END;\n"
+    )
+    return directory
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    yield engine
+    engine.dispose()
+
+
+def query(engine, sql):
+    raw = engine.raw_connection()
+    try:
+        return raw.driver_connection.execute(sql).fetchall()
+    finally:
+        raw.close()
+
+
+def test_split_statements_keeps_trigger_bodies_whole():
+    statements = split_statements(
+        "CREATE TABLE t (x TEXT); -- a; comment\n"
+        "CREATE TRIGGER g AFTER INSERT ON t BEGIN UPDATE t SET x = 'a;b'; DELETE FROM t WHERE 0; END;\n"
+        "-- trailing comment only\n"
+    )
+    # A comment stays with the statement after it; SQLite skips it
+    assert len(statements) == 2
+    assert "CREATE TRIGGER" in statements[1] and statements[1].endswith("END;")
+
+
+def test_migrate_applies_pending_migrations_once(engine, migrations_dir):
+    results = migrate(engine, str(migrations_dir))
+    assert [migration.version for migration, _ in results] == [1, 2]
+    assert query(engine, "PRAGMA user_version") == [(2,)]
+    assert query(engine, "SELECT body FROM notes") == [("a;b",)]
+
+    assert migrate(engine, str(migrations_dir)) == []
+    assert migrate(engine, str(migrations_dir), verify=False) == []
+    assert query(engine, "SELECT version, name FROM schema_migrations ORDER BY version") == [
+        (1, "create_notes"), (2, "note_trigger")
+    ]
+
+    (migrations_dir / "0003_more_notes.sql").write_text("INSERT INTO notes (body) VALUES ('abc');\n")
+    assert [migration.version for migration, _ in migrate(engine, str(migrations_dir), verify=False)] == [3]
+    assert query(engine, "SELECT body, length FROM notes ORDER BY id") == [("a;b", None), ("abc", 3)]
+
+
+def test_edited_migration_fails_the_checksum(engine, migrations_dir):
+    migrate(engine, str(migrations_dir))
+    path = migrations_dir / "0001_create_notes.sql"
+    path.write_text(path.read_text() + "INSERT INTO notes (body) VALUES ('late edit');\n")
+
+    with pytest.raises(MigrationError, match="0001_create_notes.sql changed after it was applied"):
+        migrate(engine, str(migrations_dir))
+    # The header-only fast path doesn't read applied files
+    assert migrate(engine, str(migrations_dir), verify=False) == []
+
+
+def test_missing_applied_migration_is_reported(engine, migrations_dir):
+    migrate(engine, str(migrations_dir))
+    (migrations_dir / "0002_note_trigger.sql").unlink()
+
+    with pytest.raises(MigrationError, match="0002_note_trigger.sql is missing"):
+        migrate(engine, str(migrations_dir))
+
+
+def test_failed_migration_is_rolled_back(engine, migrations_dir):
+    (migrations_dir / "0003_broken.sql").write_text(
+        "CREATE TABLE tags (id INTEGER PRIMARY KEY);\n"
+        "INSERT INTO no_such_table VALUES (1);\n"
+    )
+    with pytest.raises(MigrationError, match="0003_broken.sql failed"):
+        migrate(engine, str(migrations_dir))
+
+    assert query(engine, "PRAGMA user_version") == [(2,)]
+    assert query(engine, "SELECT name FROM sqlite_master WHERE name = 'tags'") == []
+
+
+def test_duplicate_versions_are_refused(engine, migrations_dir):
+    (migrations_dir / "0002_other.sql").write_text("SELECT 1;\n")
+    with pytest.raises(MigrationError, match="share version 2"):
+        migrate(engine, str(migrations_dir))
+    with pytest.raises(sqlite3.OperationalError):
+        query(engine, "SELECT * FROM notes")
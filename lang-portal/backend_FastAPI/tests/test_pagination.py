@@ -0,0 +1,112 @@
+import base64
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert, select, update
+
+from models import Word, WordReviewStats
+from pagination import decode_cursor, encode_cursor, paginate
+
+
+@pytest.mark.parametrize("values, types", [
+    ([42], [int]),
+    ([0.75, 12], [float, int]),
+    ([1, 12], [float, int]),
+    (["사과", 3], [str, int]),
+])
+def test_cursor_round_trip(values, types):
+    cursor = encode_cursor(values)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, types) == values
+
+
+@pytest.mark.parametrize("cursor", [
+    "!!!",
+    "bm90IGpzb24",  # "not json"
+    encode_cursor([]),
+    encode_cursor([1, 2]),
+    encode_cursor(["1"]),
+    encode_cursor([1.5]),
+    encode_cursor([True]),
+    encode_cursor([None]),
+    encode_cursor([[1]]),
+])
+def test_bad_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, [int])
+    assert error.value.status_code == 400
+
+
+def test_non_finite_float_cursor_is_rejected():
+    # json.dumps writes NaN, which json.loads reads back
+    with pytest.raises(HTTPException):
+        decode_cursor(encode_cursor([float("nan"), 1]), [float, int])
+
+
+def test_non_list_cursor_is_rejected():
+    cursor = base64.urlsafe_b64encode(b'{"id": 1}').decode()
+    with pytest.raises(HTTPException):
+        decode_cursor(cursor, [int])
+
+
+@pytest.fixture
+def words(sync_engine):
+    """25 words, accuracies with ties; returns [(accuracy, id)] in key order"""
+    with sync_engine.begin() as conn:
+        conn.execute(insert(Word), [
+            {"korean": f"단어{n}", "transliteration": f"daneo{n}", "english": f"word {n}", "parts": {}}
+            for n in range(25)
+        ])
+        ids = conn.execute(select(Word.id).order_by(Word.id)).scalars().all()
+        for word_id in ids:
+            conn.execute(
+                update(WordReviewStats).where(WordReviewStats.word_id == word_id).values(accuracy=(word_id % 4) / 4)
+            )
+    return sorted(((word_id % 4) / 4, word_id) for word_id in ids)
+
+
+def walk(run_async, stmt, keys, row_key, descending=False, items_per_page=7):
+    """Every row of stmt, read page by page through the cursors"""
+    async def pages(session_factory):
+        rows, cursor = [], ""
+        async with session_factory() as db:
+            while True:
+                page, info = await paginate(
+                    db, stmt, keys=keys, row_key=row_key, page=1, cursor=cursor,
+                    items_per_page=items_per_page, descending=descending
+                )
+                assert len(page) <= items_per_page
+                rows.extend(row_key(row) for row in page)
+                if info.next_cursor is None:
+                    return rows
+                cursor = info.next_cursor
+    return run_async(pages)
+
+
+def test_cursor_pages_cover_every_row_once(run_async, words):
+    ids = sorted(word_id for _, word_id in words)
+    # A single entity or column comes back as scalars
+    assert walk(run_async, select(Word), [Word.id], lambda word: (word.id,)) == [(i,) for i in ids]
+    assert walk(run_async, select(Word.id), [Word.id], lambda word_id: (word_id,), descending=True) == [
+        (i,) for i in reversed(ids)
+    ]
+
+
+def test_cursor_pages_with_a_tied_sort_key(run_async, words):
+    stmt = select(WordReviewStats.accuracy, Word.id).join(WordReviewStats, WordReviewStats.word_id == Word.id)
+    keys = [WordReviewStats.accuracy, Word.id]
+    assert walk(run_async, stmt, keys, lambda row: (row.accuracy, row.id)) == words
+    assert walk(run_async, stmt, keys, lambda row: (row.accuracy, row.id), descending=True) == words[::-1]
+
+
+def test_page_mode_counts_the_total(run_async, words):
+    async def second_page(session_factory):
+        async with session_factory() as db:
+            return await paginate(
+                db, select(Word.id), keys=[Word.id], row_key=lambda word_id: (word_id,),
+                page=2, cursor=None, items_per_page=10
+            )
+
+    rows, info = run_async(second_page)
+    assert rows == sorted(word_id for _, word_id in words)[10:20]
+    assert (info.total_items, info.total_pages) == (25, 3)
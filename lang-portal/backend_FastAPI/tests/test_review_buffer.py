@@ -0,0 +1,102 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from models import Word, WordReviewItem, WordReviewStats
+from review_buffer import ReviewBuffer
+
+START = datetime(2025, 3, 1, 9, 0)
+
+
+@pytest.fixture
+def word_id(sync_engine):
+    with sync_engine.begin() as conn:
+        return conn.execute(
+            insert(Word).returning(Word.id),
+            {"korean": "사과", "transliteration": "sagwa", "english": "apple", "parts": {}}
+        ).scalar()
+
+
+def review(word_id, minute, correct=True):
+    # correct=None breaks the NOT NULL constraint: a row that can never be written
+    return {
+        "word_id": word_id, "study_session_id": 1, "correct": correct,
+        "created_at": START + timedelta(minutes=minute),
+    }
+
+
+def stored(engine, word_id):
+    with engine.connect() as conn:
+        reviews = conn.execute(select(func.count(WordReviewItem.id))).scalar()
+        counted = conn.execute(
+            select(WordReviewStats.review_count).where(WordReviewStats.word_id == word_id)
+        ).scalar()
+    return reviews, counted
+
+
+def buffered(run_async, test, **options):
+    """Run test(buffer) against a started ReviewBuffer; flushes are manual"""
+    async def run(session_factory):
+        buffer = ReviewBuffer(session_factory=session_factory, flush_interval_ms=60000, **options)
+        buffer.start()
+        try:
+            return await test(buffer)
+        finally:
+            await buffer.stop()
+    return run_async(run)
+
+
+def test_write_behind_poison_row_is_retried_then_dropped(run_async, sync_engine, word_id):
+    bad = review(word_id, 1, correct=None)
+
+    async def test(buffer):
+        for row in (review(word_id, 0), bad, review(word_id, 2)):
+            await buffer.submit(row)
+
+        await buffer.flush()
+        # The good rows went in one by one; the bad one waits for another try
+        assert buffer.flushed_rows == 2 and buffer.failed_batches == 1
+        assert buffer.depth == 1 and buffer.dropped_rows == 0
+
+        await buffer.submit(review(word_id, 3))
+        await buffer.flush()
+        return buffer.stats(), list(buffer.dead_letters)
+
+    stats, dead_letters = buffered(run_async, test, durable=False, max_attempts=2)
+    assert stats["depth"] == 0
+    assert (stats["flushed_rows"], stats["dropped_rows"], stats["failed_rows"]) == (3, 1, 0)
+    assert dead_letters == [bad]
+    assert stored(sync_engine, word_id) == (3, 3)
+
+
+def test_durable_poison_row_fails_only_its_own_request(run_async, sync_engine, word_id):
+    async def test(buffer):
+        requests = [
+            asyncio.create_task(buffer.submit(row))
+            for row in (review(word_id, 0), review(word_id, 1, correct=None), review(word_id, 2))
+        ]
+        await asyncio.sleep(0)
+        assert buffer.depth == 3
+        await buffer.flush()
+        return await asyncio.gather(*requests, return_exceptions=True), buffer.stats()
+
+    results, stats = buffered(run_async, test, durable=True)
+    assert results[0] is None and results[2] is None
+    assert isinstance(results[1], IntegrityError)
+    assert (stats["flushed_rows"], stats["failed_rows"], stats["dropped_rows"], stats["depth"]) == (2, 1, 0, 0)
+    assert stored(sync_engine, word_id) == (2, 2)
+
+
+def test_drained_writes_queued_rows_first(run_async, sync_engine, word_id):
+    async def test(buffer):
+        await buffer.submit(review(word_id, 0))
+        await buffer.submit(review(word_id, 1))
+        async with buffer.drained():
+            return buffer.depth, stored(sync_engine, word_id)
+
+    depth, inside = buffered(run_async, test, durable=False)
+    assert depth == 0
+    assert inside == (2, 2)
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from models import Group, StudyActivity, StudySession, Word, WordReviewItem
+from reviews import write_reviews
+from rollups import record_session_ended, record_session_started, rebuild_daily_rollups
+from routers.dashboard import get_quick_stats, get_study_progress
+from stats import rebuild_word_stats
+
+START = datetime(2025, 3, 1, 23, 30)
+
+
+def old_quick_stats(engine):
+    """quick_stats as it was computed before the rollups, straight from the raw tables"""
+    with engine.connect() as conn:
+        def scalar(stmt):
+            return conn.execute(stmt).scalar() or 0
+
+        total_reviews = scalar(select(func.count(WordReviewItem.id)))
+        correct_reviews = scalar(select(func.count(WordReviewItem.id)).where(WordReviewItem.correct == True))
+        return {
+            "success_rate": round((correct_reviews / total_reviews * 100) if total_reviews > 0 else 0.0, 1),
+            "total_study_sessions": scalar(select(func.count(StudySession.id))),
+            "total_active_groups": scalar(select(func.count(func.distinct(StudySession.group_id)))),
+            "study_streak_days": scalar(select(func.count(func.distinct(func.date(StudySession.created_at))))),
+        }
+
+
+def old_study_progress(engine):
+    with engine.connect() as conn:
+        return {
+            "total_words_studied": conn.execute(select(func.count(func.distinct(WordReviewItem.word_id)))).scalar(),
+            "total_available_words": conn.execute(select(func.count(Word.id))).scalar(),
+        }
+
+
+def dashboard(run_async):
+    async def read(session_factory):
+        async with session_factory() as db:
+            return await get_quick_stats(db=db), await get_study_progress(db=db)
+    return run_async(read)
+
+
+def test_empty_dashboard(run_async, sync_engine):
+    assert dashboard(run_async) == (old_quick_stats(sync_engine), old_study_progress(sync_engine))
+
+
+def test_live_rollups_match_the_raw_tables(run_async, sync_engine):
+    with sync_engine.begin() as conn:
+        groups = conn.execute(insert(Group).returning(Group.id), [{"name": "A"}, {"name": "B"}, {"name": "C"}]
+                              ).scalars().all()
+        activity = conn.execute(insert(StudyActivity).returning(StudyActivity.id), {"name": "Quiz"}).scalar()
+        words = conn.execute(insert(Word).returning(Word.id), [
+            {"korean": f"단어{n}", "transliteration": f"daneo{n}", "english": f"word {n}", "parts": {}}
+            for n in range(6)
+        ]).scalars().all()
+
+    async def study(session_factory):
+        # Sessions around midnight on three days, one group never studied,
+        # one session never ended and one ending the day after it started
+        for n, (group, hours) in enumerate([(0, 0), (0, 1), (1, 24), (0, 49), (1, 49)]):
+            started = START + timedelta(hours=hours)
+            async with session_factory() as db:
+                session = StudySession(group_id=groups[group], study_activity_id=activity, created_at=started)
+                db.add(session)
+                await record_session_started(db, session.group_id, started)
+                await db.flush()
+                await write_reviews(db, [
+                    {"word_id": words[(n + i) % 4], "study_session_id": session.id, "correct": (n + i) % 3 > 0,
+                     "created_at": started + timedelta(minutes=i * 7)}
+                    for i in range(n + 2)
+                ])
+                if n != 4:
+                    session.ended_at = started + timedelta(minutes=40)
+                    await record_session_ended(db, session.ended_at)
+                await db.commit()
+
+    run_async(study)
+    live = dashboard(run_async)
+    assert live == (old_quick_stats(sync_engine), old_study_progress(sync_engine))
+    assert live[0]["total_study_sessions"] == 5
+    assert live[1] == {"total_words_studied": 4, "total_available_words": 6}
+
+    # A rebuild from scratch lands on the same numbers
+    with Session(sync_engine) as db:
+        assert rebuild_daily_rollups(db) == 4
+        db.commit()
+    assert dashboard(run_async) == live
+
+
+def test_rebuild_covers_history_written_without_rollups(run_async, sync_engine, review_history):
+    # review_history writes through Core, bypassing the rollups and counters
+    assert dashboard(run_async)[0]["total_study_sessions"] == 0
+    with Session(sync_engine) as db:
+        rebuild_daily_rollups(db)
+        rebuild_word_stats(db)
+        db.commit()
+    assert dashboard(run_async) == (old_quick_stats(sync_engine), old_study_progress(sync_engine))
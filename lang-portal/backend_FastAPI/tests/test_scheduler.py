@@ -0,0 +1,120 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from models import Word, WordSchedule
+from reviews import write_reviews
+from scheduler import (
+    INITIAL_EASE, MAX_INTERVAL_DAYS, MIN_EASE, RELEARN_DELAY, SCHEDULE_FIELDS, apply_review, new_schedule,
+    rebuild_schedules,
+)
+
+START = datetime(2025, 3, 1, 9, 0)
+
+
+def replay(word_id, answers):
+    schedule = new_schedule(word_id)
+    for correct, reviewed_at in answers:
+        apply_review(schedule, correct, reviewed_at)
+    return schedule
+
+
+def test_correct_answers_grow_the_interval():
+    schedule = new_schedule(1)
+    intervals = []
+    for day in range(4):
+        apply_review(schedule, True, START + timedelta(days=day))
+        intervals.append(schedule["interval_days"])
+
+    assert intervals == [1.0, 6.0, 15.0, 37.5]
+    assert schedule["repetitions"] == 4
+    assert schedule["ease"] == pytest.approx(INITIAL_EASE)
+    assert schedule["due_at"] == START + timedelta(days=3, hours=37.5 * 24)
+    assert schedule["last_reviewed_at"] == START + timedelta(days=3)
+
+
+def test_a_miss_resets_the_streak_and_lowers_the_ease():
+    schedule = replay(1, [(True, START), (True, START + timedelta(days=1)), (False, START + timedelta(days=7))])
+    assert (schedule["repetitions"], schedule["interval_days"], schedule["lapses"]) == (0, 0.0, 1)
+    assert schedule["ease"] == pytest.approx(INITIAL_EASE - 0.32)
+    assert schedule["due_at"] == START + timedelta(days=7) + RELEARN_DELAY
+
+    apply_review(schedule, True, START + timedelta(days=8))
+    assert (schedule["repetitions"], schedule["interval_days"]) == (1, 1.0)
+
+
+def test_ease_and_interval_are_clamped():
+    schedule = replay(1, [(False, START + timedelta(minutes=n)) for n in range(10)])
+    assert schedule["ease"] == MIN_EASE
+    assert schedule["lapses"] == 10
+
+    schedule = new_schedule(1)
+    schedule.update(repetitions=5, interval_days=30000.0)
+    apply_review(schedule, True, START)
+    assert schedule["interval_days"] == MAX_INTERVAL_DAYS
+
+
+@pytest.fixture
+def word_id(sync_engine):
+    with sync_engine.begin() as conn:
+        return conn.execute(
+            insert(Word).returning(Word.id),
+            {"korean": "사과", "transliteration": "sagwa", "english": "apple", "parts": {}}
+        ).scalar()
+
+
+def write_batches(run_async, batches):
+    """Commit each batch of (word_id, correct, created_at) through write_reviews()"""
+    async def write(session_factory):
+        for batch in batches:
+            async with session_factory() as db:
+                await write_reviews(db, [
+                    {"word_id": word_id, "study_session_id": 1, "correct": correct, "created_at": created_at}
+                    for word_id, correct, created_at in batch
+                ])
+                await db.commit()
+    run_async(write)
+
+
+def stored_schedule(engine, word_id):
+    with Session(engine) as db:
+        row = db.execute(
+            select(*(getattr(WordSchedule, field) for field in SCHEDULE_FIELDS)).where(WordSchedule.word_id == word_id)
+        ).one()
+    return dict(row._mapping)
+
+
+def expected(schedule):
+    return {field: schedule[field] for field in SCHEDULE_FIELDS}
+
+
+def test_a_batch_is_applied_in_time_order(run_async, sync_engine, word_id):
+    answers = [(False, START), (True, START + timedelta(days=1)), (True, START + timedelta(days=7))]
+    write_batches(run_async, [
+        [(word_id, True, START + timedelta(days=1)), (word_id, False, START)],
+        [(word_id, True, START + timedelta(days=7))],
+    ])
+
+    assert stored_schedule(sync_engine, word_id) == expected(replay(word_id, answers))
+
+
+def test_an_out_of_order_review_replays_the_history(run_async, sync_engine, word_id):
+    answers = [(True, START), (False, START + timedelta(days=1)), (True, START + timedelta(days=2)),
+               (True, START + timedelta(days=8))]
+    # Committed as: day 0, day 8, then days 2 and 1 arriving late
+    write_batches(run_async, [
+        [(word_id, True, START)],
+        [(word_id, True, START + timedelta(days=8))],
+        [(word_id, True, START + timedelta(days=2))],
+        [(word_id, False, START + timedelta(days=1))],
+    ])
+
+    assert stored_schedule(sync_engine, word_id) == expected(replay(word_id, answers))
+
+    # and it agrees with the maintenance rebuild
+    with Session(sync_engine) as db:
+        rebuild_schedules(db)
+        db.commit()
+    assert stored_schedule(sync_engine, word_id) == expected(replay(word_id, answers))
@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from models import Word
+from search import build_search_filter, rebuild_search_index, search_word_ids
+
+WORDS = [
+    ("한식", "hansik", "korean food"),
+    ("한국어", "hangugeo", "korean language"),
+    ("과일", "gwail", "fruit"),
+    ("사과", "sagwa", "apple"),
+    ("감사합니다", "gamsahamnida", "thank you"),
+]
+
+
+@pytest.fixture
+def word_ids(sync_engine):
+    # Through the ORM, so the mapper hooks index each word in words_fts
+    with Session(sync_engine) as db:
+        words = [Word(korean=k, transliteration=t, english=e, parts={}) for k, t, e in WORDS]
+        db.add_all(words)
+        db.commit()
+        return {word.korean: word.id for word in words}
+
+
+def search(run_async, query, limit=20):
+    async def run(session_factory):
+        async with session_factory() as db:
+            return await search_word_ids(db, query, limit)
+    return run_async(run)
+
+
+def test_short_terms_fall_back_to_like():
+    match, likes, params = build_search_filter("하 apple")
+    assert match == '{transliteration english} : "apple"'
+    assert likes == ["(korean_jamo LIKE :like_0 ESCAPE '\\')"]
+    assert params["like_0"] == "%ㅎㅏ%"
+
+
+@pytest.mark.parametrize("query, expected", [
+    # a whole word, matched as jamo trigrams
+    ("사과", ["사과"]),
+    # a half-typed syllable: 한 and 합 are still ㅎㅏ on the keyboard
+    ("하", ["한식", "한국어", "감사합니다"]),
+    ("한ㄱ", ["한국어"]),
+    # typed jamo by jamo
+    ("ㄱㅘ", ["과일", "사과"]),
+    ("ㅎㅏㄴㅅㅣ", ["한식"]),
+    # inside a word, not only at its start
+    ("합니", ["감사합니다"]),
+    # every term must match
+    ("한 food", ["한식"]),
+    ("korean", ["한식", "한국어"]),
+    ("없는", []),
+])
+def test_hangul_and_jamo_input(run_async, word_ids, query, expected):
+    assert sorted(search(run_async, query)) == sorted(word_ids[korean] for korean in expected)
+
+
+def test_best_match_wins_over_many_weaker_ones(run_async, sync_engine):
+    # Thousands of long glosses mentioning apple, then one word that is
+    # nothing but apple, added last so it has the highest id
+    with sync_engine.begin() as conn:
+        conn.execute(insert(Word), [
+            {"korean": f"단어{n}", "transliteration": f"daneo{n}",
+             "english": f"apple {'and more words ' * 5}{n}", "parts": {}}
+            for n in range(3000)
+        ])
+        best = conn.execute(
+            insert(Word).returning(Word.id),
+            {"korean": "사과", "transliteration": "sagwa", "english": "apple", "parts": {}}
+        ).scalar()
+    with Session(sync_engine) as db:
+        assert rebuild_search_index(db) == 3001
+        db.commit()
+
+    results = search(run_async, "apple", limit=5)
+    assert results[0] == best
+    assert len(results) == 5
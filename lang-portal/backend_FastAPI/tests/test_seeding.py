@@ -0,0 +1,94 @@
+import json
+import os
+
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from models import Group, Word, WordGroup, WordReviewStats
+from search import words_fts
+from seeding import bulk_load_seeds, parse_seed_files
+
+SEEDS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "seeds")
+
+
+def word(korean, english, **extra):
+    return {"korean": korean, "transliteration": korean, "english": english, **extra}
+
+
+@pytest.fixture
+def seeds(tmp_path):
+    directory = tmp_path / "seeds"
+    directory.mkdir()
+    (directory / "fruit_and_nuts.json").write_text(json.dumps(
+        [word("사과", "apple", parts={"type": "noun"}), word("배", "pear"), word("배", "pear again")]
+    ), encoding="utf-8")
+    (directory / "greetings.json").write_text(json.dumps(
+        [word("안녕하세요", "hello"), word("사과", "apology")]
+    ), encoding="utf-8")
+    # Not a word list
+    (directory / "study_activities.json").write_text(json.dumps([{"name": "Quiz"}]))
+    return str(directory)
+
+
+def load(engine, seeds_dir, group_names=None):
+    with Session(engine) as db:
+        return bulk_load_seeds(db, seeds_dir, group_names or {})
+
+
+def counts(engine):
+    with engine.connect() as conn:
+        return tuple(
+            conn.execute(select(func.count()).select_from(table)).scalar()
+            for table in (Group, Word, WordGroup, WordReviewStats, words_fts)
+        )
+
+
+def test_parse_first_definition_wins(seeds):
+    groups, words, links = parse_seed_files(seeds, {"greetings.json": "Basic Greetings"})
+    assert groups == ["Fruit And Nuts", "Basic Greetings"]
+    assert words["사과"]["english"] == "apple" and words["사과"]["parts"] == {"type": "noun"}
+    assert words["배"] == {"korean": "배", "transliteration": "배", "english": "pear", "parts": {}}
+    # The shared word is linked to both groups
+    assert links == {("사과", "Fruit And Nuts"), ("배", "Fruit And Nuts"),
+                     ("안녕하세요", "Basic Greetings"), ("사과", "Basic Greetings")}
+
+
+def test_rerun_inserts_nothing(sync_engine, seeds):
+    first = load(sync_engine, seeds)
+    assert (first["words_inserted"], first["words_existing"]) == (3, 0)
+    assert (first["links_inserted"], first["links_existing"]) == (4, 0)
+    # groups, words, links, one stats row and one search row per word
+    assert counts(sync_engine) == (2, 3, 4, 3, 3)
+
+    again = load(sync_engine, seeds)
+    assert (again["words_inserted"], again["words_existing"]) == (0, 3)
+    assert (again["links_inserted"], again["links_existing"]) == (0, 4)
+    assert counts(sync_engine) == (2, 3, 4, 3, 3)
+
+
+def test_stored_words_are_kept(sync_engine, seeds):
+    with sync_engine.begin() as conn:
+        conn.execute(insert(Word), word("사과", "apple (edited)", parts={}))
+
+    report = load(sync_engine, seeds)
+    assert (report["words_inserted"], report["words_existing"]) == (2, 1)
+    with sync_engine.connect() as conn:
+        assert conn.execute(select(Word.english).where(Word.korean == "사과")).scalar() == "apple (edited)"
+        # Only the new words were added to the search index here
+        assert conn.execute(select(func.count()).select_from(words_fts)).scalar() == 2
+
+
+def test_bad_entry_writes_nothing(sync_engine, seeds):
+    with open(os.path.join(seeds, "greetings.json"), "w", encoding="utf-8") as f:
+        json.dump([{"korean": "안녕", "english": "hi"}], f)
+    with pytest.raises(ValueError, match=r"greetings.json: word entry without \['transliteration'\]"):
+        load(sync_engine, seeds)
+    assert counts(sync_engine) == (0, 0, 0, 0, 0)
+
+
+def test_repository_seeds_load_once(sync_engine):
+    first = load(sync_engine, SEEDS_DIR)
+    assert first["words_inserted"] == first["files_words"] > 0
+    again = load(sync_engine, SEEDS_DIR)
+    assert again["words_inserted"] == 0 and again["links_inserted"] == 0
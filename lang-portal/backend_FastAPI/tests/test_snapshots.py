@@ -0,0 +1,64 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import Session
+
+from conftest import HISTORY_REVIEWS
+from snapshots import snapshot_schema, write_snapshots
+
+pa = pytest.importorskip("pyarrow")
+ipc = pytest.importorskip("pyarrow.ipc")
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def read(path, format):
+    if format == "parquet":
+        return pq.read_table(path)
+    with ipc.open_file(path) as reader:
+        return reader.read_all()
+
+
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_snapshots_round_trip(sync_engine, review_history, tmp_path, format):
+    with Session(sync_engine) as db:
+        # Tiny batches: several row groups / record batches, and dictionaries
+        # that grow from one batch to the next
+        report = write_snapshots(db, str(tmp_path), format, batch_size=1)
+
+    assert {table: info["rows"] for table, info in report["tables"].items()} == {
+        "reviews": 6, "study_sessions": 2, "words": 3,
+    }
+    tables = {table: read(info["path"], format) for table, info in report["tables"].items()}
+    for table, data in tables.items():
+        assert data.schema == snapshot_schema(table)
+
+    reviews = tables["reviews"].to_pydict()
+    assert reviews["id"] == review_history["reviews"]
+    assert reviews["correct"] == [correct for _, _, correct, _ in HISTORY_REVIEWS]
+    assert reviews["reviewed_at"][0] == datetime(2025, 3, 1, 9, 1)
+
+    sessions = tables["study_sessions"].to_pydict()
+    assert sessions["group_name"] == ["Fruit", "Greetings"]
+    assert sessions["activity_name"] == ["Flashcards", "Flashcards"]
+    assert sessions["ended_at"] == [datetime(2025, 3, 1, 9, 10), None]
+
+    assert tables["words"].column("korean").to_pylist() == ["사과", "배", "안녕하세요"]
+
+
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_time_range_filters_reviews_and_sessions(sync_engine, review_history, tmp_path, format):
+    with Session(sync_engine) as db:
+        report = write_snapshots(db, str(tmp_path), format, start=datetime(2025, 3, 2))
+
+    rows = {table: info["rows"] for table, info in report["tables"].items()}
+    # Words are always written whole
+    assert rows == {"reviews": 3, "study_sessions": 1, "words": 3}
+    reviews = read(report["tables"]["reviews"]["path"], format)
+    assert reviews.column("id").to_pylist() == review_history["reviews"][3:]
+
+
+def test_single_table(sync_engine, review_history, tmp_path):
+    with Session(sync_engine) as db:
+        report = write_snapshots(db, str(tmp_path / "out"), "arrow", tables=["words"])
+    assert list(report["tables"]) == ["words"]
+    assert [path.name for path in (tmp_path / "out").iterdir()] == ["words.arrow"]
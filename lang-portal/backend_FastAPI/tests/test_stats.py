@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from models import Word, WordReviewStats
+from reviews import write_reviews
+from stats import get_word_stats, get_word_stats_bulk, rebuild_word_stats
+
+START = datetime(2025, 3, 1, 9, 0)
+
+
+def add_words(engine, count):
+    with engine.begin() as conn:
+        return conn.execute(insert(Word).returning(Word.id), [
+            {"korean": f"단어{n}", "transliteration": f"daneo{n}", "english": f"word {n}", "parts": {}}
+            for n in range(count)
+        ]).scalars().all()
+
+
+def stored_stats(engine):
+    with Session(engine) as db:
+        return db.execute(select(WordReviewStats).order_by(WordReviewStats.word_id)).scalars().all()
+
+
+def as_tuples(rows):
+    return [
+        (row.word_id, row.correct_count, row.wrong_count, row.review_count, row.accuracy, row.last_reviewed_at)
+        for row in rows
+    ]
+
+
+def test_page_stats_in_one_lookup(run_async, sync_engine):
+    first, second, unreviewed = add_words(sync_engine, 3)
+    answers = [(first, True), (first, True), (first, False), (second, False)]
+
+    async def write_and_read(session_factory):
+        async with session_factory() as db:
+            await write_reviews(db, [
+                {"word_id": word_id, "study_session_id": 1, "correct": correct,
+                 "created_at": START + timedelta(minutes=n)}
+                for n, (word_id, correct) in enumerate(answers)
+            ])
+            await db.commit()
+            return (
+                await get_word_stats_bulk(db, [first, second, unreviewed, 999]),
+                await get_word_stats(db, first),
+                await get_word_stats_bulk(db, []),
+            )
+
+    page, single, empty = run_async(write_and_read)
+    assert page == {first: (2, 1), second: (0, 1), unreviewed: (0, 0), 999: (0, 0)}
+    assert single == (2, 1)
+    assert empty == {}
+
+
+def test_incremental_counters_match_a_rebuild(run_async, sync_engine):
+    word_ids = add_words(sync_engine, 4)
+
+    async def write(session_factory):
+        for batch in range(3):
+            async with session_factory() as db:
+                await write_reviews(db, [
+                    {"word_id": word_ids[(batch + n) % 3], "study_session_id": batch + 1, "correct": n % 3 != 0,
+                     "created_at": START + timedelta(days=batch, minutes=n)}
+                    for n in range(7)
+                ])
+                await db.commit()
+
+    run_async(write)
+    incremental = as_tuples(stored_stats(sync_engine))
+    with Session(sync_engine) as db:
+        rebuild_word_stats(db)
+        db.commit()
+    rebuilt = as_tuples(stored_stats(sync_engine))
+
+    assert len(rebuilt) == 4
+    assert [row[:4] + row[5:] for row in incremental] == [row[:4] + row[5:] for row in rebuilt]
+    for mine, theirs in zip(incremental, rebuilt):
+        assert abs(mine[4] - theirs[4]) < 1e-9
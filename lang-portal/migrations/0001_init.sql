@@ -14,11 +14,6 @@ CREATE INDEX IF NOT EXISTS idx_study_sessions_group_id ON study_sessions(group_i
 CREATE INDEX IF NOT EXISTS idx_study_sessions_study_activity_id ON study_sessions(study_activity_id);
 CREATE INDEX IF NOT EXISTS idx_study_sessions_created_at ON study_sessions(created_at);
 
--- Create indexes for study activities
-CREATE INDEX IF NOT EXISTS idx_study_activities_study_session_id ON study_activities(study_session_id);
-CREATE INDEX IF NOT EXISTS idx_study_activities_group_id ON study_activities(group_id);
-CREATE INDEX IF NOT EXISTS idx_study_activities_created_at ON study_activities(created_at);
-
 -- Create indexes for word review items
 CREATE INDEX IF NOT EXISTS idx_word_review_items_word_id ON word_review_items(word_id);
 CREATE INDEX IF NOT EXISTS idx_word_review_items_study_session_id ON word_review_items(study_session_id);
@@ -0,0 +1,8 @@
+-- One link per (word, group) so seeding can use INSERT ... ON CONFLICT DO NOTHING
+
+-- Keep the oldest of any duplicated links
+DELETE FROM words_groups WHERE id NOT IN (
+    SELECT MIN(id) FROM words_groups GROUP BY word_id, group_id
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_words_groups_word_group ON words_groups(word_id, group_id);
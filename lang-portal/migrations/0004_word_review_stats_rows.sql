@@ -0,0 +1,30 @@
+-- Every word has a word_review_stats row, however it was inserted (ORM,
+-- seeding, the synthetic generator, plain SQL), so listings that join the
+-- counters (GET /api/words?sort_by=accuracy|review_count) see every word
+
+-- Rows missing so far, counted from the review history
+INSERT OR IGNORE INTO word_review_stats (word_id, correct_count, wrong_count, review_count, accuracy, last_reviewed_at)
+SELECT
+    words.id,
+    COALESCE(SUM(word_review_items.correct), 0),
+    COUNT(word_review_items.id) - COALESCE(SUM(word_review_items.correct), 0),
+    COUNT(word_review_items.id),
+    CASE WHEN COUNT(word_review_items.id) > 0
+        THEN SUM(word_review_items.correct) * 1.0 / COUNT(word_review_items.id)
+        ELSE 0.0 END,
+    MAX(word_review_items.created_at)
+FROM words
+LEFT JOIN word_review_items ON word_review_items.word_id = words.id
+WHERE words.id NOT IN (SELECT word_id FROM word_review_stats)
+GROUP BY words.id;
+
+CREATE TRIGGER IF NOT EXISTS trg_words_insert_stats AFTER INSERT ON words
+BEGIN
+    INSERT OR IGNORE INTO word_review_stats (word_id, correct_count, wrong_count, review_count, accuracy)
+    VALUES (NEW.id, 0, 0, 0, 0.0);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_words_delete_stats AFTER DELETE ON words
+BEGIN
+    DELETE FROM word_review_stats WHERE word_id = OLD.id;
+END;
@@ -0,0 +1,47 @@
+-- One word per korean spelling so seeding can use INSERT ... ON CONFLICT(korean) DO NOTHING
+
+-- Keep the oldest of any duplicated words; the others hand it their links and reviews
+CREATE TEMP TABLE word_duplicates AS
+SELECT words.id AS duplicate_id, kept.id AS kept_id
+FROM words
+JOIN (SELECT korean, MIN(id) AS id FROM words GROUP BY korean HAVING COUNT(*) > 1) AS kept
+    ON kept.korean = words.korean AND kept.id <> words.id;
+
+-- Links the kept word already has stay on the duplicate and go with it
+UPDATE OR IGNORE words_groups
+SET word_id = (SELECT kept_id FROM word_duplicates WHERE duplicate_id = words_groups.word_id)
+WHERE word_id IN (SELECT duplicate_id FROM word_duplicates);
+DELETE FROM words_groups WHERE word_id IN (SELECT duplicate_id FROM word_duplicates);
+
+UPDATE word_review_items
+SET word_id = (SELECT kept_id FROM word_duplicates WHERE duplicate_id = word_review_items.word_id)
+WHERE word_id IN (SELECT duplicate_id FROM word_duplicates);
+
+-- Counters of the merged words, recounted from their combined history
+DELETE FROM word_review_stats
+WHERE word_id IN (SELECT duplicate_id FROM word_duplicates) OR word_id IN (SELECT kept_id FROM word_duplicates);
+INSERT INTO word_review_stats (word_id, correct_count, wrong_count, review_count, accuracy, last_reviewed_at)
+SELECT
+    words.id,
+    COALESCE(SUM(word_review_items.correct), 0),
+    COUNT(word_review_items.id) - COALESCE(SUM(word_review_items.correct), 0),
+    COUNT(word_review_items.id),
+    CASE WHEN COUNT(word_review_items.id) > 0
+        THEN SUM(word_review_items.correct) * 1.0 / COUNT(word_review_items.id)
+        ELSE 0.0 END,
+    MAX(word_review_items.created_at)
+FROM words
+LEFT JOIN word_review_items ON word_review_items.word_id = words.id
+WHERE words.id IN (SELECT kept_id FROM word_duplicates)
+GROUP BY words.id;
+
+-- Schedules can only be replayed in Python: when anything was merged,
+-- empty word_schedules and startup's backfill rebuilds it. words_fts is
+-- resynced at startup once its row count no longer matches words.
+DELETE FROM word_schedules WHERE EXISTS (SELECT 1 FROM word_duplicates);
+
+DELETE FROM words WHERE id IN (SELECT duplicate_id FROM word_duplicates);
+
+DROP TABLE word_duplicates;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_words_korean ON words(korean);